@@ -1,1148 +1,1690 @@
-from playwright.sync_api import sync_playwright
-import time
-from typing import List, Dict, Any
-import os
-
-class ECalAutomator:
-    def __init__(self, headless=False):
-        self.headless = headless
-        self.playwright = None
-        self.browser = None
-        self.page = None
-        self.logged_in_alert_seen = False
-
-    def start(self):
-        self.playwright = sync_playwright().start()
-        
-        # Determine a profile directory to persist cookies/session
-        profile_path = os.path.join(os.getcwd(), "ecalc_session")
-        if not os.path.exists(profile_path):
-            os.makedirs(profile_path)
-
-        # Launching a persistent context instead of a fresh browser every time
-        self.browser = self.playwright.chromium.launch_persistent_context(
-            profile_path,
-            headless=self.headless,
-            viewport={'width': 1366, 'height': 768},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
-        self.page = self.browser.pages[0]
-        
-        # Add dialog handler for alerts (like "Already logged in")
-        def handle_dialog(dialog):
-            try:
-                msg = dialog.message.lower()
-                print(f"[Alert] {dialog.message}")
-                
-                # If it's the "Already logged in" alert
-                if "logged in" in msg or "angemeldet" in msg:
-                    self.logged_in_alert_seen = True
-                    time.sleep(1) # Brief pause
-                
-                try:
-                    dialog.accept()
-                except:
-                    try:
-                        dialog.dismiss()
-                    except:
-                        pass
-            except Exception as e:
-                pass
-            
-        self.page.on("dialog", handle_dialog)
-
-    def stop(self):
-        if self.browser:
-            self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
-
-    def login(self, email, password):
-        self.email = email
-        self.password = password
-        self.logged_in_alert_seen = False # Reset
-        
-        # FIRST: Check if we are already logged in via persistent cookies
-        print(f"Checking if session is already active...")
-        try:
-            self.page.goto("https://www.ecalc.ch/motorcalc.php", timeout=30000)
-            time.sleep(2)
-            if self.page.locator("a:has-text('Logout')").count() > 0:
-                print("Session resumed from cookies.")
-                return True
-        except: pass
-        
-        # If we saw the alert during the check above, we are logged in.
-        if self.logged_in_alert_seen:
-             print("Login alert detected during check. Session is active.")
-             return True
-
-        print(f"Navigating to login page...")
-        try:
-            self.page.goto("https://www.ecalc.ch/calcmember/login.php", timeout=60000)
-            time.sleep(2)
-        except Exception as e:
-            print(f"Error navigating to login page: {e}")
-            return False
-            
-        # If already logged in (redirected)
-        if self.page.locator("a:has-text('Logout')").count() > 0 or "login.php" not in self.page.url:
-             if "login.php" not in self.page.url:
-                 print("Already logged in (Redirected).")
-                 return True
-            
-        print(f"Logging in as {email}...")
-        try:
-            # Dismiss cookies if they block
-            if self.page.locator(".cookieinfo-close").count() > 0:
-                 self.page.click(".cookieinfo-close")
-                 time.sleep(1)
-
-            self.page.fill("input[name='username']", email)
-            self.page.fill("input[name='password']", password)
-            
-            # Remember Me
-            try:
-                if self.page.locator("input[name='remember']").count() > 0:
-                    self.page.check("input[name='remember']")
-            except: pass
-            
-            # Submit
-            if self.page.locator("button:has-text('Login')").count() > 0:
-                self.page.click("button:has-text('Login')")
-            elif self.page.locator("input[type='submit']").count() > 0:
-                self.page.click("input[type='submit']")
-            else:
-                self.page.keyboard.press("Enter")
-            
-            try:
-                self.page.wait_for_load_state("networkidle", timeout=15000)
-            except: pass
-            time.sleep(5)
-            
-            if self.page.locator("a:has-text('Logout')").count() > 0 or "motorcalc.php" in self.page.url:
-                print("Login successful.")
-                return True
-            else:
-                print("WARNING: Login might have failed. (No Logout link found)")
-        except Exception as e:
-            print(f"Login error: {e}")
-        return False
-
-    def _ensure_session_valid(self):
-        """Checks if session is still valid and re-logs in if necessary."""
-        try:
-            # Wait for any active navigation/redirection
-            self.page.wait_for_load_state("load", timeout=5000)
-            
-            # Check for logout/login indicators
-            is_logged_in = self.page.locator("a:has-text('Logout')").count() > 0
-            is_login_page = "login.php" in self.page.url or "loggedout" in self.page.url
-            has_login_form = self.page.locator("input[name='username']").count() > 0
-            
-            if is_login_page or (not is_logged_in and has_login_form):
-                print("Session invalid or Login page detected. Re-logging in...")
-                return self.login(self.email, self.password)
-            
-            # Check for URL-based redirect (login.php?target)
-            # Example: https://www.ecalc.ch/calcmember/login.php?https://www.ecalc.ch/setupfinder.php
-            if "login.php?" in self.page.url:
-                try:
-                    parts = self.page.url.split("login.php?")
-                    if len(parts) > 1 and parts[1].startswith("http"):
-                        target = parts[1]
-                        # Check login status
-                        is_logged_in_now = self.page.locator("a:has-text('Logout')").count() > 0
-                        
-                        if self.logged_in_alert_seen or is_logged_in_now:
-                            print(f"Logged in. Following detected redirect to: {target}")
-                            self.page.goto(target)
-                            time.sleep(2)
-                            return True
-                except Exception as e:
-                    print(f"Error handling dynamic redirect: {e}")
-
-            # Ambiguous state (neither logged in nor login form)
-            if not is_logged_in and not has_login_form:
-                if self.logged_in_alert_seen:
-                    print("Logged-in alert was seen recently. Assuming valid session.")
-                    # Force nav to tool if not there
-                    if "motorcalc.php" not in self.page.url:
-                         self.page.goto("https://www.ecalc.ch/motorcalc.php")
-                    return True
-
-                print("Ambiguous session state. Checking for Member Landing Page...")
-                # Check if we are on the landing page which often has ID 'member_content' or links to calculators
-                if self.page.locator("a[href*='motorcalc.php']").count() > 0:
-                     print("Found PropCalc link. We are logged in. Navigating...")
-                     try:
-                         self.page.goto("https://www.ecalc.ch/motorcalc.php")
-                         return True
-                     except: pass
-                
-                print("Waiting 3s...")
-                time.sleep(3)
-                # Quick re-check
-                if self.page.locator("a:has-text('Logout')").count() > 0: return True
-                
-                # If still failing, reload
-                print("Reloading to check session...")
-                self.page.reload()
-                time.sleep(3)
-                if self.page.locator("a:has-text('Logout')").count() > 0: return True
-
-            return True
-        except Exception as e:
-            # print(f"Non-critical error checking session: {e}")
-            return True # Assume OK or will be caught by next action
-
-    def run_setup_finder(self, inputs: Dict[str, str], limit: int = 10) -> List[Dict[str, Any]]:
-        print("Running Setup Finder...")
-        self.page.goto("https://www.ecalc.ch/setupfinder.php")
-        # Patience: allow page to settle and any session alerts to fire
-        time.sleep(5)
-        self.page.wait_for_load_state("networkidle", timeout=10000)
-        
-        # Verify we are still on the right page (in case of redirection)
-        if "setupfinder.php" not in self.page.url:
-            print("Redirected from Setup Finder. Attempting to return...")
-            self.page.goto("https://www.ecalc.ch/setupfinder.php")
-            time.sleep(2)
-
-        # Field Mapping
-        mapping = {
-            "weight": "inAcAuw",
-            "wingspan": "inAcSpan",
-            "wing_area": "inGWingArea",
-            "speed": "inPerfSpeed",
-            "thrust": "inPerfThrust",
-            "flight_time": "inPerfTime",
-            "battery_cells": "inBS", 
-            "battery_voltage": "inBCellV",
-            "motors": "inGMotors",
-            "max_weight": "inMWeightMax",
-            "max_prop_diameter": "inPDiameter",
-            "prop_blades": "inPBlades",
-            "elevation": "inGElevation",
-            "temperature": "inGTemp",
-        }
-
-        if "flight_plan" in inputs:
-             print(f"Selecting Flight Plan: {inputs['flight_plan']}")
-             try:
-                self.page.select_option("#inPerfMission", label=inputs["flight_plan"])
-                # Wait a bit for recommendations to settle
-                time.sleep(1)
-             except Exception as e:
-                print(f"Error selecting Flight Plan: {e}")
-
-        if "wing_type" in inputs:
-             try:
-                 self.page.wait_for_selector("#inAcWingTyp", timeout=5000)
-                 self.page.select_option("#inAcWingTyp", value=str(inputs["wing_type"]))
-             except Exception as e:
-                 print(f"Error selecting Wing Type: {e}")
-
-        # Fill text inputs (AFTER flight plan to avoid overwrite)
-        for key, val in inputs.items():
-            if key in mapping:
-                selector = f"#{mapping[key]}"
-                try:
-                    # Wait for each field to ensure they are ready
-                    self.page.wait_for_selector(selector, timeout=5000)
-                    print(f"Filling {key}: {val}")
-                    # Use sequence to ensure JS handlers triggers
-                    self.page.locator(selector).focus()
-                    self.page.fill(selector, str(val))
-                    self.page.locator(selector).press("Tab")
-                    time.sleep(0.1)
-                except Exception as e:
-                    print(f"Warning: Could not fill {key} ({selector}): {e}")
-
-        # Handle Interstitials (Cookies / Modals)
-        print("Checking for overlays...")
-        try:
-            # Cookies
-            if self.page.locator(".cookieinfo-close").count() > 0:
-                print("Closing Cookie Info...")
-                self.page.click(".cookieinfo-close")
-                time.sleep(0.5)
-                
-            # Modal Confirm (Terms/Upgrade)
-            if self.page.locator("#modalConfirm").is_visible():
-                print("Accepting Modal Confirm...")
-                self.page.click("#modalConfirmOk")
-                time.sleep(1)
-            # Generic retry for stability
-            self.page.wait_for_load_state("networkidle", timeout=5000)
-        except Exception as e:
-            # print(f"Error handling overlays: {e}")
-            pass
-
-        # Click Calculate/Search
-        print("Clicking Search...")
-        clicked = False
-        try:
-            # Target the element with the onclick=calculate trigger
-            search_btn = self.page.locator("span[onclick*='calculate']").first
-            if search_btn.count() > 0:
-                print("Clicked calculate button")
-                search_btn.click()
-                clicked = True
-            elif self.page.locator("#btnFindSetup").count() > 0:
-                print("Clicked #btnFindSetup parent")
-                self.page.locator("#btnFindSetup").locator("xpath=..").click()
-                clicked = True
-            else:
-                print("Trying fallback submit button...")
-                btn = self.page.locator("button:has-text('Calculate'), input[type='submit']")
-                if btn.count() > 0:
-                    btn.first.click()
-                    clicked = True
-        except Exception as e:
-            print(f"Error clicking search: {e}")
-        
-        if not clicked:
-            print("Failed to click any search button. Dumping page.")
-            with open("debug_setupfinder_nobtn.html", "w", encoding="utf-8") as f:
-                f.write(self.page.content())
-            return []
-        
-        print("Waiting for results (20s)...")
-        time.sleep(20) # Wait for results
-        
-        # Verify if results are present in DOM
-        content = self.page.content()
-        if "recid" not in content:
-            print("WARNING: 'recid' not found in page content after 20s. Results might be empty or still loading.")
-            # Take a screenshot if possible? No, but we can dump HTML
-            with open("debug_setupfinder_noresults.html", "w", encoding="utf-8") as f:
-                f.write(content)
-        
-        # Extract Results
-        results = []
-        seen_setups = set()  # Key: (motor_id, prop_diam, prop_pitch)
-        
-        page_num = 1
-        while len(results) < limit:
-            rows = self.page.locator("table tr[recid]").all() # recid only matches data rows
-            print(f"Page {page_num}: Found {len(rows)} potential result rows.")
-            
-            new_on_this_page = 0
-            for i, row in enumerate(rows):
-                if len(results) >= limit: break
-                
-                # Extract metadata from the 'title' attribute of the cell with col="12"
-                metadata_cell = row.locator('td[col="12"] div')
-                if metadata_cell.count() == 0:
-                    continue
-                
-                title = metadata_cell.get_attribute("title")
-                if not title or "," not in title:
-                    continue
-                    
-                vals = [v.strip() for v in title.split(",")]
-                if len(vals) < 5: # Minimal: diam, pitch, manuf_id, motor_id, kv
-                    print(f"Skipping row {i}: too few metadata values ({len(vals)})")
-                    continue
-                
-                # Robust Mapping using search from the end (since beginning is variable)
-                manuf_name = "Unknown"
-                manuf_idx = -1
-                # 1. Find Manufacturer (skipping version at -1 typically)
-                for j in range(len(vals)-1, 1, -1):
-                    v_low = vals[j].lower()
-                    # Known brands to help anchor the search
-                    if any(brand in v_low for brand in ["t-motor", "sunnysky", "scorpion", "mad", "neu", "leo", "dual", "joker", "cobra", "antigravity", "u-series"]):
-                        manuf_name = vals[j]
-                        manuf_idx = j
-                        break
-                
-                # 2. Find Drive Weight (first large numeric before manufacturer or from expected position)
-                drive_weight = "N/A"
-                if manuf_idx > 0:
-                    for j in range(manuf_idx - 1, 0, -1):
-                        v = vals[j]
-                        if v.replace('.', '', 1).isdigit() and float(v) > 50:
-                            drive_weight = v
-                            break
-                if drive_weight == "N/A" and len(vals) >= 12:
-                    # Fallback to standard position 11 (0-indexed)
-                    v = vals[11]
-                    if v.replace('.', '', 1).isdigit():
-                        drive_weight = v
-                
-                # 3. Basic fields are usually at the beginning
-                motor_id = vals[3] if len(vals) > 3 else "Unknown"
-                
-                setup_key = (motor_id, vals[0], vals[1]) # Unique combination
-                if setup_key in seen_setups:
-                    continue
-
-                data = {
-                    "prop_diam": vals[0],
-                    "prop_pitch": vals[1],
-                    "manufacturer_id": vals[2],
-                    "motor_id": motor_id,
-                    "motor_kv": vals[4] if len(vals) > 4 else "?",
-                    "motor_name": f"{manuf_name} {motor_id}" if manuf_name != "Unknown" else motor_id,
-                    "manufacturer": manuf_name,
-                    "drive_weight": drive_weight
-                }
-                
-                results.append(data)
-                seen_setups.add(setup_key)
-                new_on_this_page += 1
-            
-            print(f"Extracted {new_on_this_page} new setups from page {page_num}.")
-            
-            if len(results) >= limit:
-                print(f"Reached limit of {limit} results.")
-                break
-                
-            # Scroll to load more results using Keyboard which triggers events better
-            print(f"Scrolling... (Page {page_num})")
-            try:
-                # 1. Focus the grid or body
-                if page_num == 1:
-                    try:
-                        # Try to click the last row to focus grid?
-                        if rows:
-                            rows[-1].click(timeout=1000)
-                        else:
-                            self.page.click(".w2ui-grid-records", timeout=1000)
-                    except:
-                        self.page.click("body")
-                
-                # 2. Press PageDown multiple times
-                for _ in range(5):
-                    self.page.keyboard.press("PageDown")
-                    time.sleep(0.1)
-                
-                # 3. JS Scroll Fallback
-                self.page.evaluate("""() => {
-                    var grid = document.querySelector('.w2ui-grid-records');
-                    if (grid) {
-                        grid.scrollTop += grid.clientHeight * 2;
-                    } else {
-                        window.scrollBy(0, window.innerHeight * 2);
-                    }
-                }""")
-                
-                # Wait for refresh
-                time.sleep(2.0)
-                
-            except Exception as e:
-                print(f"Error during scroll: {e}")
-                break
-            
-            page_num += 1
-            if new_on_this_page == 0:
-                 # consecutive empty scans
-                 print("No new items found after scroll. Trying 'End' key once...")
-                 self.page.keyboard.press("End")
-                 time.sleep(2)
-                 
-                 # Check strict staleness (if we really didn't find anything for 2 cycles)
-                 if page_num > 100: break # Safety break
-                 
-        print(f"Total extracted: {len(results)} valid setups.")
-        return results
-
-    def filter_setups(self, setups: List[Dict[str, Any]], target_diam: float, manufacturer: str) -> List[Dict[str, Any]]:
-        """
-        Fast filtering of motors based on Prop Diameter and Manufacturer.
-        - target_diam: e.g. 18.0 for "18x10.0"
-        - manufacturer: string to match in manufacturer or motor name (case insensitive)
-        """
-        filtered = []
-        clean_manuf = self._normalize_text(manufacturer)
-        
-        print(f"Filtering {len(setups)} setups for Diam~={target_diam} and Manuf='{manufacturer}'")
-        
-        for s in setups:
-            # 1. Filter by Manufacturer
-            s_manuf = self._normalize_text(s.get("manufacturer", ""))
-            s_motor = self._normalize_text(s.get("motor_name", ""))
-            if clean_manuf not in s_manuf and clean_manuf not in s_motor:
-                continue
-                
-            # 2. Filter by Diameter
-            # Format typically "18x10.0" or "18.0x..."
-            raw_diam = s.get("prop_diam", "")
-            d_val = self._parse_prop_diameter(raw_diam)
-            if d_val is None:
-                continue
-            if self._matches_prop_diameter(d_val, target_diam):
-                filtered.append(s)
-                
-        return filtered
-
-    def _normalize_text(self, text: str):
-        try:
-            return "".join([c for c in str(text).lower() if c.isalnum()])
-        except:
-            return ""
-
-    def _parse_prop_diameter(self, raw_diam: str):
-        try:
-            if not raw_diam:
-                return None
-            s = str(raw_diam).strip()
-            num = ""
-            for ch in s:
-                if ch.isdigit() or ch in [".", ","]:
-                    num += ch
-                else:
-                    if num:
-                        break
-            if not num:
-                return None
-            num = num.replace(",", ".")
-            return float(num)
-        except:
-            return None
-
-    def _matches_prop_diameter(self, d_val, target_diam):
-        try:
-            if d_val is None or target_diam is None:
-                return False
-            if abs(target_diam - round(target_diam)) < 0.01:
-                return int(d_val) == int(target_diam)
-            return abs(d_val - target_diam) < 0.1
-        except:
-            return False
-
-    def run_prop_calc(self, setup_data: Dict[str, Any]) -> Dict[str, str]:
-        print(f"Running Prop Calc for {setup_data.get('motor_name', 'Unknown')}...")
-        
-        # Initialize results early so it's always available in except/return blocks
-        results = {
-            "motor": setup_data.get("motor_name", "Unknown"),
-            "motor_weight": "N/A",
-            "drive_weight": setup_data.get("drive_weight", "N/A"),
-            "manufacturer": setup_data.get("manufacturer", ""),
-            "prop_diam": setup_data.get("prop_diam", setup_data.get("max_prop_diameter", "?")), 
-            "prop_pitch": setup_data.get("prop_pitch", "?"),
-            "prop_blades": setup_data.get("prop_blades", "2"),
-            "power": "N/A",
-            "traction": "N/A"
-        }
-        print(f"DEBUG: results initialized: {results}")
-
-        for attempt in range(2):
-            try:
-                # Ensure session is valid
-                if not self._ensure_session_valid():
-                    print(f"Failed to ensure session for {results['motor']}")
-                    continue
-                
-                # Navigate if not already on the right page
-                if "motorcalc.php" not in self.page.url:
-                    print(f"PropCalc attempt {attempt+1}: Navigating to motorcalc.php...")
-                    self.page.goto("https://www.ecalc.ch/motorcalc.php", timeout=60000)
-                    time.sleep(2)
-                
-                # Double check navigation (handle landing page redirects)
-                if "calcmember/index.php" in self.page.url or "calcmember/login.php" in self.page.url:
-                    print("On landing/login page. Attempting direct navigation to MotorCalc...")
-                    try:
-                        # Try clicking the link first as it often sets session cookies/state better than direct URL
-                        if self.page.locator("a[href*='motorcalc.php']").count() > 0:
-                            self.page.click("a[href*='motorcalc.php']")
-                        else:
-                            self.page.goto("https://www.ecalc.ch/motorcalc.php", timeout=60000)
-                        
-                        time.sleep(3)
-                        
-                        # Handle the Alert if it pops up again
-                        # The dialog handler should take care of it, but we might need to wait
-                    except Exception as e:
-                        print(f"Nav error: {e}")
-                
-                # If still on landing page, try force
-                if "calcmember" in self.page.url:
-                     print("Still on landing page. Forcing URL...")
-                     self.page.goto("https://www.ecalc.ch/motorcalc.php", wait_until="domcontentloaded")
-                     time.sleep(2)
-
-                # Check for form stability
-                try:
-                    self.page.wait_for_selector("#inMType", timeout=10000)
-                except:
-                    if "motorcalc.php" not in self.page.url:
-                         print(f"Not on motorcalc.php (URL: {self.page.url}). Retrying navigation...")
-                         self.page.goto("https://www.ecalc.ch/motorcalc.php")
-                    else:
-                         print("MotorCalc elements not found on page. Reloading...")
-                         self.page.reload()
-                    self.page.wait_for_selector("#inMType", timeout=15000)
-
-                # 1. Select Manufacturer
-                manuf_id = setup_data.get("manufacturer_id")
-                manuf_name = setup_data.get("manufacturer")
-                
-                if manuf_id or manuf_name:
-                    try:
-                        manuf_sel = "#inMManufacturer"
-                        if manuf_id:
-                            print(f"Selecting Manufacturer by ID: {manuf_id} ({manuf_name})")
-                            self.page.select_option(manuf_sel, value=str(manuf_id))
-                        else:
-                            print(f"Selecting Manufacturer by Label: {manuf_name}")
-                            self.page.select_option(manuf_sel, label=manuf_name)
-                        
-                        # Wait for AJAX update
-                        self.page.wait_for_load_state("networkidle")
-                        # Also wait for the motor list to be populated
-                        try:
-                            self.page.wait_for_function("document.querySelector('#inMType').options.length > 1", timeout=8000)
-                        except:
-                            print("Motor list did not populate. Retrying manufacturer selection...")
-                            if manuf_id:
-                                self.page.select_option(manuf_sel, value=str(manuf_id))
-                            else:
-                                self.page.select_option(manuf_sel, label=manuf_name)
-                            time.sleep(2)
-                    except Exception as e:
-                        print(f"Manuf select error: {e}")
-                        pass
-                 
-                # 2. Select Motor with WAIT loop
-                motor_name = setup_data.get('motor_name')
-                motor_id = setup_data.get('motor_id')
-                target_motor = motor_id if motor_id else motor_name
-
-                if target_motor:
-                    print(f"Selecting Motor: {target_motor}")
-                    
-                    found = False
-                    # 1. Try exact match with motor_id or motor_name as label
-                    for label_try in [motor_id, motor_name]:
-                        if not label_try: continue
-                        try:
-                            self.page.select_option("#inMType", label=label_try)
-                            found = True
-                            break
-                        except: pass
-                    
-                    if not found:
-                        print(f"Exact match failed. Finding alternative for '{target_motor}'...")
-                        # Get all options with their 'disabled' status
-                        options_data = self.page.evaluate("""() => {
-                            var sel = document.getElementById('inMType');
-                            if (!sel) return [];
-                            var res = [];
-                            for (var i = 0; i < sel.options.length; i++) {
-                                res.push({
-                                    text: sel.options[i].text,
-                                    value: sel.options[i].value,
-                                    disabled: sel.options[i].disabled
-                                });
-                            }
-                            return res;
-                        }""")
-                        
-                        target_kv = str(setup_data.get('motor_kv', ''))
-                        clean_target = target_motor.lower()
-                        
-                        matches = []
-                        for opt in options_data:
-                            opt_text = opt["text"].lower()
-                            # Logic: If target matches AND (KV match OR no target KV)
-                            if clean_target in opt_text:
-                                score = 1
-                                if target_kv and (f"({target_kv})" in opt_text or f"kv{target_kv}" in opt_text):
-                                    score = 10 # Strong match
-                                matches.append((score, opt))
-                        
-                        if matches:
-                            # Sort by score descending
-                            matches.sort(key=lambda x: x[0], reverse=True)
-                            best_match = matches[0][1]
-                            
-                            if best_match["disabled"]:
-                                print(f"WARNING: Motor '{best_match['text']}' is FOUND but DISABLED. (Member only / Access restricted?)")
-                            else:
-                                try:
-                                    self.page.select_option("#inMType", value=best_match["value"])
-                                    found = True
-                                    print(f"Selected match: {best_match['text']}")
-                                except Exception as e:
-                                    print(f"Failed to select best match: {e}")
-                        
-                        if not found:
-                             print("Motor not found in list even with search logic.")
-                             
-                    # VERIFY Selection
-                    time.sleep(0.5)
-                    val = self.page.eval_on_selector("#inMType", "el => el.options[el.selectedIndex].text")
-                    if target_motor not in val and (motor_id and motor_id not in val):
-                        print(f"WARNING: Motor selection might have failed. Current value in dropdown: {val}")
-                
-                time.sleep(1)
-
-                # Prop
-                if "prop_diam" in setup_data:
-                     self.page.fill("#inPDiameter", setup_data["prop_diam"].replace(",", "."))
-                if "prop_pitch" in setup_data:
-                     self.page.fill("#inPPitch", setup_data["prop_pitch"].replace(",", "."))
-
-                # Select Prop Type
-                if "prop_type" in setup_data:
-                    p_type = setup_data["prop_type"]
-                    print(f"Selecting Prop Type: {p_type}")
-                    try:
-                        self.page.select_option("#inPType", label=p_type)
-                    except:
-                        # Fallback partial match
-                         try:
-                            options = self.page.locator("#inPType option").all_inner_texts()
-                            for opt in options:
-                                if p_type.lower() in opt.lower():
-                                    self.page.select_option("#inPType", label=opt)
-                                    print(f"Selected Prop Type (Partial): {opt}")
-                                    break
-                         except Exception as e:
-                             print(f"Prop Type selection failed: {e}")
-
-                # Select ESC
-                esc_model = setup_data.get("esc", "max 100A")
-                print(f"Selecting ESC: {esc_model}")
-                try:
-                    self.page.select_option("#inEType", label=esc_model)
-                except Exception as e:
-                    print(f"ESC Selection Failed: {e}. Trying partial match...")
-                    try:
-                        # Fallback: Find option containing text
-                        options = self.page.locator("#inEType option").all_inner_texts()
-                        for opt in options:
-                            if esc_model.lower() in opt.lower():
-                                self.page.select_option("#inEType", label=opt)
-                                print(f"Selected ESC (Partial): {opt}")
-                                break
-                    except:
-                        print("Could not select ESC.")
-
-                # Select Battery Model
-                bat_model = setup_data.get("battery_model", "LiPo 3300mAh - 45/60C") 
-                print(f"Selecting Battery: {bat_model}")
-                try:
-                    self.page.select_option("#inBCell", label=bat_model)
-                except:
-                    # Fallback logic for battery
-                    print(f"Battery Selection Failed for '{bat_model}'. Trying partial match...")
-                    try:
-                        options = self.page.locator("#inBCell option").all_inner_texts()
-                        for opt in options:
-                            if bat_model.lower() in opt.lower():
-                                self.page.select_option("#inBCell", label=opt)
-                                print(f"Selected Battery (Partial): {opt}")
-                                break
-                    except:
-                         print("Could not select Battery.")
-                         
-                # Battery Handling (Capacity manually if needed, but selecting model often sets it)
-                try:
-                    # If Capacity is disabled, ensure we are in Custom battery mode?
-                    # eCalc might lock fields if a specific battery is selected (default).
-                    pass
-                except: pass
-                
-                # Filled Weight
-                if "weight" in setup_data:
-                    print(f"Setting Weight: {setup_data['weight']}g")
-                    try:
-                        self.page.fill("#inGWeight", str(setup_data["weight"]))
-                    except Exception as e:
-                        print(f"Error setting weight: {e}")
-
-                # Filled Battery Cells
-                if "battery_cells" in setup_data:
-                     # Ensure we just pass the number
-                     val = str(setup_data["battery_cells"])
-                     print(f"Setting Battery Cells: {val}S")
-                     try:
-                        self.page.fill("#inBS", val)
-                     except Exception as e:
-                        print(f"Error setting battery cells: {e}")
-
-                # Select Battery Charge State
-                if "battery_charge_state" in setup_data:
-                    charge_state = setup_data["battery_charge_state"]
-                    print(f"Setting Charge State: {charge_state}")
-                    try:
-                        self.page.select_option("#inBChargeState", label=charge_state)
-                    except Exception as e:
-                        print(f"Error setting charge state: {e}")
-
-                if "bat_cap" in setup_data:
-                     try:
-                        if self.page.locator("#inBCellCap").is_enabled():
-                            cap_val = setup_data["bat_cap"].replace(",", ".")
-                            self.page.fill("#inBCellCap", cap_val)
-                     except Exception as e:
-                        print(f"B.Cap error: {e}")
-
-                if "bat_c" in setup_data:
-                     try:
-                        if self.page.locator("#inBCcont").is_enabled():
-                             self.page.fill("#inBCcont", setup_data["bat_c"].replace(",", "."))
-                     except: pass
-                     
-                # FORCE UPDATE of form fields if they are reset by JS
-                # Sometimes checking if the value stuck is useful
-                if "prop_diam" in setup_data:
-                    curr = self.page.input_value("#inPDiameter")
-                    target = setup_data["prop_diam"].replace(",", ".")
-                    if curr != target:
-                        print(f"Refilling Prop Diam (was {curr}, want {target})")
-                        self.page.fill("#inPDiameter", target)
-
-                # TRIGGER CALCULATION
-                print("Triggering Calculation...")
-                # We use JS directly because the button selector is elusive
-                self.page.evaluate("calculate()")
-                
-                # Check Success - Wait for 'outTotPout' to have a numeric value
-                # Max wait 15s instead of 5s
-                print("Waiting for calculation results...")
-                calc_success = False
-                for _ in range(30):
-                    val = self.page.locator("#outTotPout").inner_text().strip()
-                    if val and val != "-" and val != "" and val != "0":
-                        calc_success = True
-                        break
-                    time.sleep(0.5)
-                 
-                if not calc_success:
-                    print("Calculation failed (Results timed out or empty). Proceeding with weight extraction...")
-                    # return {"power": "N/A", "traction": "N/A", "motor": setup_data.get("motor_name")}
-                
-                # Update results from PropCalc page
-                try:
-                    # Power: User expects Max Power (Input) usually. 
-                    # outMaxWin is max electrical power in. outOptWin is optimal.
-                    pwr_selectors = ["#outMaxWin", "#outOptWin", "#outTotPout"]
-                    for sel in pwr_selectors:
-                        if self.page.locator(sel).count() > 0:
-                            val = self.page.locator(sel).inner_text().strip()
-                            if val and val != "-" and val != "0":
-                                results["power"] = val
-                                break
-                    
-                    # Mass (Drive Weight/Massa GMP): outTotDriveWeight is the most accurate
-                    if self.page.locator("#outTotDriveWeight").count() > 0:
-                        results["drive_weight"] = self.page.locator("#outTotDriveWeight").inner_text().strip()
-                except: pass
-                
-                # Double check Diam/Pitch from input if they are '?' or missing in setup_data
-                if results.get("prop_diam") in ["?", None]:
-                    try:
-                        results["prop_diam"] = self.page.locator("#inPDiameter").input_value()
-                    except: pass
-                if results.get("prop_pitch") in ["?", None]:
-                    try:
-                        results["prop_pitch"] = self.page.locator("#inPPitch").input_value()
-                    except: pass
-
-
-                # 1. Motor Weight
-                try:
-                    # eCalc IDs: outMWeight (calculated weight of motor), or from setup finder input
-                    if self.page.locator("#outMWeight").count() > 0:
-                        results["motor_weight"] = self.page.locator("#outMWeight").inner_text().strip()
-                    elif self.page.locator("#inMWeight").count() > 0:
-                         results["motor_weight"] = self.page.locator("#inMWeight").input_value().strip()
-                    else:
-                        results["motor_weight"] = "N/A"
-                except:
-                    results["motor_weight"] = "N/A"
-
-                # 2. Power (already extracted above)
-                
-                # 3. Speed Sweep (0 to 135 step 9)
-                # Static Traction (Speed 0) - usually calculated at speed 0 input
-                # Ensure input is 0 first? defaulting usually 0.
-                def _wait_out_text_changed(selector, prev_text, timeout_s=8.0):
-                    deadline = time.time() + timeout_s
-                    last_text = None
-                    while time.time() < deadline:
-                        try:
-                            if self.page.locator(selector).count() == 0:
-                                time.sleep(0.1)
-                                continue
-                            txt = self.page.locator(selector).inner_text().strip()
-                            last_text = txt
-                            if txt and txt != "-" and (prev_text is None or txt != prev_text):
-                                return txt
-                        except:
-                            pass
-                        time.sleep(0.2)
-                    return last_text
-
-                def _wait_calc_ready(timeout_s=10.0):
-                    deadline = time.time() + timeout_s
-                    while time.time() < deadline:
-                        try:
-                            val = self.page.locator("#outTotPout").inner_text().strip()
-                            if val and val != "-" and val != "0":
-                                return True
-                        except:
-                            pass
-                        time.sleep(0.2)
-                    return False
-
-                def _set_flight_speed_kmh(v):
-                    try:
-                        self.page.evaluate(
-                            """(v) => {
-                                var kmh = document.getElementById('inPSpeed');
-                                var mph = document.getElementById('inPSpeedMph');
-                                if (kmh) kmh.value = String(v);
-                                if (mph) {
-                                    if (typeof kmh2mph === 'function' && kmh) {
-                                        kmh2mph(kmh.value, mph);
-                                    } else {
-                                        mph.value = String(Math.round(v * 0.621371 * 10) / 10);
-                                    }
-                                }
-                                if (typeof setThrLabel === 'function') setThrLabel();
-                                var evInput = new Event('input', { bubbles: true });
-                                var evChange = new Event('change', { bubbles: true });
-                                if (kmh) {
-                                    kmh.dispatchEvent(evInput);
-                                    kmh.dispatchEvent(evChange);
-                                }
-                                if (mph) {
-                                    mph.dispatchEvent(evInput);
-                                    mph.dispatchEvent(evChange);
-                                }
-                            }""",
-                            v,
-                        )
-                    except:
-                        try:
-                            self.page.fill("#inPSpeed", str(v))
-                        except:
-                            pass
-                
-                speeds = list(range(0, 136, 9)) # 0, 9, 18 ... 135
-                
-                print(f"Running Speed Sweep: {speeds} km/h")
-                for v in speeds:
-                    try:
-                        prev_thrust = None
-                        try:
-                            if self.page.locator("#outPFlightThrust").count() > 0:
-                                prev_thrust = self.page.locator("#outPFlightThrust").inner_text().strip()
-                        except:
-                            prev_thrust = None
-
-                        # Set speed
-                        _set_flight_speed_kmh(v)
-                        # Trigger Calc
-                        self.page.evaluate("calculate()")
-                        _wait_calc_ready(timeout_s=10.0)
-                        
-                        _wait_out_text_changed("#outPFlightThrust", prev_thrust, timeout_s=10.0)
-                        
-                        # Extract Traction
-                        if self.page.locator("#outPFlightThrust").count() > 0:
-                            trac = self.page.locator("#outPFlightThrust").inner_text().strip()
-                        else:
-                            trac = "N/A"
-                            
-                        results[f"traction_{v}"] = trac
-                    except Exception as ev:
-                        print(f"Error at speed {v}: {ev}")
-                        results[f"traction_{v}"] = "Error"
-                
-                # 4. Efficiency Analysis (Parse #rpmTable)
-                # Set speed to 0 for static efficiency calculations
-                try:
-                    prev_thrust = None
-                    try:
-                        if self.page.locator("#outPFlightThrust").count() > 0:
-                            prev_thrust = self.page.locator("#outPFlightThrust").inner_text().strip()
-                    except:
-                        prev_thrust = None
-
-                    _set_flight_speed_kmh(0)
-                    self.page.evaluate("calculate()")
-                    _wait_calc_ready(timeout_s=10.0)
-                    _wait_out_text_changed("#outPFlightThrust", prev_thrust, timeout_s=10.0)
-                    print("Speed set to 0 for efficiency analysis")
-                except Exception as e:
-                    print(f"Error setting speed to 0: {e}")
-                
-                # Ensure table is visible and populated
-                try:
-                    self.page.wait_for_selector("#rpmTable tr", timeout=5000)
-                    self.page.wait_for_function("""() => {
-                        var table = document.getElementById('rpmTable');
-                        if (!table) return false;
-                        var trs = table.getElementsByTagName('tr');
-                        if (!trs || trs.length < 3) return false;
-                        var cells = trs[2].getElementsByTagName('td');
-                        if (!cells || cells.length < 9) return false;
-                        var pwr = (cells[6].innerText || '').trim();
-                        var thr = (cells[3].innerText || '').trim();
-                        var thrust = (cells[8].innerText || '').trim();
-                        return pwr && pwr !== '-' && thr && thr !== '-' && thrust && thrust !== '-';
-                    }""", timeout=8000)
-                except:
-                    print("Efficiency Table (#rpmTable) not found or slow.")
-                
-                target_power = setup_data.get("analyzed_power", 600)
-                
-                try:
-                    eff_data = self.page.evaluate("""(target_power) => {
-                        var table = document.getElementById('rpmTable');
-                        if (!table) return {error: "Table not found"};
-                        
-                        var toNum = (v) => {
-                            if (v === null || v === undefined) return NaN;
-                            var s = String(v).trim();
-                            if (!s || s === '-') return NaN;
-                            s = s.replace(/\\s+/g, '');
-                            s = s.replace(/'/g, '');
-                            var lastComma = s.lastIndexOf(',');
-                            var lastDot = s.lastIndexOf('.');
-                            if (lastComma !== -1 && lastDot !== -1) {
-                                if (lastComma > lastDot) {
-                                    s = s.replace(/\\./g, '').replace(',', '.');
-                                } else {
-                                    s = s.replace(/,/g, '');
-                                }
-                            } else if (lastComma !== -1) {
-                                s = s.replace(',', '.');
-                            }
-                            s = s.replace(/[^0-9+\\-\\.]/g, '');
-                            return parseFloat(s);
-                        };
-
-                        var findIdxBySpanId = (id) => {
-                            var el = document.getElementById(id);
-                            if (!el) return -1;
-                            var td = el.closest('td');
-                            if (!td) return -1;
-                            return td.cellIndex;
-                        };
-
-                        var idxThr = findIdxBySpanId('uTabThr');
-                        var idxPwr = findIdxBySpanId('uTabW');
-                        var idxEff = findIdxBySpanId('uTabEff');
-                        var idxThrust = findIdxBySpanId('uTabThrust');
-                        if (idxThr < 0 || idxPwr < 0 || idxEff < 0 || idxThrust < 0) {
-                            return {error: "Table header indices not found"};
-                        }
-
-                        var rows = [];
-                        // Skip header (row 0) and units (row 1)? snippet implies headers are tr.
-                        // We iterate all trs.
-                        var trs = table.getElementsByTagName('tr');
-                        
-                        for (var i = 2; i < trs.length; i++) {
-                            var cells = trs[i].getElementsByTagName('td');
-                            if (cells.length < 9) continue;
-                            
-                            var thr = toNum(cells[idxThr].innerText);
-                            var pwr = toNum(cells[idxPwr].innerText);
-                            var eff = toNum(cells[idxEff].innerText);
-                            var thrst = toNum(cells[idxThrust].innerText);
-                            
-                            if (!isNaN(thr) && !isNaN(pwr) && !isNaN(thrst)) {
-                                rows.push({throttle: thr, power: pwr, eff: eff, thrust: thrst});
-                            }
-                        }
-                        
-                        if (rows.length === 0) return {error: "No data rows"};
-                        
-                        // 1. Max Throttle
-                        var maxThrRow = rows[0];
-                        for (var i = 1; i < rows.length; i++) {
-                            if (rows[i].throttle >= maxThrRow.throttle) maxThrRow = rows[i];
-                        }
-                        
-                        var closestRow = rows[0];
-                        var minDiff = Math.abs(rows[0].power - target_power);
-                        for (var i = 1; i < rows.length; i++) {
-                            var diff = Math.abs(rows[i].power - target_power);
-                            if (diff < minDiff) {
-                                minDiff = diff;
-                                closestRow = rows[i];
-                            }
-                        }
-
-                        var powerMin = rows[0].power;
-                        var powerMax = rows[0].power;
-                        for (var i = 1; i < rows.length; i++) {
-                            if (rows[i].power < powerMin) powerMin = rows[i].power;
-                            if (rows[i].power > powerMax) powerMax = rows[i].power;
-                        }
-
-                        var atPower = closestRow;
-
-                        var maxAllowedDiff = Math.max(50, target_power * 0.15);
-                        if (minDiff > maxAllowedDiff) {
-                            return {error: "Target power too far", closest_power_diff: minDiff, row_count: rows.length, power_min: powerMin, power_max: powerMax};
-                        }
-
-                        return {
-                            eff_max_throttle: maxThrRow.eff,
-                            max_throttle_val: maxThrRow.throttle,
-                            eff_at_power: atPower.eff,
-                            power_at_eff: atPower.power,
-                            throttle_at_power: atPower.throttle,
-                            thrust_at_power: atPower.thrust,
-                            at_power_mode: "closest",
-                            closest_power_diff: minDiff,
-                            row_count: rows.length,
-                            power_min: powerMin,
-                            power_max: powerMax
-                        };
-                    }""", target_power)
-                    
-                    if "error" not in eff_data:
-                        results["eff_max_throttle"] = str(eff_data.get("eff_max_throttle", "N/A"))
-                        results["eff_at_power"] = str(eff_data.get("eff_at_power", "N/A"))
-                        results["power_at_eff"] = str(eff_data.get("power_at_eff", "N/A"))
-                        results["thr_at_power"] = str(eff_data.get("throttle_at_power", "N/A"))
-                        results["thrust_at_power"] = str(eff_data.get("thrust_at_power", "N/A"))
-                        try:
-                            results["eff_row_count"] = str(eff_data.get("row_count", ""))
-                            results["eff_closest_power_diff"] = str(eff_data.get("closest_power_diff", ""))
-                            results["eff_at_power_mode"] = str(eff_data.get("at_power_mode", ""))
-                        except:
-                            pass
-                        try:
-                            print(f"Eff @~{target_power}W: pwr={results.get('power_at_eff')}W thr={results.get('thr_at_power')}% thrust={results.get('thrust_at_power')}g (mode={eff_data.get('at_power_mode')}, Δ={eff_data.get('closest_power_diff')}, rows={eff_data.get('row_count')}, range={eff_data.get('power_min')}..{eff_data.get('power_max')})")
-                        except:
-                            pass
-                    else:
-                        results["eff_max_throttle"] = "Err"
-                        results["eff_at_power"] = "Err"
-                        results["thr_at_power"] = "Err"
-                        results["thrust_at_power"] = "Err"
-                        
-                except Exception as e:
-                    print(f"Error extracting efficiency table: {e}")
-                    results["eff_max_throttle"] = "Err"
-                    results["eff_at_power"] = "Err"
-
-                return results
-                
-            except Exception as e:
-                print(f"Error in PropCalc (Attempt {attempt+1}): {e}")
-                # ... (retry logic)
-                if self._ensure_session_valid():
-                    continue 
-                if attempt == 1:
-                     try:
-                        with open("debug_propcalc_error.html", "w", encoding="utf-8") as f:
-                            f.write(self.page.content())
-                     except: pass
-                     return results
-                     
-        return results
+from playwright.sync_api import sync_playwright
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Callable, Iterator, Optional
+import os
+from session import SessionState
+from network import ResourceRouter
+import tracing
+import metrics
+import rpm_table
+
+# Sets the PropCalc flight speed (km/h) the same way the page's own onchange handlers do
+SET_FLIGHT_SPEED_JS = """function (v) {
+    var kmh = document.getElementById('inPSpeed');
+    var mph = document.getElementById('inPSpeedMph');
+    if (kmh) kmh.value = String(v);
+    if (mph) {
+        if (typeof kmh2mph === 'function' && kmh) {
+            kmh2mph(kmh.value, mph);
+        } else {
+            mph.value = String(Math.round(v * 0.621371 * 10) / 10);
+        }
+    }
+    if (typeof setThrLabel === 'function') setThrLabel();
+    var evInput = new Event('input', { bubbles: true });
+    var evChange = new Event('change', { bubbles: true });
+    if (kmh) {
+        kmh.dispatchEvent(evInput);
+        kmh.dispatchEvent(evChange);
+    }
+    if (mph) {
+        mph.dispatchEvent(evInput);
+        mph.dispatchEvent(evChange);
+    }
+}"""
+
+# PropCalc completion hook: wraps calculate() and watches the output spans with a MutationObserver.
+# Waiters registered in __ecalcHook.waiters are released once the outputs stop changing.
+CALC_HOOK_JS = """() => {
+    if (window.__ecalcHook) return true;
+    if (typeof window.calculate !== 'function') return false;
+    var hook = window.__ecalcHook = {calls: 0, mutations: 0, changes: {}, waiters: [], timer: null};
+    var release = function () {
+        clearTimeout(hook.timer);
+        hook.timer = setTimeout(function () {
+            var waiters = hook.waiters;
+            hook.waiters = [];
+            waiters.forEach(function (w) { w(); });
+        }, 30);
+    };
+    // One observer per span, so hook.changes tells which output was rewritten (even with the same text)
+    ['outTotPout', 'outPFlightThrust', 'rpmTable'].forEach(function (id) {
+        var el = document.getElementById(id);
+        if (!el) return;
+        hook.changes[id] = 0;
+        new MutationObserver(function () { hook.mutations++; hook.changes[id]++; release(); })
+            .observe(el, {childList: true, characterData: true, subtree: true});
+    });
+    var original = window.calculate;
+    window.calculate = function () {
+        hook.calls++;
+        try {
+            return original.apply(this, arguments);
+        } finally {
+            release();
+        }
+    };
+    return true;
+}"""
+
+# args: {timeoutMs, watch, previous}. With watch set (a span id), the outputs only count as final once
+# that span differs from previous or was rewritten after this calculate() call, so a sweep point never
+# reports the value left over from the point before it.
+CALCULATE_AND_WAIT_JS = """async (args) => {
+    var text = function (id) {
+        var el = document.getElementById(id);
+        return el ? (el.innerText || '').trim() : null;
+    };
+    var ready = function () {
+        var v = text('outTotPout');
+        return !!v && v !== '-' && v !== '0';
+    };
+    var deadline = Date.now() + args.timeoutMs;
+    var timeout = function (ms) { return new Promise(function (r) { setTimeout(r, Math.max(0, ms)); }); };
+    if (!(""" + CALC_HOOK_JS + """)()) {
+        var same = !!args.watch && text(args.watch) === args.previous;
+        return {ready: ready() && !same, pout: text('outTotPout'), thrust: text('outPFlightThrust'), hooked: false};
+    }
+    var hook = window.__ecalcHook;
+    var rewrites = function () { return args.watch ? (hook.changes[args.watch] || 0) : 0; };
+    var before = rewrites();
+    var changed = function () {
+        return !args.watch || text(args.watch) !== args.previous || rewrites() > before;
+    };
+    var done = function () { return ready() && changed(); };
+    var settled = function () { return new Promise(function (r) { hook.waiters.push(r); }); };
+    var first = settled();
+    calculate();
+    await Promise.race([first, timeout(deadline - Date.now())]);
+    // Outputs that arrive asynchronously (AJAX) release further waiters via the observer
+    while (!done() && Date.now() < deadline) {
+        await Promise.race([settled(), timeout(deadline - Date.now())]);
+    }
+    return {ready: done(), pout: text('outTotPout'), thrust: text('outPFlightThrust'), hooked: true};
+}"""
+
+SELECT_MANUFACTURER_JS = """(want) => {
+    var sel = document.getElementById('inMManufacturer');
+    var motors = document.getElementById('inMType');
+    if (!sel) return {found: false};
+    var idx = -1;
+    for (var i = 0; i < sel.options.length; i++) {
+        var o = sel.options[i];
+        if ((want.value && o.value === want.value) || (!want.value && want.label && o.text.trim() === want.label.trim())) { idx = i; break; }
+    }
+    if (idx < 0) return {found: false};
+    var sig = '';
+    if (motors) for (var j = 0; j < Math.min(motors.options.length, 5); j++) sig += motors.options[j].value + '|';
+    if (sel.selectedIndex === idx && motors && motors.options.length > 1) return {found: true, changed: false};
+    sel.selectedIndex = idx;
+    sel.dispatchEvent(new Event('input', {bubbles: true}));
+    sel.dispatchEvent(new Event('change', {bubbles: true}));
+    return {found: true, changed: true, motor_signature: sig};
+}"""
+
+# True if the form state remembered by the automator still belongs to this document (marks it otherwise)
+FORM_STATE_MARKER_JS = """() => {
+    var same = window.__ecalcFormState === true;
+    window.__ecalcFormState = true;
+    return same;
+}"""
+
+# Sets a list of PropCalc fields in one go, doing label/partial matching in the page
+APPLY_FORM_JS = """(fields) => {
+    var fire = function (el) {
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+    };
+    var norm = function (t) { return (t || '').replace(/\\s+/g, ' ').trim(); };
+    var pickOption = function (sel, f) {
+        var opts = sel.options, i;
+        if (f.kind === 'motor') {
+            for (var l = 0; l < f.labels.length; l++) {
+                for (i = 0; i < opts.length; i++) if (norm(opts[i].text) === norm(f.labels[l])) return i;
+            }
+            var target = f.want.toLowerCase(), best = -1, bestScore = 0;
+            for (i = 0; i < opts.length; i++) {
+                var txt = opts[i].text.toLowerCase();
+                if (txt.indexOf(target) === -1) continue;
+                var score = (f.kv && (txt.indexOf('(' + f.kv + ')') !== -1 || txt.indexOf('kv' + f.kv) !== -1)) ? 10 : 1;
+                if (score > bestScore) { best = i; bestScore = score; }
+            }
+            return best;
+        }
+        for (i = 0; i < opts.length; i++) if (norm(opts[i].text) === norm(f.want)) return i;
+        if (f.partial) {
+            var w = f.want.toLowerCase();
+            for (i = 0; i < opts.length; i++) if (opts[i].text.toLowerCase().indexOf(w) !== -1) return i;
+        }
+        return -1;
+    };
+    var chosen = {}, failed = [];
+    var apply = function (f) {
+        var el = document.getElementById(f.id);
+        if (!el) { failed.push({id: f.id, want: f.want, reason: 'element not found'}); return; }
+        if (f.kind === 'input') {
+            if (f.if_enabled && el.disabled) return;
+            el.value = f.want;
+            fire(el);
+            chosen[f.id] = el.value;
+            return;
+        }
+        var idx = pickOption(el, f);
+        if (idx < 0) { failed.push({id: f.id, want: f.want, reason: 'no matching option'}); return; }
+        if (el.options[idx].disabled) {
+            failed.push({id: f.id, want: f.want, reason: 'option "' + el.options[idx].text + '" is disabled (member only?)'});
+            return;
+        }
+        if (el.selectedIndex !== idx) {
+            el.selectedIndex = idx;
+            fire(el);
+        }
+        chosen[f.id] = el.options[idx].text;
+    };
+    fields.forEach(apply);
+    // Change handlers may rewrite inputs set earlier (e.g. prop diameter); set those once more
+    fields.forEach(function (f) {
+        var el = document.getElementById(f.id);
+        if (f.kind === 'input' && el && !(f.if_enabled && el.disabled) && el.value !== f.want) {
+            el.value = f.want;
+            fire(el);
+            chosen[f.id] = el.value;
+        }
+    });
+    return {chosen: chosen, failed: failed};
+}"""
+
+# Every data row of PropCalc's partial-load table (#rpmTable) as numeric columns
+RPM_TABLE_JS = """() => {
+    var table = document.getElementById('rpmTable');
+    if (!table) return {error: "Table not found"};
+
+    var toNum = (v) => {
+        if (v === null || v === undefined) return NaN;
+        var s = String(v).trim();
+        if (!s || s === '-') return NaN;
+        s = s.replace(/\\s+/g, '');
+        s = s.replace(/'/g, '');
+        var lastComma = s.lastIndexOf(',');
+        var lastDot = s.lastIndexOf('.');
+        if (lastComma !== -1 && lastDot !== -1) {
+            if (lastComma > lastDot) {
+                s = s.replace(/\\./g, '').replace(',', '.');
+            } else {
+                s = s.replace(/,/g, '');
+            }
+        } else if (lastComma !== -1) {
+            s = s.replace(',', '.');
+        }
+        s = s.replace(/[^0-9+\\-\\.]/g, '');
+        return parseFloat(s);
+    };
+
+    var findIdxBySpanId = (id) => {
+        var el = document.getElementById(id);
+        if (!el) return -1;
+        var td = el.closest('td');
+        if (!td) return -1;
+        return td.cellIndex;
+    };
+
+    var idxThr = findIdxBySpanId('uTabThr');
+    var idxPwr = findIdxBySpanId('uTabW');
+    var idxEff = findIdxBySpanId('uTabEff');
+    var idxThrust = findIdxBySpanId('uTabThrust');
+    if (idxThr < 0 || idxPwr < 0 || idxEff < 0 || idxThrust < 0) {
+        return {error: "Table header indices not found"};
+    }
+
+    var out = {throttle: [], power: [], eff: [], thrust: []};
+    // Rows 0 and 1 are the header and the units
+    var trs = table.getElementsByTagName('tr');
+    for (var i = 2; i < trs.length; i++) {
+        var cells = trs[i].getElementsByTagName('td');
+        if (cells.length < 9) continue;
+
+        var thr = toNum(cells[idxThr].innerText);
+        var pwr = toNum(cells[idxPwr].innerText);
+        var eff = toNum(cells[idxEff].innerText);
+        var thrst = toNum(cells[idxThrust].innerText);
+
+        if (!isNaN(thr) && !isNaN(pwr) && !isNaN(thrst)) {
+            out.throttle.push(thr);
+            out.power.push(pwr);
+            out.eff.push(isNaN(eff) ? null : eff);
+            out.thrust.push(thrst);
+        }
+    }
+    if (out.power.length === 0) return {error: "No data rows"};
+    return out;
+}"""
+
+# Setup Finder form: input key -> element id
+SETUP_FINDER_FIELDS = {
+    "weight": "inAcAuw",
+    "wingspan": "inAcSpan",
+    "wing_area": "inGWingArea",
+    "speed": "inPerfSpeed",
+    "thrust": "inPerfThrust",
+    "flight_time": "inPerfTime",
+    "battery_cells": "inBS", 
+    "battery_voltage": "inBCellV",
+    "motors": "inGMotors",
+    "max_weight": "inMWeightMax",
+    "max_prop_diameter": "inPDiameter",
+    "prop_blades": "inPBlades",
+    "elevation": "inGElevation",
+    "temperature": "inGTemp",
+}
+
+# w2ui grid helpers for the Setup Finder result list
+GRID_FIND_JS = """() => {
+    if (typeof w2ui === 'undefined') return null;
+    var names = Object.keys(w2ui);
+    for (var i = 0; i < names.length; i++) {
+        var g = w2ui[names[i]];
+        if (g && Array.isArray(g.records) && Array.isArray(g.columns) && g.columns.length > 12) return names[i];
+    }
+    return null;
+}"""
+
+GRID_RECORD_COUNT_JS = """() => {
+    var name = (""" + GRID_FIND_JS + """)();
+    if (name) return w2ui[name].records.length;
+    return document.querySelectorAll('table tr[recid]').length;
+}"""
+
+GRID_INFO_JS = """() => {
+    var name = (""" + GRID_FIND_JS + """)();
+    if (!name) return null;
+    var g = w2ui[name];
+    return {name: name, loaded: g.records.length, total: g.total || g.records.length};
+}"""
+
+# Returns the col 12 metadata string for a slice of records, as it would appear in the cell's title
+GRID_RECORDS_JS = """(args) => {
+    var g = w2ui[args.name];
+    var col = g.columns[12];
+    var end = Math.min(g.records.length, args.offset + args.count);
+    var titles = [];
+    var tmp = document.createElement('div');
+    for (var i = args.offset; i < end; i++) {
+        var rec = g.records[i];
+        var val = null;
+        try {
+            if (typeof g.getCellValue === 'function') val = g.getCellValue(i, 12);
+        } catch (e) { val = null; }
+        if (val === null || val === undefined) val = rec[col.field];
+        if (val === null || val === undefined) continue;
+        val = String(val);
+        if (val.indexOf('<') !== -1) {
+            tmp.innerHTML = val;
+            var titled = tmp.querySelector('[title]');
+            val = titled ? titled.getAttribute('title') : tmp.textContent;
+        }
+        titles.push(val);
+    }
+    // next: where the following chunk starts (records without a col 12 value are skipped, not returned)
+    return {titles: titles, next: Math.max(end, args.offset), loaded: g.records.length, total: g.total || g.records.length};
+}"""
+
+DEFAULT_BASE_URL = "https://www.ecalc.ch"
+
+# Browser context settings shared by every way of starting a browser
+CONTEXT_OPTIONS = {
+    "viewport": {'width': 1366, 'height': 768},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+}
+
+class ECalAutomator:
+    def __init__(self, headless=False, profile_dir=None, batch_sweep=True, storage_state=None, session=None,
+                 session_check_ttl_s=300.0, block_resources=True, record_har=None, replay_har=None,
+                 base_url=None):
+        self.headless = headless
+        # Site root; ECALC_BASE_URL points every automator at e.g. the local fake_ecalc server
+        self.base_url = (base_url or os.getenv("ECALC_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        # HAR archive to record the whole session to (written when the context closes)
+        self.record_har = record_har
+        # HAR archive to serve every request from instead of the network (offline, repeatable runs)
+        self.replay_har = replay_har
+        # When the login was last confirmed; _ensure_session_valid skips checks within the TTL
+        self.session_state = SessionState(ttl_s=session_check_ttl_s)
+        # Optional session.SessionManager: shared browser + saved login, refreshed on every (re-)login
+        self.session = session
+        # Cookies/localStorage of an already logged-in context (dict or path); when set, a plain
+        # browser + context is used instead of the persistent profile so several can run at once
+        self.storage_state = storage_state
+        # Run the PropCalc speed sweep in a single page.evaluate instead of one round trip per speed
+        self.batch_sweep = batch_sweep
+        # Each concurrently running automator needs its own Chromium profile directory
+        self.profile_dir = profile_dir or os.path.join(os.getcwd(), "ecalc_session")
+        self.playwright = None
+        self.browser = None
+        self._chromium = None
+        self.page = None
+        self.logged_in_alert_seen = False
+        # Optional cache.PropCalcCache consulted before running PropCalc in the browser
+        self.result_cache = None
+        # Optional cache.SetupFinderCache of parsed Setup Finder result lists
+        self.setup_cache = None
+        # Blocks images/fonts/ads/analytics and serves eCalc's static JS/CSS from a local cache
+        # (not while recording/replaying, so the archive holds and serves every real response)
+        static_cache = None if (record_har or replay_har) else os.path.join(self.profile_dir, "static_cache")
+        self.resource_router = ResourceRouter(cache_dir=static_cache) if block_resources else None
+        # PropCalc field values last applied on self.page (element id -> value), see _apply_prop_calc_inputs
+        self._form_state = {}
+        # Optional callback(name, started, duration) receiving phase timings (perf_counter seconds)
+        self.phase_listener = None
+        # Process-wide tracer (see tracing.configure); a no-op unless a trace output was configured
+        self.tracer = tracing.get_tracer()
+
+    def _record_phase(self, name: str, started: float, duration: Optional[float] = None, **attrs):
+        """
+        Closes a phase timed by hand (for blocks too large to wrap in phase()). duration defaults to
+        "until now"; pass it for phases measured elsewhere, e.g. inside the page.
+        """
+        if duration is None:
+            duration = time.perf_counter() - started
+        self.tracer.record(name, started, duration, **attrs)
+        self._notify_phase(name, started, duration)
+
+    def _notify_phase(self, name: str, started: float, duration: float):
+        metrics.PHASE_DURATION.observe(duration, phase=name)
+        if self.phase_listener is not None:
+            try:
+                self.phase_listener(name, started, duration)
+            except Exception as e:
+                print(f"Phase listener failed for {name}: {e}")
+
+    @contextmanager
+    def phase(self, name: str, **attrs):
+        """Times the enclosed block as phase `name` and traces it as a span (attrs become span attributes)."""
+        started = time.perf_counter()
+        try:
+            with self.tracer.span(name, **attrs):
+                yield
+        finally:
+            self._notify_phase(name, started, time.perf_counter() - started)
+
+    def start(self):
+        with self.phase("browser_start"):
+            self._start()
+
+    def _start(self):
+        if self.session is not None and self.session.can_share_browser():
+            # Just a new context in the session's browser: tens of milliseconds instead of a browser launch
+            self.playwright = self.session.playwright
+            self.browser = self.session.new_context(**self._context_options())
+            self._install_routing()
+            self._attach_page(self.browser.new_page())
+            return
+
+        self.playwright = sync_playwright().start()
+        
+        if self.session is not None and self.storage_state is None:
+            self.storage_state = self.session.state
+        if self.storage_state is not None or self.session is not None:
+            self._chromium = self.playwright.chromium.launch(headless=self.headless)
+            self.browser = self._chromium.new_context(storage_state=self.storage_state, **self._context_options())
+            self._install_routing()
+            self._attach_page(self.browser.new_page())
+            return
+        
+        # Determine a profile directory to persist cookies/session
+        profile_path = self.profile_dir
+        if not os.path.exists(profile_path):
+            os.makedirs(profile_path)
+
+        # Launching a persistent context instead of a fresh browser every time
+        self.browser = self.playwright.chromium.launch_persistent_context(
+            profile_path,
+            headless=self.headless,
+            **self._context_options()
+        )
+        self._install_routing()
+        self._attach_page(self.browser.pages[0])
+
+    def _context_options(self) -> Dict[str, Any]:
+        options = dict(CONTEXT_OPTIONS)
+        if self.record_har:
+            print(f"Recording session to {self.record_har}")
+            options.update(record_har_path=self.record_har, record_har_content="embed", record_har_mode="full")
+        return options
+
+    def _install_routing(self):
+        if self.resource_router is not None:
+            try:
+                self.resource_router.install(self.browser)
+            except Exception as e:
+                print(f"Could not install resource routing: {e}")
+        if self.replay_har:
+            # Registered last so it is asked first; anything not in the archive is aborted, never fetched
+            print(f"Replaying session from {self.replay_har}")
+            self.browser.route_from_har(self.replay_har, not_found="abort")
+
+    def _attach_page(self, page):
+        self.page = page
+        self._form_state = {}
+        
+        # Add dialog handler for alerts (like "Already logged in")
+        def handle_dialog(dialog):
+            try:
+                msg = dialog.message.lower()
+                print(f"[Alert] {dialog.message}")
+                
+                # If it's the "Already logged in" alert
+                if "logged in" in msg or "angemeldet" in msg:
+                    self.logged_in_alert_seen = True
+                    time.sleep(1) # Brief pause
+                
+                try:
+                    dialog.accept()
+                except:
+                    try:
+                        dialog.dismiss()
+                    except:
+                        pass
+            except Exception as e:
+                pass
+            
+        self.page.on("dialog", handle_dialog)
+
+    def reset_page(self):
+        """Gives the next job a clean tab: closes the working page and opens a fresh one in the same context."""
+        old_page = self.page
+        self._attach_page(self.browser.new_page())
+        try:
+            if old_page and not old_page.is_closed():
+                old_page.close()
+        except: pass
+        self.logged_in_alert_seen = False
+
+    def is_alive(self):
+        """Cheap health check: the browser still answers and the working page is usable."""
+        try:
+            if not self.browser or not self.page or self.page.is_closed():
+                return False
+            return self.page.evaluate("1 + 1") == 2
+        except:
+            return False
+
+    def stop(self):
+        if self.browser:
+            self.browser.close()
+        if self._chromium:
+            self._chromium.close()
+        # A shared session browser (and its Playwright) is stopped by the SessionManager
+        if self.playwright and self.playwright is not getattr(self.session, "playwright", None):
+            self.playwright.stop()
+
+    def export_storage_state(self) -> Dict[str, Any]:
+        """Snapshot of the logged-in session (cookies + localStorage) to seed other automators."""
+        return self.browser.storage_state()
+
+    def login(self, email, password, check_existing=True):
+        with self.phase("login"):
+            logged_in = self._login(email, password, check_existing)
+        if logged_in:
+            self.session_state.confirm()
+        if logged_in and self.session is not None:
+            # Every later context (and the next run) starts from this session
+            try:
+                self.session.save_state(self.browser.storage_state())
+            except Exception as e:
+                print(f"Could not save session state: {e}")
+        return logged_in
+
+    def _login(self, email, password, check_existing=True):
+        self.email = email
+        self.password = password
+        self.logged_in_alert_seen = False # Reset
+        
+        # FIRST: Check if we are already logged in via persistent cookies
+        if check_existing:
+            print(f"Checking if session is already active...")
+            active = self._probe_session()
+            if active:
+                print("Session resumed from cookies.")
+                return True
+            if active is None:
+                # Probe inconclusive: look at the page itself
+                try:
+                    self.page.goto(f"{self.base_url}/motorcalc.php", timeout=30000)
+                    time.sleep(2)
+                    if self.page.locator("a:has-text('Logout')").count() > 0:
+                        print("Session resumed from cookies.")
+                        return True
+                except: pass
+                
+                # If we saw the alert during the check above, we are logged in.
+                if self.logged_in_alert_seen:
+                     print("Login alert detected during check. Session is active.")
+                     return True
+
+        print(f"Navigating to login page...")
+        try:
+            self.page.goto(f"{self.base_url}/calcmember/login.php", timeout=60000)
+            time.sleep(2)
+        except Exception as e:
+            print(f"Error navigating to login page: {e}")
+            return False
+            
+        # If already logged in (redirected)
+        if self.page.locator("a:has-text('Logout')").count() > 0 or "login.php" not in self.page.url:
+             if "login.php" not in self.page.url:
+                 print("Already logged in (Redirected).")
+                 return True
+            
+        print(f"Logging in as {email}...")
+        try:
+            # Dismiss cookies if they block
+            if self.page.locator(".cookieinfo-close").count() > 0:
+                 self.page.click(".cookieinfo-close")
+                 time.sleep(1)
+
+            self.page.fill("input[name='username']", email)
+            self.page.fill("input[name='password']", password)
+            
+            # Remember Me
+            try:
+                if self.page.locator("input[name='remember']").count() > 0:
+                    self.page.check("input[name='remember']")
+            except: pass
+            
+            # Submit
+            if self.page.locator("button:has-text('Login')").count() > 0:
+                self.page.click("button:has-text('Login')")
+            elif self.page.locator("input[type='submit']").count() > 0:
+                self.page.click("input[type='submit']")
+            else:
+                self.page.keyboard.press("Enter")
+            
+            try:
+                self.page.wait_for_load_state("networkidle", timeout=15000)
+            except: pass
+            time.sleep(5)
+            
+            if self.page.locator("a:has-text('Logout')").count() > 0 or "motorcalc.php" in self.page.url:
+                print("Login successful.")
+                return True
+            else:
+                print("WARNING: Login might have failed. (No Logout link found)")
+        except Exception as e:
+            print(f"Login error: {e}")
+        return False
+
+    def _probe_session(self):
+        """
+        Asks eCalc whether the context's cookies are still logged in, without touching the working page:
+        a GET of motorcalc.php through the context's request API that does not follow redirects.
+        Returns True/False, or None when the probe itself failed (network error, unexpected answer).
+        """
+        if self.replay_har:
+            # The request API bypasses routing, so it would reach the real site; the page check is used instead
+            return None
+        self.session_state.probes += 1
+        try:
+            resp = self.browser.request.get(f"{self.base_url}/motorcalc.php", max_redirects=0, timeout=10000)
+        except Exception as e:
+            print(f"Session probe failed: {e}")
+            return None
+        try:
+            if 300 <= resp.status < 400:
+                location = resp.headers.get("location", "")
+                return not ("login.php" in location or "loggedout" in location)
+            if resp.status != 200:
+                return None
+            body = resp.text()
+            if "Logout" in body:
+                return True
+            if "name='username'" in body or 'name="username"' in body:
+                return False
+            return None
+        finally:
+            try:
+                resp.dispose()
+            except: pass
+
+    def _ensure_session_valid(self):
+        """Checks if session is still valid and re-logs in if necessary."""
+        with self.phase("session_check"):
+            return self._check_session()
+
+    def _check_session(self):
+        """
+        Nothing is checked within session_state.ttl_s of the last confirmation; after that a cheap HTTP
+        probe decides. Only real evidence (login page shown, redirect to login.php) triggers a re-login.
+        """
+        try:
+            on_login_page = "login.php" in self.page.url or "loggedout" in self.page.url
+            if not on_login_page:
+                if self.session_state.is_fresh():
+                    return True
+                active = self._probe_session()
+                metrics.SESSION_PROBES.inc(result={True: "active", False: "expired"}.get(active, "unknown"))
+                if active is None:
+                    # No evidence either way; the next page action will tell
+                    return True
+                if active:
+                    self.session_state.confirm()
+                    return True
+            
+            print("Session invalid or Login page detected. Re-logging in...")
+            self.session_state.invalidate()
+            if self.session is not None:
+                # Workers started from now on must not be seeded with the dead storage_state;
+                # the re-login below saves a fresh one
+                self.session.invalidate()
+            self.session_state.relogins += 1
+            metrics.RELOGINS.inc()
+            return self.login(self.email, self.password, check_existing=False)
+        except Exception as e:
+            # print(f"Non-critical error checking session: {e}")
+            return True # Assume OK or will be caught by next action
+
+    def run_setup_finder(self, inputs: Dict[str, str], limit: int = 10) -> List[Dict[str, Any]]:
+        return list(self.iter_setup_finder(inputs, limit=limit))
+
+    def iter_setup_finder(self, inputs: Dict[str, str], limit: int = 10,
+                          setup_filter: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Producer mode of the Setup Finder: yields setups as they are parsed from the result grid.
+        setup_filter is applied inline and only matching setups count towards `limit`;
+        extraction stops as soon as `limit` matches were yielded.
+        """
+        query = self._setup_finder_query(inputs)
+        if self.setup_cache is not None:
+            entry = self.setup_cache.get(query)
+            metrics.CACHE_LOOKUPS.inc(cache="setup_finder", result="miss" if entry is None else "hit")
+            if entry is not None:
+                matches = [r for r in entry["rows"] if not setup_filter or setup_filter(r)]
+                # Enough matches, or the cached list is the whole grid: no need to touch the site
+                if len(matches) >= limit or entry["complete"]:
+                    print(f"Setup Finder cache hit ({len(entry['rows'])} cached rows, {len(matches)} matching).")
+                    metrics.SETUP_FINDER_RUNS.inc(source="cache")
+                    for data in matches[:limit]:
+                        yield dict(data)
+                    return
+                print("Setup Finder cache entry too small for this request. Running live search...")
+
+        with self.phase("setup_finder.submit"):
+            submitted = self._submit_setup_finder(inputs)
+        if not submitted:
+            return
+
+        rows = self._iter_results_from_grid_model()
+        from_grid_model = rows is not None
+        if rows is None:
+            print("w2ui grid model not available. Falling back to DOM scraping...")
+            rows = self._iter_results_from_dom()
+        source = "grid_model" if from_grid_model else "dom"
+        metrics.SETUP_FINDER_RUNS.inc(source=source)
+
+        raw_rows = []
+        exhausted = True
+        parsed = 0
+        found = 0
+        for data in rows:
+            parsed += 1
+            raw_rows.append(dict(data))
+            if setup_filter and not setup_filter(data):
+                continue
+            found += 1
+            yield data
+            if found >= limit:
+                print(f"Reached limit of {limit} results.")
+                exhausted = False
+                break
+        print(f"Total extracted: {found} valid setups ({parsed} parsed).")
+        metrics.SETUP_FINDER_ROWS.inc(parsed, source=source)
+
+        if self.setup_cache is not None:
+            # Keep reading so the cached list also serves larger future limits
+            # (cheap from the grid model; not worth minutes of DOM scrolling)
+            if from_grid_model and not exhausted and len(raw_rows) < self.setup_cache.min_rows:
+                exhausted = True
+                for data in rows:
+                    raw_rows.append(dict(data))
+                    metrics.SETUP_FINDER_ROWS.inc(source=source)
+                    if len(raw_rows) >= self.setup_cache.min_rows:
+                        exhausted = False
+                        break
+            try:
+                self.setup_cache.put(query, raw_rows, complete=exhausted)
+            except Exception as e:
+                print(f"Could not store Setup Finder results in cache: {e}")
+
+    def _setup_finder_query(self, inputs: Dict[str, str]) -> Dict[str, str]:
+        """The part of `inputs` that actually reaches the Setup Finder form (used as cache key)."""
+        return {k: v for k, v in inputs.items() if k in SETUP_FINDER_FIELDS or k in ("flight_plan", "wing_type")}
+
+    def _submit_setup_finder(self, inputs: Dict[str, str]) -> bool:
+        """Fills the Setup Finder form, runs the search and waits for the result grid."""
+        print("Running Setup Finder...")
+        fill_started = time.perf_counter()
+        self.page.goto(f"{self.base_url}/setupfinder.php")
+        # Patience: allow page to settle and any session alerts to fire
+        time.sleep(5)
+        self.page.wait_for_load_state("networkidle", timeout=10000)
+        
+        # Verify we are still on the right page (in case of redirection)
+        if "setupfinder.php" not in self.page.url:
+            print("Redirected from Setup Finder. Attempting to return...")
+            self.page.goto(f"{self.base_url}/setupfinder.php")
+            time.sleep(2)
+        self._record_phase("setup_finder.navigate", fill_started)
+
+        # Field Mapping
+        mapping = SETUP_FINDER_FIELDS
+
+        if "flight_plan" in inputs:
+             print(f"Selecting Flight Plan: {inputs['flight_plan']}")
+             try:
+                self.page.select_option("#inPerfMission", label=inputs["flight_plan"])
+                # Wait a bit for recommendations to settle
+                time.sleep(1)
+             except Exception as e:
+                print(f"Error selecting Flight Plan: {e}")
+
+        if "wing_type" in inputs:
+             try:
+                 self.page.wait_for_selector("#inAcWingTyp", timeout=5000)
+                 self.page.select_option("#inAcWingTyp", value=str(inputs["wing_type"]))
+             except Exception as e:
+                 print(f"Error selecting Wing Type: {e}")
+
+        # Fill text inputs (AFTER flight plan to avoid overwrite)
+        for key, val in inputs.items():
+            if key in mapping:
+                selector = f"#{mapping[key]}"
+                try:
+                    # Wait for each field to ensure they are ready
+                    self.page.wait_for_selector(selector, timeout=5000)
+                    print(f"Filling {key}: {val}")
+                    # Use sequence to ensure JS handlers triggers
+                    self.page.locator(selector).focus()
+                    self.page.fill(selector, str(val))
+                    self.page.locator(selector).press("Tab")
+                    time.sleep(0.1)
+                except Exception as e:
+                    print(f"Warning: Could not fill {key} ({selector}): {e}")
+
+        # Handle Interstitials (Cookies / Modals)
+        print("Checking for overlays...")
+        try:
+            # Cookies
+            if self.page.locator(".cookieinfo-close").count() > 0:
+                print("Closing Cookie Info...")
+                self.page.click(".cookieinfo-close")
+                time.sleep(0.5)
+                
+            # Modal Confirm (Terms/Upgrade)
+            if self.page.locator("#modalConfirm").is_visible():
+                print("Accepting Modal Confirm...")
+                self.page.click("#modalConfirmOk")
+                time.sleep(1)
+            # Generic retry for stability
+            self.page.wait_for_load_state("networkidle", timeout=5000)
+        except Exception as e:
+            # print(f"Error handling overlays: {e}")
+            pass
+
+        self._record_phase("setup_finder.fill", fill_started)
+
+        # Click Calculate/Search
+        print("Clicking Search...")
+        search_started = time.perf_counter()
+        clicked = False
+        try:
+            # Target the element with the onclick=calculate trigger
+            search_btn = self.page.locator("span[onclick*='calculate']").first
+            if search_btn.count() > 0:
+                print("Clicked calculate button")
+                search_btn.click()
+                clicked = True
+            elif self.page.locator("#btnFindSetup").count() > 0:
+                print("Clicked #btnFindSetup parent")
+                self.page.locator("#btnFindSetup").locator("xpath=..").click()
+                clicked = True
+            else:
+                print("Trying fallback submit button...")
+                btn = self.page.locator("button:has-text('Calculate'), input[type='submit']")
+                if btn.count() > 0:
+                    btn.first.click()
+                    clicked = True
+        except Exception as e:
+            print(f"Error clicking search: {e}")
+        self._record_phase("setup_finder.search", search_started)
+        
+        if not clicked:
+            print("Failed to click any search button. Dumping page.")
+            with open("debug_setupfinder_nobtn.html", "w", encoding="utf-8") as f:
+                f.write(self.page.content())
+            return False
+        
+        print("Waiting for results (up to 20s)...")
+        with self.phase("setup_finder.wait"):
+            self._wait_for_grid_results(timeout_s=20.0)
+        
+        # Verify if results are present in DOM
+        content = self.page.content()
+        if "recid" not in content:
+            print("WARNING: 'recid' not found in page content after 20s. Results might be empty or still loading.")
+            # Take a screenshot if possible? No, but we can dump HTML
+            with open("debug_setupfinder_noresults.html", "w", encoding="utf-8") as f:
+                f.write(content)
+        return True
+
+    def _wait_for_grid_results(self, timeout_s: float = 20.0, settle_s: float = 2.0):
+        """Waits until the result grid has rows and its record count stops growing (instead of a fixed 20s sleep)."""
+        deadline = time.time() + timeout_s
+        last_count = -1
+        stable_since = None
+        while time.time() < deadline:
+            try:
+                count = self.page.evaluate(GRID_RECORD_COUNT_JS)
+            except:
+                count = 0
+            if count and count > 0:
+                if count == last_count:
+                    if stable_since and time.time() - stable_since >= settle_s:
+                        return count
+                else:
+                    stable_since = time.time()
+                last_count = count
+            time.sleep(0.5)
+        return max(last_count, 0)
+
+    def _parse_setup_title(self, title: str):
+        """Parses the comma separated metadata (col 12 'title') of a Setup Finder row into a setup dict."""
+        if not title or "," not in title:
+            return None
+            
+        vals = [v.strip() for v in title.split(",")]
+        if len(vals) < 5: # Minimal: diam, pitch, manuf_id, motor_id, kv
+            return None
+        
+        # Robust Mapping using search from the end (since beginning is variable)
+        manuf_name = "Unknown"
+        manuf_idx = -1
+        # 1. Find Manufacturer (skipping version at -1 typically)
+        for j in range(len(vals)-1, 1, -1):
+            v_low = vals[j].lower()
+            # Known brands to help anchor the search
+            if any(brand in v_low for brand in ["t-motor", "sunnysky", "scorpion", "mad", "neu", "leo", "dual", "joker", "cobra", "antigravity", "u-series"]):
+                manuf_name = vals[j]
+                manuf_idx = j
+                break
+        
+        # 2. Find Drive Weight (first large numeric before manufacturer or from expected position)
+        drive_weight = "N/A"
+        if manuf_idx > 0:
+            for j in range(manuf_idx - 1, 0, -1):
+                v = vals[j]
+                if v.replace('.', '', 1).isdigit() and float(v) > 50:
+                    drive_weight = v
+                    break
+        if drive_weight == "N/A" and len(vals) >= 12:
+            # Fallback to standard position 11 (0-indexed)
+            v = vals[11]
+            if v.replace('.', '', 1).isdigit():
+                drive_weight = v
+        
+        # 3. Basic fields are usually at the beginning
+        motor_id = vals[3] if len(vals) > 3 else "Unknown"
+
+        data = {
+            "prop_diam": vals[0],
+            "prop_pitch": vals[1],
+            "manufacturer_id": vals[2],
+            "motor_id": motor_id,
+            "motor_kv": vals[4] if len(vals) > 4 else "?",
+            "motor_name": f"{manuf_name} {motor_id}" if manuf_name != "Unknown" else motor_id,
+            "manufacturer": manuf_name,
+            "drive_weight": drive_weight
+        }
+        return data
+
+    def _iter_results_from_grid_model(self):
+        """
+        Pulls the Setup Finder rows from w2ui[grid].records in large chunks (one evaluate each)
+        and parses them in Python. Returns None when no w2ui grid exists on the page.
+        """
+        try:
+            info = self.page.evaluate(GRID_INFO_JS)
+        except Exception as e:
+            print(f"Error reading w2ui grid: {e}")
+            return None
+        if not info:
+            return None
+        print(f"w2ui grid '{info['name']}': {info['loaded']} records loaded, total {info['total']}.")
+        return self._iter_grid_records(info["name"])
+
+    def _iter_grid_records(self, grid_name: str, chunk: int = 500) -> Iterator[Dict[str, Any]]:
+        seen_setups = set()  # Key: (motor_id, prop_diam, prop_pitch)
+        offset = 0
+        while True:
+            try:
+                with self.phase("setup_finder.extract"):
+                    batch = self.page.evaluate(GRID_RECORDS_JS, {"name": grid_name, "offset": offset, "count": chunk})
+            except Exception as e:
+                print(f"Error reading grid records at offset {offset}: {e}")
+                return
+
+            if offset >= batch["loaded"]:
+                # Everything loaded so far is consumed; ask the grid for more if it knows of more rows
+                if batch["loaded"] >= batch["total"]:
+                    return
+                if not self._load_more_grid_records(grid_name, batch["loaded"]):
+                    print(f"WARNING: grid reports {batch['total']} rows but only {batch['loaded']} could be loaded.")
+                    return
+                continue
+
+            offset = batch["next"]
+            print(f"Read {offset} of {batch['total']} grid records.")
+            for title in batch["titles"]:
+                data = self._parse_setup_title(title)
+                if data is None:
+                    continue
+                setup_key = (data["motor_id"], data["prop_diam"], data["prop_pitch"])
+                if setup_key in seen_setups:
+                    continue
+                seen_setups.add(setup_key)
+                yield data
+
+    def _load_more_grid_records(self, grid_name: str, loaded: int, timeout_s: float = 10.0) -> bool:
+        """Scrolls the grid to its end so w2ui fetches the next block; True if more records arrived."""
+        try:
+            self.page.evaluate("""(name) => {
+                var grid = w2ui[name];
+                var el = document.querySelector('#grid_' + name + '_records') || document.querySelector('.w2ui-grid-records');
+                if (el) el.scrollTop = el.scrollHeight;
+                if (grid && typeof grid.scroll === 'function') grid.scroll();
+            }""", grid_name)
+            self.page.wait_for_function(
+                "([name, loaded]) => w2ui[name] && w2ui[name].records.length > loaded",
+                arg=[grid_name, loaded], timeout=timeout_s * 1000)
+            return True
+        except:
+            return False
+
+    def _iter_results_from_dom(self) -> Iterator[Dict[str, Any]]:
+        """Legacy extraction: scrapes the rendered rows and scrolls the grid page by page."""
+        seen_setups = set()  # Key: (motor_id, prop_diam, prop_pitch)
+        
+        page_num = 1
+        empty_pages = 0
+        while True:
+            rows = self.page.locator("table tr[recid]").all() # recid only matches data rows
+            print(f"Page {page_num}: Found {len(rows)} potential result rows.")
+            
+            new_on_this_page = 0
+            for i, row in enumerate(rows):
+                # Extract metadata from the 'title' attribute of the cell with col="12"
+                metadata_cell = row.locator('td[col="12"] div')
+                if metadata_cell.count() == 0:
+                    continue
+                
+                title = metadata_cell.get_attribute("title")
+                if not title or "," not in title:
+                    continue
+                    
+                data = self._parse_setup_title(title)
+                if data is None:
+                    print(f"Skipping row {i}: too few metadata values")
+                    continue
+                
+                setup_key = (data["motor_id"], data["prop_diam"], data["prop_pitch"]) # Unique combination
+                if setup_key in seen_setups:
+                    continue
+
+                seen_setups.add(setup_key)
+                new_on_this_page += 1
+                yield data
+            
+            print(f"Extracted {new_on_this_page} new setups from page {page_num}.")
+                
+            # Scroll to load more results using Keyboard which triggers events better
+            print(f"Scrolling... (Page {page_num})")
+            try:
+                # 1. Focus the grid or body
+                if page_num == 1:
+                    try:
+                        # Try to click the last row to focus grid?
+                        if rows:
+                            rows[-1].click(timeout=1000)
+                        else:
+                            self.page.click(".w2ui-grid-records", timeout=1000)
+                    except:
+                        self.page.click("body")
+                
+                # 2. Press PageDown multiple times
+                for _ in range(5):
+                    self.page.keyboard.press("PageDown")
+                    time.sleep(0.1)
+                
+                # 3. JS Scroll Fallback
+                self.page.evaluate("""() => {
+                    var grid = document.querySelector('.w2ui-grid-records');
+                    if (grid) {
+                        grid.scrollTop += grid.clientHeight * 2;
+                    } else {
+                        window.scrollBy(0, window.innerHeight * 2);
+                    }
+                }""")
+                
+                # Wait for refresh
+                time.sleep(2.0)
+                
+            except Exception as e:
+                print(f"Error during scroll: {e}")
+                break
+            
+            page_num += 1
+            if new_on_this_page == 0:
+                 # consecutive empty scans
+                 empty_pages += 1
+                 print("No new items found after scroll. Trying 'End' key once...")
+                 self.page.keyboard.press("End")
+                 time.sleep(2)
+                 
+                 # Check strict staleness (the grid is exhausted after a few empty cycles)
+                 if empty_pages >= 3 or page_num > 100: break # Safety break
+            else:
+                 empty_pages = 0
+
+    def make_setup_filter(self, manufacturers: str = "all", target_diam: Optional[float] = None):
+        """
+        Builds the predicate used by the CLI: manufacturer OR-list (comma separated, or 'all')
+        matched against manufacturer/motor name, AND an exact prop diameter if given.
+        Returns None when nothing is filtered.
+        """
+        m_list = []
+        if manufacturers and manufacturers.lower() != "all":
+            m_list = [self._normalize_text(m) for m in manufacturers.split(",") if m.strip()]
+        if not m_list and not target_diam:
+            return None
+
+        def _matches(s: Dict[str, Any]) -> bool:
+            if m_list:
+                s_manuf = self._normalize_text(s.get("manufacturer", ""))
+                s_motor = self._normalize_text(s.get("motor_name", ""))
+                if not any(m in s_manuf or m in s_motor for m in m_list):
+                    return False
+            if target_diam:
+                d_val = self._parse_prop_diameter(s.get("prop_diam", ""))
+                if not self._matches_prop_diameter(d_val, target_diam):
+                    return False
+            return True
+
+        return _matches
+
+    def filter_setups(self, setups: List[Dict[str, Any]], target_diam: float, manufacturer: str) -> List[Dict[str, Any]]:
+        """
+        Fast filtering of motors based on Prop Diameter and Manufacturer.
+        - target_diam: e.g. 18.0 for "18x10.0"
+        - manufacturer: string to match in manufacturer or motor name (case insensitive)
+        """
+        filtered = []
+        clean_manuf = self._normalize_text(manufacturer)
+        
+        print(f"Filtering {len(setups)} setups for Diam~={target_diam} and Manuf='{manufacturer}'")
+        
+        for s in setups:
+            # 1. Filter by Manufacturer
+            s_manuf = self._normalize_text(s.get("manufacturer", ""))
+            s_motor = self._normalize_text(s.get("motor_name", ""))
+            if clean_manuf not in s_manuf and clean_manuf not in s_motor:
+                continue
+                
+            # 2. Filter by Diameter
+            # Format typically "18x10.0" or "18.0x..."
+            raw_diam = s.get("prop_diam", "")
+            d_val = self._parse_prop_diameter(raw_diam)
+            if d_val is None:
+                continue
+            if self._matches_prop_diameter(d_val, target_diam):
+                filtered.append(s)
+                
+        return filtered
+
+    def _normalize_text(self, text: str):
+        try:
+            return "".join([c for c in str(text).lower() if c.isalnum()])
+        except:
+            return ""
+
+    def _parse_prop_diameter(self, raw_diam: str):
+        try:
+            if not raw_diam:
+                return None
+            s = str(raw_diam).strip()
+            num = ""
+            for ch in s:
+                if ch.isdigit() or ch in [".", ","]:
+                    num += ch
+                else:
+                    if num:
+                        break
+            if not num:
+                return None
+            num = num.replace(",", ".")
+            return float(num)
+        except:
+            return None
+
+    def _matches_prop_diameter(self, d_val, target_diam):
+        try:
+            if d_val is None or target_diam is None:
+                return False
+            if abs(target_diam - round(target_diam)) < 0.01:
+                return int(d_val) == int(target_diam)
+            return abs(d_val - target_diam) < 0.1
+        except:
+            return False
+
+    def _select_manufacturer(self, manuf_id, manuf_name) -> bool:
+        """Selects the motor manufacturer and waits for the AJAX reload of the motor list."""
+        if not manuf_id and not manuf_name:
+            return False
+        print(f"Selecting Manufacturer: {manuf_id or ''} ({manuf_name})")
+        try:
+            change = self.page.evaluate(SELECT_MANUFACTURER_JS, {
+                "value": str(manuf_id) if manuf_id else None,
+                "label": manuf_name,
+            })
+            if not change.get("found"):
+                print(f"Manufacturer '{manuf_name}' ({manuf_id}) not found in list.")
+                return False
+            if not change.get("changed"):
+                return True
+            # The motor list is replaced once loadMotorTyps() returns
+            self.page.wait_for_function(
+                """(prev) => {
+                    var sel = document.getElementById('inMType');
+                    if (!sel || sel.options.length <= 1) return false;
+                    var sig = '';
+                    for (var i = 0; i < Math.min(sel.options.length, 5); i++) sig += sel.options[i].value + '|';
+                    return sig !== prev;
+                }""", arg=change.get("motor_signature", ""), timeout=8000)
+            return True
+        except Exception as e:
+            print(f"Manuf select error: {e}")
+            return False
+
+    def _build_prop_calc_form(self, setup_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Desired PropCalc form state as an ordered list of field specs for _apply_form_state.
+        kind "select" matches by exact label first, then (partial=True) by substring;
+        kind "input" sets the value. Order follows the page's dependencies (selects before inputs).
+        """
+        fields = []
+        motor_id = setup_data.get("motor_id")
+        motor_name = setup_data.get("motor_name")
+        if motor_id or motor_name:
+            fields.append({"id": "inMType", "kind": "motor", "want": motor_id or motor_name,
+                           "labels": [v for v in (motor_id, motor_name) if v],
+                           "kv": str(setup_data.get("motor_kv", "") or "")})
+        if "prop_type" in setup_data:
+            fields.append({"id": "inPType", "kind": "select", "want": setup_data["prop_type"], "partial": True})
+        fields.append({"id": "inEType", "kind": "select", "want": setup_data.get("esc", "max 100A"), "partial": True})
+        fields.append({"id": "inBCell", "kind": "select", "want": setup_data.get("battery_model", "LiPo 3300mAh - 45/60C"), "partial": True})
+        if "battery_charge_state" in setup_data:
+            fields.append({"id": "inBChargeState", "kind": "select", "want": setup_data["battery_charge_state"], "partial": False})
+        if "prop_diam" in setup_data:
+            fields.append({"id": "inPDiameter", "kind": "input", "want": str(setup_data["prop_diam"]).replace(",", ".")})
+        if "prop_pitch" in setup_data:
+            fields.append({"id": "inPPitch", "kind": "input", "want": str(setup_data["prop_pitch"]).replace(",", ".")})
+        if "weight" in setup_data:
+            fields.append({"id": "inGWeight", "kind": "input", "want": str(setup_data["weight"])})
+        if "battery_cells" in setup_data:
+            fields.append({"id": "inBS", "kind": "input", "want": str(setup_data["battery_cells"])})
+        if "bat_cap" in setup_data:
+            fields.append({"id": "inBCellCap", "kind": "input", "want": str(setup_data["bat_cap"]).replace(",", "."), "if_enabled": True})
+        if "bat_c" in setup_data:
+            fields.append({"id": "inBCcont", "kind": "input", "want": str(setup_data["bat_c"]).replace(",", "."), "if_enabled": True})
+        return fields
+
+    def _apply_form_state(self, fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Applies all field specs in one evaluate; returns {"chosen": {id: text}, "failed": [...]}."""
+        if not fields:
+            return {"chosen": {}, "failed": []}
+        try:
+            return self.page.evaluate(APPLY_FORM_JS, fields)
+        except Exception as e:
+            print(f"Error applying PropCalc form: {e}")
+            return {"chosen": {}, "failed": [{"id": f["id"], "want": f["want"], "reason": str(e)} for f in fields]}
+
+    def _apply_prop_calc_inputs(self, setup_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Brings the PropCalc form to the state setup_data needs, touching only the fields that differ from
+        what was last applied on this page. The remembered state is dropped whenever the document changed
+        (navigation, reload, new page), which is detected through a marker on window.
+        """
+        try:
+            if not self.page.evaluate(FORM_STATE_MARKER_JS):
+                self._form_state = {}
+        except:
+            self._form_state = {}
+
+        # 1. Manufacturer (the only field that needs an AJAX round trip: it reloads #inMType)
+        manuf_id = setup_data.get("manufacturer_id")
+        manuf_name = setup_data.get("manufacturer")
+        manuf_key = (str(manuf_id or ""), manuf_name or "")
+        if (manuf_id or manuf_name) and self._form_state.get("inMManufacturer") != manuf_key:
+            self._form_state.pop("inMManufacturer", None)
+            # A new motor list needs the motor selected again even if its name did not change
+            self._form_state.pop("inMType", None)
+            with self.phase("propcalc.form.manufacturer", manufacturer=manuf_name or manuf_id):
+                selected = self._select_manufacturer(manuf_id, manuf_name)
+            if selected:
+                self._form_state["inMManufacturer"] = manuf_key
+
+        # 2. Everything else in one evaluate
+        fields = self._build_prop_calc_form(setup_data)
+        field_value = lambda f: (f["want"], f.get("kv"))
+        todo = {f["id"] for f in fields if self._form_state.get(f["id"]) != field_value(f)}
+        if any(f["kind"] != "input" and f["id"] in todo for f in fields):
+            # Select handlers may rewrite dependent inputs, so those are sent along
+            todo.update(f["id"] for f in fields if f["kind"] == "input")
+        pending = [f for f in fields if f["id"] in todo]
+        if not pending:
+            print("PropCalc form already matches this setup.")
+            return {"chosen": {}, "failed": []}
+        print(f"Applying {len(pending)}/{len(fields)} PropCalc fields...")
+
+        with self.phase("propcalc.form.fields", fields=len(pending)):
+            applied = self._apply_form_state(pending)
+        failed_ids = set()
+        for f in applied.get("failed", []):
+            failed_ids.add(f["id"])
+            print(f"WARNING: Could not set {f['id']} to '{f['want']}': {f['reason']}")
+        for f in pending:
+            if f["id"] in failed_ids:
+                self._form_state.pop(f["id"], None)
+            else:
+                self._form_state[f["id"]] = field_value(f)
+        motor_choice = applied.get("chosen", {}).get("inMType")
+        if motor_choice:
+            print(f"Selected Motor: {motor_choice}")
+        return applied
+
+    def _install_calc_hook(self):
+        """Installs the page-side completion hook (idempotent; re-installed after every navigation)."""
+        try:
+            return self.page.evaluate(CALC_HOOK_JS)
+        except Exception as e:
+            print(f"Could not install calculation hook: {e}")
+            return False
+
+    def _calculate_and_wait(self, timeout_s: float = 10.0, watch: Optional[str] = None,
+                            previous: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Calls the page's calculate() and waits, inside the page, until the output spans
+        are final. One round trip; returns {"ready", "pout", "thrust"}.
+        With watch (a span id) the wait also lasts until that span moves off previous
+        or is rewritten by this calculation; "ready" is False if that never happens in time.
+        """
+        return self.page.evaluate(CALCULATE_AND_WAIT_JS,
+                                  {"timeoutMs": int(timeout_s * 1000), "watch": watch, "previous": previous})
+
+    def _run_speed_sweep_batched(self, speeds: List[int]):
+        """
+        Runs the whole thrust-vs-speed sweep inside the page: for each speed it sets the
+        input, calls calculate() and reads #outPFlightThrust synchronously.
+        Ends back at 0 km/h. Returns {speed: thrust_text} or None to fall back to the per-speed loop.
+        Each point is timed in the page (performance.now()) and recorded as a propcalc.speed_point phase.
+        """
+        try:
+            evaluated = time.perf_counter()
+            batch = self.page.evaluate("""(speeds) => {
+                var setSpeed = (""" + SET_FLIGHT_SPEED_JS + """);
+                var out = document.getElementById('outPFlightThrust');
+                if (!out || typeof calculate !== 'function') return null;
+                var res = {};
+                var timings = [];
+                var t0 = performance.now();
+                for (var i = 0; i < speeds.length; i++) {
+                    var started = performance.now();
+                    setSpeed(speeds[i]);
+                    calculate();
+                    res[String(speeds[i])] = (out.innerText || '').trim();
+                    timings.push({speed: speeds[i], start_ms: started - t0, ms: performance.now() - started});
+                }
+                setSpeed(0);
+                calculate();
+                return {thrust: res, timings: timings};
+            }""", speeds)
+        except Exception as e:
+            print(f"Batched speed sweep failed: {e}. Falling back to per-speed loop.")
+            return None
+
+        sweep = batch["thrust"] if batch else None
+        if not sweep:
+            print("Batched speed sweep unavailable on this page. Falling back to per-speed loop.")
+            return None
+
+        # If calculate() ever became asynchronous every read would return the same stale value
+        values = [v for v in sweep.values() if v and v != "-"]
+        if len(values) > 2 and len(set(values)) == 1:
+            print("Batched speed sweep returned identical values for every speed. Falling back to per-speed loop.")
+            return None
+        # Page clock offsets mapped onto perf_counter(); the evaluate round trip shifts them only slightly
+        for t in batch.get("timings") or []:
+            self._record_phase("propcalc.speed_point", evaluated + t["start_ms"] / 1000.0,
+                               duration=t["ms"] / 1000.0, speed_kmh=t["speed"])
+        return sweep
+
+    def empty_prop_calc_result(self, setup_data: Dict[str, Any]) -> Dict[str, str]:
+        """The result dict PropCalc starts from; also what a setup gets when its run fails entirely."""
+        return {
+            "motor": setup_data.get("motor_name", "Unknown"),
+            "motor_weight": "N/A",
+            "drive_weight": setup_data.get("drive_weight", "N/A"),
+            "manufacturer": setup_data.get("manufacturer", ""),
+            "prop_diam": setup_data.get("prop_diam", setup_data.get("max_prop_diameter", "?")), 
+            "prop_pitch": setup_data.get("prop_pitch", "?"),
+            "prop_blades": setup_data.get("prop_blades", "2"),
+            "power": "N/A",
+            "traction": "N/A"
+        }
+
+    @staticmethod
+    def prop_calc_order(setups: List[Dict[str, Any]]) -> List[int]:
+        """
+        Indices of setups grouped by manufacturer, then motor (otherwise stable), so that consecutive
+        PropCalc runs change as few form fields as possible - above all the manufacturer AJAX reload.
+        """
+        def _key(i):
+            s = setups[i]
+            return (str(s.get("manufacturer_id") or s.get("manufacturer") or "").lower(),
+                    str(s.get("motor_id") or s.get("motor_name") or "").lower())
+        return sorted(range(len(setups)), key=_key)
+
+    def run_prop_calc_batch(self, setups: List[Dict[str, Any]],
+                            on_result: Optional[Callable[[int, Dict[str, Any], Dict[str, Any]], None]] = None,
+                            should_stop: Optional[Callable[[], bool]] = None) -> List[Dict[str, str]]:
+        """
+        Runs PropCalc for every setup in prop_calc_order and returns the results in the caller's order.
+        on_result(index, setup, result) is called as each setup finishes. When should_stop() turns true
+        the batch ends before the next setup; setups not run yet are left as None.
+        """
+        results: List[Optional[Dict[str, str]]] = [None] * len(setups)
+        for i in self.prop_calc_order(setups):
+            if should_stop is not None and should_stop():
+                print("PropCalc batch stopped early.")
+                break
+            results[i] = self.run_prop_calc(setups[i])
+            if on_result:
+                on_result(i, setups[i], results[i])
+        return results
+
+    def run_prop_calc(self, setup_data: Dict[str, Any]) -> Dict[str, str]:
+        if self.result_cache is not None:
+            cached = self.result_cache.get(setup_data)
+            metrics.CACHE_LOOKUPS.inc(cache="propcalc", result="miss" if cached is None else "hit")
+            if cached is not None:
+                print(f"PropCalc cache hit for {setup_data.get('motor_name', 'Unknown')}.")
+                metrics.PROPCALC_CALLS.inc(outcome="cache_hit")
+                # The entry may have been calculated for another analyzed power
+                return rpm_table.apply_target_power(cached, setup_data.get("analyzed_power", 600))
+
+        started = time.perf_counter()
+        with self.phase("propcalc.total", motor=setup_data.get("motor_name", "Unknown")):
+            results = self._run_prop_calc_uncached(setup_data)
+        metrics.PROPCALC_DURATION.observe(time.perf_counter() - started)
+        if results.get("power", "N/A") == "N/A":
+            metrics.PROPCALC_CALLS.inc(outcome="na")
+        elif "Err" in results.values():
+            metrics.PROPCALC_CALLS.inc(outcome="err")
+        else:
+            metrics.PROPCALC_CALLS.inc(outcome="ok")
+
+        # Only complete calculations are worth remembering
+        if self.result_cache is not None and results.get("power", "N/A") != "N/A" and results.get("eff_max_throttle") != "Err":
+            try:
+                self.result_cache.put(setup_data, results)
+            except Exception as e:
+                print(f"Could not store PropCalc result in cache: {e}")
+        return results
+
+    def _run_prop_calc_uncached(self, setup_data: Dict[str, Any]) -> Dict[str, str]:
+        print(f"Running Prop Calc for {setup_data.get('motor_name', 'Unknown')}...")
+        
+        # Initialize results early so it's always available in except/return blocks
+        results = self.empty_prop_calc_result(setup_data)
+        print(f"DEBUG: results initialized: {results}")
+
+        for attempt in range(2):
+            if attempt:
+                metrics.PROPCALC_RETRIES.inc()
+            try:
+                # Ensure session is valid
+                if not self._ensure_session_valid():
+                    print(f"Failed to ensure session for {results['motor']}")
+                    continue
+                
+                # Navigate if not already on the right page
+                nav_started = time.perf_counter()
+                if "motorcalc.php" not in self.page.url:
+                    print(f"PropCalc attempt {attempt+1}: Navigating to motorcalc.php...")
+                    self.page.goto(f"{self.base_url}/motorcalc.php", timeout=60000)
+                    time.sleep(2)
+                
+                # Double check navigation (handle landing page redirects)
+                if "calcmember/index.php" in self.page.url or "calcmember/login.php" in self.page.url:
+                    print("On landing/login page. Attempting direct navigation to MotorCalc...")
+                    try:
+                        # Try clicking the link first as it often sets session cookies/state better than direct URL
+                        if self.page.locator("a[href*='motorcalc.php']").count() > 0:
+                            self.page.click("a[href*='motorcalc.php']")
+                        else:
+                            self.page.goto(f"{self.base_url}/motorcalc.php", timeout=60000)
+                        
+                        time.sleep(3)
+                        
+                        # Handle the Alert if it pops up again
+                        # The dialog handler should take care of it, but we might need to wait
+                    except Exception as e:
+                        print(f"Nav error: {e}")
+                
+                # If still on landing page, try force
+                if "calcmember" in self.page.url:
+                     print("Still on landing page. Forcing URL...")
+                     self.page.goto(f"{self.base_url}/motorcalc.php", wait_until="domcontentloaded")
+                     time.sleep(2)
+
+                # Check for form stability
+                try:
+                    self.page.wait_for_selector("#inMType", timeout=10000)
+                except:
+                    if "motorcalc.php" not in self.page.url:
+                         print(f"Not on motorcalc.php (URL: {self.page.url}). Retrying navigation...")
+                         self.page.goto(f"{self.base_url}/motorcalc.php")
+                    else:
+                         print("MotorCalc elements not found on page. Reloading...")
+                         self.page.reload()
+                    self.page.wait_for_selector("#inMType", timeout=15000)
+
+                # Completion events instead of polling the output spans
+                self._install_calc_hook()
+                self._record_phase("propcalc.navigate", nav_started, attempt=attempt + 1)
+
+                # Manufacturer, motor, prop, ESC, battery, weight... (only what changed since the last setup)
+                with self.phase("propcalc.form"):
+                    self._apply_prop_calc_inputs(setup_data)
+
+                # TRIGGER CALCULATION
+                print("Triggering Calculation...")
+                # We use JS directly because the button selector is elusive.
+                # The page-side hook resolves as soon as the outputs are final (max 15s).
+                with self.phase("propcalc.calculate"):
+                    calc_success = self._calculate_and_wait(timeout_s=15.0).get("ready", False)
+                 
+                if calc_success:
+                    # A finished calculation is proof enough that we are still logged in
+                    self.session_state.confirm()
+                else:
+                    print("Calculation failed (Results timed out or empty). Proceeding with weight extraction...")
+                    # return {"power": "N/A", "traction": "N/A", "motor": setup_data.get("motor_name")}
+                
+                # Update results from PropCalc page
+                try:
+                    # Power: User expects Max Power (Input) usually. 
+                    # outMaxWin is max electrical power in. outOptWin is optimal.
+                    pwr_selectors = ["#outMaxWin", "#outOptWin", "#outTotPout"]
+                    for sel in pwr_selectors:
+                        if self.page.locator(sel).count() > 0:
+                            val = self.page.locator(sel).inner_text().strip()
+                            if val and val != "-" and val != "0":
+                                results["power"] = val
+                                break
+                    
+                    # Mass (Drive Weight/Massa GMP): outTotDriveWeight is the most accurate
+                    if self.page.locator("#outTotDriveWeight").count() > 0:
+                        results["drive_weight"] = self.page.locator("#outTotDriveWeight").inner_text().strip()
+                except: pass
+                
+                # Double check Diam/Pitch from input if they are '?' or missing in setup_data
+                if results.get("prop_diam") in ["?", None]:
+                    try:
+                        results["prop_diam"] = self.page.locator("#inPDiameter").input_value()
+                    except: pass
+                if results.get("prop_pitch") in ["?", None]:
+                    try:
+                        results["prop_pitch"] = self.page.locator("#inPPitch").input_value()
+                    except: pass
+
+
+                # 1. Motor Weight
+                try:
+                    # eCalc IDs: outMWeight (calculated weight of motor), or from setup finder input
+                    if self.page.locator("#outMWeight").count() > 0:
+                        results["motor_weight"] = self.page.locator("#outMWeight").inner_text().strip()
+                    elif self.page.locator("#inMWeight").count() > 0:
+                         results["motor_weight"] = self.page.locator("#inMWeight").input_value().strip()
+                    else:
+                        results["motor_weight"] = "N/A"
+                except:
+                    results["motor_weight"] = "N/A"
+
+                # 2. Power (already extracted above)
+                
+                # 3. Speed Sweep (0 to 135 step 9)
+                # Static Traction (Speed 0) - usually calculated at speed 0 input
+                # Ensure input is 0 first? defaulting usually 0.
+                def _set_flight_speed_kmh(v):
+                    try:
+                        self.page.evaluate("(v) => (" + SET_FLIGHT_SPEED_JS + ")(v)", v)
+                    except:
+                        try:
+                            self.page.fill("#inPSpeed", str(v))
+                        except:
+                            pass
+                
+                speeds = list(range(0, 136, 9)) # 0, 9, 18 ... 135
+                
+                print(f"Running Speed Sweep: {speeds} km/h")
+                # Fast path: the whole sweep in one page.evaluate (also leaves the page at 0 km/h)
+                with self.phase("propcalc.speed_sweep", points=len(speeds)):
+                    sweep = self._run_speed_sweep_batched(speeds) if self.batch_sweep else None
+                if sweep is not None:
+                    for v in speeds:
+                        results[f"traction_{v}"] = sweep.get(str(v), "N/A")
+                else:
+                    try:
+                        thrust_before = self.page.inner_text("#outPFlightThrust").strip()
+                    except Exception:
+                        thrust_before = None
+                    for v in speeds:
+                        try:
+                            # Set speed, then trigger the calculation and wait until the flight thrust
+                            # is this point's, not the one left over from the previous speed
+                            with self.phase("propcalc.speed_point", speed_kmh=v):
+                                _set_flight_speed_kmh(v)
+                                calc = self._calculate_and_wait(timeout_s=10.0, watch="outPFlightThrust",
+                                                                previous=thrust_before)
+                            trac = calc.get("thrust")
+                            if trac is not None:
+                                thrust_before = trac
+                            if calc.get("ready") and trac is not None:
+                                results[f"traction_{v}"] = trac
+                            else:
+                                print(f"Timed out waiting for the thrust at {v} km/h")
+                                results[f"traction_{v}"] = "N/A"
+                        except Exception as ev:
+                            print(f"Error at speed {v}: {ev}")
+                            results[f"traction_{v}"] = "Error"
+                
+                # 4. Efficiency Analysis (Parse #rpmTable)
+                # Set speed to 0 for static efficiency calculations (the batched sweep already ends at 0)
+                if sweep is None:
+                    try:
+                        _set_flight_speed_kmh(0)
+                        self._calculate_and_wait(timeout_s=10.0)
+                        print("Speed set to 0 for efficiency analysis")
+                    except Exception as e:
+                        print(f"Error setting speed to 0: {e}")
+                
+                # Ensure table is visible and populated
+                efficiency_started = time.perf_counter()
+                try:
+                    self.page.wait_for_selector("#rpmTable tr", timeout=5000)
+                    self.page.wait_for_function("""() => {
+                        var table = document.getElementById('rpmTable');
+                        if (!table) return false;
+                        var trs = table.getElementsByTagName('tr');
+                        if (!trs || trs.length < 3) return false;
+                        var cells = trs[2].getElementsByTagName('td');
+                        if (!cells || cells.length < 9) return false;
+                        var pwr = (cells[6].innerText || '').trim();
+                        var thr = (cells[3].innerText || '').trim();
+                        var thrust = (cells[8].innerText || '').trim();
+                        return pwr && pwr !== '-' && thr && thr !== '-' && thrust && thrust !== '-';
+                    }""", timeout=8000)
+                except:
+                    print("Efficiency Table (#rpmTable) not found or slow.")
+                
+                target_power = setup_data.get("analyzed_power", 600)
+                
+                try:
+                    table = self.page.evaluate(RPM_TABLE_JS)
+                    if "error" not in table:
+                        # The whole table is kept, so other analyzed powers never need another browser run
+                        results["rpm_table"] = table
+                        results.update(rpm_table.summarize(table, target_power))
+                        try:
+                            print(f"Eff @~{target_power}W: pwr={results.get('power_at_eff')}W thr={results.get('thr_at_power')}% thrust={results.get('thrust_at_power')}g (mode={results.get('eff_at_power_mode')}, Δ={results.get('eff_closest_power_diff')}, rows={results.get('eff_row_count')}, range={min(table['power'])}..{max(table['power'])})")
+                        except:
+                            pass
+                    else:
+                        print(f"Efficiency table unusable: {table['error']}")
+                        results["eff_max_throttle"] = "Err"
+                        results["eff_at_power"] = "Err"
+                        results["thr_at_power"] = "Err"
+                        results["thrust_at_power"] = "Err"
+                        
+                except Exception as e:
+                    print(f"Error extracting efficiency table: {e}")
+                    results["eff_max_throttle"] = "Err"
+                    results["eff_at_power"] = "Err"
+
+                self._record_phase("propcalc.efficiency", efficiency_started)
+                return results
+                
+            except Exception as e:
+                print(f"Error in PropCalc (Attempt {attempt+1}): {e}")
+                # The form may be half-applied; start from scratch on the next attempt
+                self._form_state = {}
+                # ... (retry logic)
+                if self._ensure_session_valid():
+                    continue 
+                if attempt == 1:
+                     try:
+                        with open("debug_propcalc_error.html", "w", encoding="utf-8") as f:
+                            f.write(self.page.content())
+                     except: pass
+                     return results
+                     
+        return results
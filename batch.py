@@ -0,0 +1,131 @@
+import csv
+import itertools
+import json
+import os
+import re
+from typing import Any, Dict, List
+
+from cache import canonical_key
+
+# Everything that changes the Setup Finder result list; configurations that agree on all of
+# these share one Setup Finder run (ESC, battery model, analyzed power... only affect PropCalc)
+AIRFRAME_KEYS = [
+    "weight", "wingspan", "wing_area", "speed", "thrust", "max_motor_weight_pct", "battery_cells",
+    "flight_plan", "flight_time", "elevation", "max_prop_diameter", "prop_blades", "limit",
+    "manufacturers_filter", "target_diam_filter",
+]
+
+
+# Everything else PropCalc is fed; configurations that differ only in analyzed_power share the
+# calculations too (the at-power values are interpolated from the stored #rpmTable)
+PROPCALC_KEYS = AIRFRAME_KEYS + ["esc_model", "battery_model", "battery_charge_state", "prop_type"]
+
+
+def _coerce(value: Any, default: Any) -> Any:
+    """Gives CSV/YAML strings the type of the matching default_settings.json value."""
+    if not isinstance(value, str) or default is None or isinstance(default, str):
+        return value
+    text = value.strip().replace(",", ".")
+    try:
+        if isinstance(default, bool):
+            return text.lower() in ("1", "true", "yes", "y")
+        if isinstance(default, int):
+            f = float(text)
+            return int(f) if f == int(f) else f
+        if isinstance(default, float):
+            return float(text)
+    except ValueError:
+        pass
+    return value
+
+
+def _normalize(cfg: Dict[str, Any], defaults: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: _coerce(v, defaults.get(k)) for k, v in cfg.items()}
+    manufacturers = out.get("manufacturers_filter", "all")
+    if isinstance(manufacturers, (list, tuple)):
+        manufacturers = ", ".join(str(m) for m in manufacturers)
+    out["manufacturers_filter"] = manufacturers or "all"
+    diam = out.get("target_diam_filter")
+    if isinstance(diam, str):
+        diam = None if diam.strip().lower() in ("", "all") else float(diam.replace(",", "."))
+    out["target_diam_filter"] = diam
+    return out
+
+
+def _read_document(path: str) -> Any:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            text = f.read()
+        delimiter = ";" if text.splitlines()[0].count(";") > text.splitlines()[0].count(",") else ","
+        # Empty cells fall back to the defaults
+        return [{k.strip(): v for k, v in row.items() if k and v not in (None, "")}
+                for row in csv.DictReader(text.splitlines(), delimiter=delimiter)]
+    with open(path, "r", encoding="utf-8") as f:
+        if ext in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML batch files need PyYAML (pip install pyyaml); use JSON or CSV otherwise")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def load_matrix(path: str, defaults: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Expands a batch file into complete configurations (defaults < base < configuration < matrix).
+    JSON/YAML: a list of configurations, or
+        {"base": {...}, "configurations": [{...}, ...], "matrix": {"analyzed_power": [400, 600, 800], ...}}
+    where every configuration is combined with every point of the matrix (cartesian product).
+    CSV: one configuration per row, columns named like the default_settings.json keys.
+    """
+    doc = _read_document(path)
+    if isinstance(doc, list):
+        doc = {"configurations": doc}
+    if not isinstance(doc, dict):
+        raise ValueError(f"{path}: expected a list of configurations or a mapping with base/configurations/matrix")
+
+    base = doc.get("base") or {}
+    configurations = doc.get("configurations") or [{}]
+    matrix = doc.get("matrix") or {}
+    axes = [(k, v if isinstance(v, list) else [v]) for k, v in matrix.items()]
+
+    configs = []
+    for conf in configurations:
+        for point in itertools.product(*(values for _, values in axes)):
+            cfg = {**defaults, **base, **conf, **{k: v for (k, _), v in zip(axes, point)}}
+            configs.append(_normalize(cfg, defaults))
+    return configs
+
+
+def airframe_key(cfg: Dict[str, Any]) -> str:
+    return canonical_key(cfg, AIRFRAME_KEYS)
+
+
+def propcalc_key(cfg: Dict[str, Any]) -> str:
+    return canonical_key(cfg, PROPCALC_KEYS)
+
+
+def varied_keys(configs: List[Dict[str, Any]]) -> List[str]:
+    """Keys whose value differs between configurations, in first-seen order."""
+    keys = []
+    for cfg in configs:
+        for k in cfg:
+            if k not in keys and len({json.dumps(c.get(k), sort_keys=True) for c in configs}) > 1:
+                keys.append(k)
+    return keys
+
+
+def spreadsheet_name(cfg: Dict[str, Any], varied: List[str]) -> str:
+    """
+    "P600 - N20.csv" like a single run, plus the values that tell this configuration apart from the
+    others in the batch (e.g. "P600 - N20 - max 100A.csv"). A "name" key overrides it.
+    """
+    if cfg.get("name"):
+        name = str(cfg["name"])
+    else:
+        parts = [f"P{cfg.get('analyzed_power')} - N{cfg.get('limit')}"]
+        parts += [str(cfg[k]) for k in varied if k not in ("analyzed_power", "limit", "name") and cfg.get(k) is not None]
+        name = " - ".join(parts)
+    name = re.sub(r'[\\/:*?"<>|]+', "_", name)
+    return name if name.lower().endswith(".csv") else name + ".csv"
@@ -0,0 +1,218 @@
+"""
+End-to-end benchmark of ECalAutomator: Setup Finder + PropCalc against a local or replayed backend.
+
+    python benchmarks/bench_e2e.py                                  # in-process fake_ecalc server
+    python benchmarks/bench_e2e.py --backend har --har run.har      # replay a recorded session
+    python benchmarks/bench_e2e.py --baseline benchmarks/results/base.json --threshold 0.15
+
+Reports p50/p95/p99 per phase (browser start, login, Setup Finder fill/wait/extract, PropCalc form,
+calculation, speed points, efficiency table) plus overall setups/minute, and writes everything to
+JSON. With --baseline, exits with status 1 when setups/minute or a phase p50 regressed by more
+than --threshold.
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from automation import ECalAutomator
+from fake_ecalc import FakeECalcServer
+
+SETUP_FINDER_INPUTS = {
+    "weight": "18000",
+    "wingspan": "3900",
+    "wing_area": "190.3",
+    "speed": "20",
+    "thrust": "5000",
+    "battery_cells": "6",
+    "wing_type": "0",
+    "flight_plan": "3D - heavy",
+}
+
+PROPCALC_EXTRAS = {
+    "esc": "max 100A",
+    "battery_model": "LiPo 3300mAh - 45/60C",
+    "weight": 18000,
+    "analyzed_power": 600,
+    "battery_cells": 6,
+    "battery_charge_state": "cheia",
+    "prop_type": "APC Electric E",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile (values need not be sorted)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    return {
+        name: {
+            "count": len(vals),
+            "total_s": round(sum(vals), 4),
+            "mean_s": round(sum(vals) / len(vals), 4),
+            "p50_s": round(percentile(vals, 50), 4),
+            "p95_s": round(percentile(vals, 95), 4),
+            "p99_s": round(percentile(vals, 99), 4),
+        }
+        for name, vals in sorted(samples.items()) if vals
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def load_credentials() -> Dict[str, str]:
+    with open(os.path.join(ROOT, "credentials.json"), "r") as f:
+        return json.load(f)
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    samples: Dict[str, List[float]] = defaultdict(list)
+
+    def on_phase(name, started, duration):
+        samples[name].append(duration)
+
+    server = None
+    base_url = None
+    creds = {"email": "bench@example.com", "password": "bench"}
+    if args.backend == "fake":
+        server = FakeECalcServer(port=0, latency_s=args.latency, calc_busy_ms=args.calc_ms, rows=args.rows,
+                                 seed=args.seed).start()
+        base_url = server.url
+    else:
+        creds = load_credentials()
+
+    wall_started = time.perf_counter()
+    setups_done = 0
+    errors = 0
+    try:
+        for run in range(args.runs):
+            # Throwaway profile: never touch (or lock) the user's ecalc_session profile and static cache
+            profile = tempfile.TemporaryDirectory(prefix="ecalc_bench_")
+            auto = ECalAutomator(headless=not args.headed, base_url=base_url, profile_dir=profile.name,
+                                 batch_sweep=not args.per_speed, replay_har=args.har if args.backend == "har" else None)
+            auto.phase_listener = on_phase
+            try:
+                auto.start()
+                auto.login(creds["email"], creds["password"])
+
+                with auto.phase("setup_finder.total"):
+                    setups = auto.run_setup_finder(dict(SETUP_FINDER_INPUTS), limit=args.setups)
+                samples["setup_finder.rows"].append(float(len(setups)))
+
+                for setup in setups:
+                    setup.update(PROPCALC_EXTRAS)
+                    res = auto.run_prop_calc(setup)
+                    setups_done += 1
+                    if res.get("power", "N/A") == "N/A" or res.get("eff_max_throttle") == "Err":
+                        errors += 1
+            finally:
+                auto.stop()
+                profile.cleanup()
+    finally:
+        if server is not None:
+            server.stop()
+    wall_s = time.perf_counter() - wall_started
+
+    rows = samples.pop("setup_finder.rows", [])
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "backend": args.backend, "runs": args.runs, "setups": args.setups, "rows": args.rows,
+            "latency_s": args.latency, "calc_ms": args.calc_ms, "har": args.har, "per_speed": args.per_speed,
+        },
+        "wall_s": round(wall_s, 3),
+        "setups": setups_done,
+        "setup_finder_rows": rows,
+        "error_results": errors,
+        "setups_per_minute": round(setups_done / wall_s * 60.0, 2) if wall_s else 0.0,
+        "phases": summarize(samples),
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Human readable regressions of `result` against `baseline` (empty when within threshold)."""
+    regressions = []
+    base_rate = baseline.get("setups_per_minute", 0.0)
+    if base_rate and result["setups_per_minute"] < base_rate * (1.0 - threshold):
+        regressions.append(f"setups/minute {result['setups_per_minute']} < baseline {base_rate}")
+    for name, stats in result["phases"].items():
+        base = baseline.get("phases", {}).get(name)
+        # Sub-millisecond phases are all noise
+        if not base or base["p50_s"] < 0.001:
+            continue
+        if stats["p50_s"] > base["p50_s"] * (1.0 + threshold):
+            regressions.append(f"{name} p50 {stats['p50_s']}s > baseline {base['p50_s']}s")
+    return regressions
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"\n{'phase':<24}{'n':>6}{'p50 s':>10}{'p95 s':>10}{'p99 s':>10}{'total s':>10}")
+    for name, st in result["phases"].items():
+        print(f"{name:<24}{st['count']:>6}{st['p50_s']:>10.3f}{st['p95_s']:>10.3f}{st['p99_s']:>10.3f}{st['total_s']:>10.2f}")
+    print(f"\n{result['setups']} setups in {result['wall_s']:.1f}s -> {result['setups_per_minute']} setups/minute "
+          f"({result['error_results']} incomplete results)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end ECalAutomator benchmark")
+    parser.add_argument("--backend", choices=["fake", "har", "live"], default="fake")
+    parser.add_argument("--har", help="HAR archive to replay (--backend har)")
+    parser.add_argument("--runs", type=int, default=1, help="Full browser start -> PropCalc cycles")
+    parser.add_argument("--setups", type=int, default=10, help="Setups taken from the Setup Finder per run")
+    parser.add_argument("--rows", type=int, default=500, help="Setup Finder rows served by the fake backend")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake backend response latency (s)")
+    parser.add_argument("--calc-ms", type=int, default=5, help="Fake backend cost per calculate() (ms)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--headed", action="store_true", help="Show the browser")
+    parser.add_argument("--per-speed", action="store_true",
+                        help="Run the speed sweep one calculation per round trip instead of in one page.evaluate")
+    parser.add_argument("--output", help="JSON file for the results (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative slowdown vs the baseline")
+    args = parser.parse_args()
+    if args.backend == "har" and not args.har:
+        parser.error("--backend har needs --har FILE")
+
+    result = run_benchmark(args)
+    print_report(result)
+
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{result['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"\nREGRESSIONS (threshold {args.threshold:.0%}):")
+            for r in regressions:
+                print(f"  - {r}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (threshold {args.threshold:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Bump when run_prop_calc changes what it extracts, so stale entries stop matching
+PROPCALC_CACHE_VERSION = 2
+
+# Every setup_data key that changes what the browser calculates. analyzed_power is not one of them:
+# results carry the whole #rpmTable and the at-power values are re-derived from it (rpm_table.py)
+PROPCALC_KEY_FIELDS = [
+    "manufacturer_id", "manufacturer", "motor_id", "motor_name", "motor_kv",
+    "prop_diam", "prop_pitch", "prop_type", "prop_blades",
+    "esc", "battery_model", "battery_cells", "battery_charge_state",
+    "weight", "elevation", "bat_cap", "bat_c",
+]
+
+
+def _canonical_value(val: Any) -> str:
+    s = str(val).strip().replace(",", ".")
+    try:
+        f = float(s)
+        # "20", "20.0" and 20 all hash the same
+        return repr(int(f)) if f == int(f) else repr(f)
+    except (ValueError, OverflowError):
+        return " ".join(s.lower().split())
+
+
+def canonical_key(data: Dict[str, Any], fields) -> str:
+    canonical = {k: _canonical_value(data[k]) for k in fields if data.get(k) not in (None, "")}
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PropCalcCache:
+    """
+    Content-addressed on-disk cache of run_prop_calc results (SQLite).
+    Keyed by the canonical set of inputs that affect the result; entries expire after ttl_s
+    or when PROPCALC_CACHE_VERSION changes. Safe to share between worker threads.
+    """
+    def __init__(self, path: str, ttl_s: float = 30 * 24 * 3600, version: int = PROPCALC_CACHE_VERSION):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS propcalc_cache (
+                key TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                created REAL NOT NULL,
+                result TEXT NOT NULL
+            )""")
+            self._conn.commit()
+
+    def key_for(self, setup_data: Dict[str, Any]) -> str:
+        return canonical_key(setup_data, PROPCALC_KEY_FIELDS)
+
+    def get(self, setup_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = self.key_for(setup_data)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, created, result FROM propcalc_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or row[0] != self.version or (self.ttl_s and time.time() - row[1] > self.ttl_s):
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[2])
+
+    def put(self, setup_data: Dict[str, Any], result: Dict[str, Any]):
+        key = self.key_for(setup_data)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO propcalc_cache (key, version, created, result) VALUES (?, ?, ?, ?)",
+                (key, self.version, time.time(), json.dumps(result, ensure_ascii=False)))
+            self._conn.commit()
+            self.stores += 1
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM propcalc_cache WHERE version != ? OR created < ?",
+                (self.version, time.time() - self.ttl_s if self.ttl_s else 0))
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SetupFinderCache:
+    """
+    Persistent cache of parsed Setup Finder result lists (SQLite), keyed by a normalized hash of
+    the mapped form values plus flight plan/wing type. Least recently used entries are evicted
+    beyond max_entries. Entries keep at least min_rows rows so larger future limits still hit.
+    """
+    def __init__(self, path: str, ttl_s: float = 24 * 3600, max_entries: int = 200, min_rows: int = 1000):
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.min_rows = min_rows
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("""CREATE TABLE IF NOT EXISTS setup_finder_cache (
+                key TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                complete INTEGER NOT NULL,
+                rows TEXT NOT NULL
+            )""")
+            self._conn.commit()
+
+    def key_for(self, query: Dict[str, Any]) -> str:
+        return canonical_key(query, sorted(query.keys()))
+
+    def get(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Returns {"rows": [...], "complete": bool} or None. complete means the grid had no more rows."""
+        key = self.key_for(query)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created, complete, rows FROM setup_finder_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl_s and now - row[0] > self.ttl_s):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE setup_finder_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return {"rows": json.loads(row[2]), "complete": bool(row[1])}
+
+    def put(self, query: Dict[str, Any], rows, complete: bool):
+        key = self.key_for(query)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO setup_finder_cache (key, created, last_used, complete, rows) VALUES (?, ?, ?, ?, ?)",
+                (key, now, now, int(complete), json.dumps(list(rows), ensure_ascii=False)))
+            # LRU eviction
+            self._conn.execute(
+                "DELETE FROM setup_finder_cache WHERE key NOT IN "
+                "(SELECT key FROM setup_finder_cache ORDER BY last_used DESC LIMIT ?)", (self.max_entries,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResultLRU:
+    """
+    In-memory LRU of finished API results, keyed by the canonical request key.
+    Entries expire after ttl_s; each carries an ETag derived from its content so clients can
+    revalidate with If-None-Match.
+    """
+    def __init__(self, max_entries: int = 128, ttl_s: float = 900.0):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def etag_for(value: Any) -> str:
+        payload = json.dumps(value, sort_keys=True, ensure_ascii=False)
+        return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns {"value", "etag", "created"} or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl_s and time.time() - entry["created"] > self.ttl_s):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, value: Any) -> str:
+        entry = {"value": value, "etag": self.etag_for(value), "created": time.time()}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry["etag"]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "entries": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
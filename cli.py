@@ -1,470 +1,820 @@
-import sys
-import time
-import json
-import csv
-import os
-import argparse
-from rich.console import Console
-from rich.prompt import Prompt, IntPrompt, FloatPrompt
-from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.panel import Panel
-from rich import print as rprint
-
-from automation import ECalAutomator
-
-console = Console()
-
-def get_resource_base():
-    if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
-        return sys._MEIPASS
-    return os.path.dirname(os.path.abspath(__file__))
-
-def get_output_dir():
-    path = os.path.dirname(os.path.abspath(__file__))
-    os.makedirs(path, exist_ok=True)
-    return path
-
-def load_credentials():
-    email = os.getenv("ECALC_EMAIL")
-    password = os.getenv("ECALC_PASSWORD")
-    if email and password:
-        return {"email": email, "password": password}
-    candidates = [
-        os.path.join(get_output_dir(), "credentials.json"),
-        os.path.join(get_resource_base(), "credentials.json"),
-    ]
-    for path in candidates:
-        try:
-            with open(path, "r") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            continue
-    console.print(f"[red]credentials.json not found in {candidates}![/red]")
-    sys.exit(1)
-
-def main():
-    os.system('cls')
-    console.clear()
-    
-    # Parse Arguments
-    parser = argparse.ArgumentParser(description="eCalc Automation Tool")
-    parser.add_argument("-A", "--auto", action="store_true", help="Run automatically with default/last settings")
-    args = parser.parse_args()
-    
-    # Header
-    console.print(Panel.fit(
-        "[bold cyan]eCalc Automation Tool[/bold cyan]\n"
-        "[dim]Automated Setup Finder & PropCalc Extraction[/dim]",
-        border_style="cyan"
-    ))
-    
-    # Load Default Settings
-    base_dir = get_resource_base()
-    defaults = {}
-    try:
-        path = os.path.join(base_dir, "default_settings.json")
-        with open(path, "r", encoding="utf-8") as f:
-            defaults = json.load(f)
-    except FileNotFoundError:
-        # Fallback defaults if file missing
-        defaults = {
-            "weight": 18000, "wingspan": 3900, "wing_area": 190.3, "speed": 1, "thrust": 5000,
-            "battery_cells": 6, "limit": 1, "esc_model": "max 90A", 
-            "battery_model": "LiPo 3300mAh - 45/60C", "flight_plan": "3D - heavy",
-            "flight_time": 3, "elevation": 650, "max_prop_diameter": 20,
-            "prop_blades": 2, "max_motor_weight_pct": 6, "close_browser": "y",
-            "analyzed_power": 600, "battery_charge_state": "cheia", "prop_type": "APC Electric E"
-        }
-
-    # Helper function to get input or default
-    def get_input(prompt_cls, msg, key, default_val=None, **kwargs):
-        val = defaults.get(key, default_val)
-        if args.auto:
-            return val
-        return prompt_cls.ask(msg, default=val, **kwargs)
-
-    # Inputs
-    rprint("[bold yellow]\nSTEP 1: Flight Configuration[/bold yellow]")
-    if args.auto:
-        rprint("[cyan]Running in AUTOMATIC mode (-A). Using default values...[/cyan]")
-    
-    weight = get_input(IntPrompt, "   [green]Total Weight (g)[/green]", "weight", 18000)
-    wingspan = get_input(IntPrompt, "   [green]Wingspan (mm)[/green]", "wingspan", 3900)
-    wing_area = get_input(FloatPrompt, "   [green]Wing Area (dm²)[/green]", "wing_area", 190.3)
-    
-    flight_plan = get_input(Prompt, "   [green]Flight Plan[/green]", "flight_plan", "3D - heavy")
-    flight_time = get_input(IntPrompt, "   [green]Flight Time (min)[/green]", "flight_time", 3)
-    elevation = get_input(IntPrompt, "   [green]Elevation (m)[/green]", "elevation", 650)
-    
-    speed = get_input(IntPrompt, "   [green]Desired Speed (km/h)[/green]", "speed", 1)
-    thrust = get_input(IntPrompt, "   [green]Desired Thrust (g)[/green]", "thrust", 5000)
-
-    max_motor_weight_pct = get_input(IntPrompt, "   [green]Max Motor Weight (%)[/green]", "max_motor_weight_pct", 6)
-    analyzed_power = get_input(IntPrompt, "   [green]Analyzed Power (W)[/green]", "analyzed_power", 600)
-    battery_cells = get_input(IntPrompt, "   [green]Battery Cells (S)[/green]", "battery_cells", 6)
-    
-    battery_charge_state = get_input(Prompt, "   [green]Battery Charge State[/green]", "battery_charge_state", "cheia", choices=["cheia", "normal", "baixa"])
-    
-    max_prop_diameter = get_input(IntPrompt, "   [green]Max Prop Diameter (inch)[/green]", "max_prop_diameter", 20)
-    prop_blades = get_input(IntPrompt, "   [green]Prop Blades[/green]", "prop_blades", 2)
-    prop_type = get_input(Prompt, "   [green]Prop Type[/green]", "prop_type", "APC Electric E")
-    
-    limit = get_input(IntPrompt, "   [green]Max Setups to Analyze[/green]", "limit", 1)
-    esc_model = get_input(Prompt, "   [green]ESC Model[/green]", "esc_model", "max 90A")
-    battery_model = get_input(Prompt, "   [green]Battery Model[/green]", "battery_model", "LiPo 3300mAh - 45/60C")
-    close_browser = get_input(Prompt, "   [green]Close Browser after finish?[/green]", "close_browser", "y", choices=["y", "n"])
-
-    # Manufacturer Filter
-    default_manuf = ", ".join(defaults.get("manufacturers_filter", ["T-Motor", "SunnySky", "Scorpion"]))
-    if args.auto:
-        manuf_filter_str = default_manuf
-    else:
-        manuf_filter_str = Prompt.ask("   [green]Manufacturer Filter (comma sep, or 'all')[/green]", default=default_manuf)
-    
-    # Prop Diameter Filter (Exact Match)
-    target_diam_filter = None
-    if not args.auto:
-        diam_input = Prompt.ask("   [green]Target Prop Diameter Filter (e.g. 18, or 'all')[/green]", default="all")
-        if diam_input.lower() != "all":
-            try:
-                target_diam_filter = float(diam_input)
-            except ValueError:
-                rprint("[red]Invalid diameter. Ignoring filter.[/red]")
-
-    # Confirmation
-    rprint("\n[bold]Configuration Summary:[/bold]")
-    if args.auto:
-        confirm = "y"
-    
-    rprint(f" • Weight: {weight}g")
-    rprint(f" • Wingspan: {wingspan}mm")
-    rprint(f" • Area: {wing_area}dm²")
-    rprint(f" • Flight Plan: {flight_plan}")
-    rprint(f" • Flight Time: {flight_time}min")
-    rprint(f" • Elevation: {elevation}m")
-    rprint(f" • Speed: {speed}km/h")
-    rprint(f" • Thrust: {thrust}g")
-    rprint(f" • Max Motor Weight: {max_motor_weight_pct}%")
-    rprint(f" • Analyzed Power: {analyzed_power}W")
-    rprint(f" • Battery: {battery_cells}S")
-    rprint(f" • Charge State: {battery_charge_state}")
-    rprint(f" • Max Prop: {max_prop_diameter}\"")
-    rprint(f" • Blades: {prop_blades}")
-    rprint(f" • Prop Type: {prop_type}")
-    rprint(f" • Limit: {limit} motors")
-    rprint(f" • ESC: {esc_model}")
-    rprint(f" • Battery Model: {battery_model}")
-    rprint(f" • Close Browser: {'Yes' if close_browser == 'y' else 'No'}")
-    rprint(f" • Manufacturers Info: {manuf_filter_str}")
-    rprint(f" • Diam Filter: {target_diam_filter if target_diam_filter else 'ALL'}")
-    
-    if not args.auto:
-        if not Prompt.ask("\n[bold]Ready to calculate?[/bold]", choices=["y", "n"], default="y") == "y":
-            console.print("[red]Aborted.[/red]")
-            sys.exit(0)
-
-    # Initialize Automation
-    os.system('cls')
-    console.clear()
-    console.print("\n[bold yellow]STEP 2: Automation[/bold yellow]")
-    
-    auto = ECalAutomator(headless=False)
-    
-    try:
-        with Progress(
-            SpinnerColumn("dots", style="bold cyan"),
-            TextColumn("[progress.description]{task.description}"),
-            console=console
-        ) as progress:
-            
-            task = progress.add_task("Initializing Browser...", total=None)
-            auto.start()
-            
-            creds = load_credentials()
-            progress.update(task, description=f"Logging in as {creds['email']}...")
-            auto.login(creds['email'], creds['password'])
-            
-            progress.update(task, description="Running Setup Finder (this takes ~10s)...")
-            inputs = {
-                "weight": str(weight),
-                "wingspan": str(wingspan),
-                "wing_area": str(wing_area),
-                "speed": str(speed),
-                "thrust": str(thrust),
-                "max_weight": str(max_motor_weight_pct),
-                "battery_cells": str(battery_cells),
-                "wing_type": "Monoplano",
-                "flight_plan": flight_plan,
-                "flight_time": str(flight_time),
-                "elevation": str(elevation),
-                "max_prop_diameter": str(max_prop_diameter),
-                "prop_blades": str(prop_blades)
-            }
-            # Run Setup Finder
-            # Note: The run_setup_finder method prints to stdout, which might interfere with rich progress
-            # Ideally we capture it, but for now we let it mix or run fast.
-            # We run it outside the progress context if we want to stream its logs, 
-            # or we accept that it might be silent.
-            # Actually, `automation.py` uses simple print(). Let's just run it.
-            
-            # Extract a larger pool if filtering is active, otherwise at least 'limit'
-            # If we want detailed filtering, we likely want to scrape MORE results to find the diamonds
-            extraction_limit = max(1000, limit * 5) if (manuf_filter_str.lower() != "all" or target_diam_filter) else max(50, limit)
-            setup_results = auto.run_setup_finder(inputs, limit=extraction_limit)
-            
-            # FILTER RESULTS
-            if manuf_filter_str.lower() != "all" or target_diam_filter:
-                # Use the fast filtering algorithm
-                filtered = []
-                
-                # Retrieve manufacturers as list
-                m_list = [m.strip() for m in manuf_filter_str.split(",") if m.strip()]
-                if not m_list and manuf_filter_str.lower() != "all":
-                     m_list = [manuf_filter_str] # fallback
-                
-                # Apply filter for each manufacturer (OR logic for manufacturers)
-                # But filter_setups takes ONE manufacturer string. We can iterate.
-                
-                if not m_list: # No manuf filter, just diameter
-                     filtered = auto.filter_setups(setup_results, target_diam_filter if target_diam_filter else -1, "")
-                else:
-                    for m in m_list:
-                        # If diameter is None, pass -1 or similar to ignore it in filter_setups?
-                        # I need to update filter_setups to handle optional diameter?
-                        # Actually filter_setups implementation I wrote checks:
-                        # if abs(d_val - target_diam) < 0.1:
-                        # So if target_diam is passed as -1, it checks abs...
-                        
-                        # Let's refine the logic:
-                        # We used auto.filter_setups(setups, target_diam, manufacturer)
-                        # The implementation does AND logic (Diam AND Manuf).
-                        pass
-                        
-                    # Let's do a custom loop here to be safe leveraging the method or just inline logic?
-                    # The user explicitly asked for "find and make a fast algorithm".
-                    # I should use the one in automation.py or refine it.
-                    
-                    # Let's use it. We can handle the "All" case.
-                    # Actually, let's keep it simple here.
-                    
-                    for s in setup_results:
-                        # Manuf Check
-                        pass_manuf = False
-                        if manuf_filter_str.lower() == "all":
-                            pass_manuf = True
-                        else:
-                            s_manuf = auto._normalize_text(s.get("manufacturer", ""))
-                            s_motor = auto._normalize_text(s.get("motor_name", ""))
-                            for m in m_list:
-                                m_norm = auto._normalize_text(m)
-                                if m_norm in s_manuf or m_norm in s_motor:
-                                    pass_manuf = True
-                                    break
-                        
-                        # Diam Check
-                        pass_diam = False
-                        if not target_diam_filter:
-                            pass_diam = True
-                        else:
-                            raw_diam = s.get("prop_diam", "")
-                            try:
-                                d_val = auto._parse_prop_diameter(raw_diam)
-                                if auto._matches_prop_diameter(d_val, target_diam_filter):
-                                    pass_diam = True
-                            except: pass
-                            
-                        if pass_manuf and pass_diam:
-                            filtered.append(s)
-
-                setup_results = filtered
-                progress.console.print(f"[dim]Filtered results to {len(setup_results)} setups based on filters.[/dim]")
-            
-            progress.update(task, description=f"Found {len(setup_results)} setups. Processing Top {limit} in PropCalc...")
-            
-            final_results = []
-            top_setups = setup_results[:limit]
-            
-            # Save Run Data (Inputs + Setups)
-            run_data = {
-                "configuration": {
-                    "weight": weight,
-                    "wingspan": wingspan,
-                    "wing_area": wing_area,
-                    "speed": speed,
-                    "thrust": thrust,
-                    "max_motor_weight_pct": max_motor_weight_pct,
-                    "analyzed_power": analyzed_power,
-                    "battery_cells": battery_cells,
-                    "battery_charge_state": battery_charge_state,
-                    "esc_model": esc_model,
-                    "battery_model": battery_model,
-                    "flight_plan": flight_plan,
-                    "flight_time": flight_time,
-                    "elevation": elevation,
-                    "max_prop_diameter": max_prop_diameter,
-                    "prop_blades": prop_blades,
-                    "prop_type": prop_type
-                },
-                "setups_to_analyze": top_setups
-            }
-            
-            try:
-                output_dir = get_output_dir()
-                with open(os.path.join(output_dir, "last_run_data.json"), "w", encoding="utf-8") as f:
-                    json.dump(run_data, f, indent=4, ensure_ascii=False)
-                console.print(f"[dim]Saved run data to '{output_dir}\\last_run_data.json'[/dim]")
-            except Exception as e:
-                console.print(f"[red]Failed to save run data: {e}[/red]")
-            
-            for i, setup in enumerate(top_setups):
-                motor_name = setup.get("motor_name", "Unknown")
-                setup["esc"] = esc_model
-                setup["battery_model"] = battery_model
-                setup["weight"] = weight
-                setup["analyzed_power"] = analyzed_power
-                setup["battery_cells"] = battery_cells
-                setup["battery_charge_state"] = battery_charge_state
-                setup["prop_type"] = prop_type
-                progress.update(task, description=f"Analyzing Motor {i+1}/{len(top_setups)}: [cyan]{motor_name}[/cyan]")
-                
-                pc_res = auto.run_prop_calc(setup)
-                
-                # Merge ALL results from PropCalc into a single dictionary
-                combined = {
-                    "motor": motor_name,
-                    "kv": setup.get("motor_kv", "?"),
-                    "manufacturer": setup.get("manufacturer", ""),
-                    "prop": f"{setup.get('prop_diam', '?')}x{setup.get('prop_pitch', '?')}",
-                    **pc_res # Spread all keys from pc_res (power, traction_v, effs, motor_weight etc)
-                }
-                final_results.append(combined)
-
-        # Display Results
-        console.print("\n[bold yellow]STEP 3: Results[/bold yellow]")
-        
-        from rich import box
-        table = Table(show_header=True, header_style="bold magenta", box=box.SIMPLE_HEAD)
-        table.add_column("Marca", no_wrap=True)
-        table.add_column("Motor", no_wrap=True)
-        table.add_column("Helice", no_wrap=True)
-        table.add_column("Passo", no_wrap=True)
-        table.add_column("Massa (g)")
-        table.add_column("Pwr (W)", style="bold cyan")
-        table.add_column("Eff Max(%)", style="bold yellow")
-        table.add_column("Eff Pwr(%)", style="bold yellow")
-        table.add_column("Thrst @Pwr(g)", style="dim")
-        table.add_column("Trac(0kmh)", style="bold green")
-        
-        console.print(f"[dim]Debug: Preparing table for {len(final_results)} motors...[/dim]")
-        for res in final_results:
-            # Debug log to verify data presence
-            # console.print(f"[dim]Data for {res.get('motor')}: Power={res.get('power')}, Weight={res.get('motor_weight')}[/dim]")
-            
-            row = [
-                res.get("manufacturer", ""),
-                res.get("motor", "Unknown"),
-                str(res.get("prop_diam", "?")),
-                str(res.get("prop_pitch", "?")),
-                res.get("drive_weight", res.get("motor_weight", "N/A")),
-                res.get("power", "N/A"),
-                res.get("eff_max_throttle", "N/A"),
-                res.get("eff_at_power", "N/A"),
-                res.get("thrust_at_power", "N/A"),
-                res.get("traction_0", "N/A")
-            ]
-            table.add_row(*row)
-            
-        console.print(table)
-        console.print("[dim]Note: Full speed sweep results (0-135km/h) are available in the CSV/Planilha.[/dim]")
-        
-        # Save to CSV (Planilhas)
-        try:
-            output_dir = get_output_dir()
-            plan_dir = os.path.join(output_dir, "Planilhas")
-            if not os.path.exists(plan_dir):
-                os.makedirs(plan_dir)
-                
-            filename = os.path.join(plan_dir, f"P{analyzed_power} - N{limit}.csv")
-            
-            with open(filename, "w", newline="", encoding="utf-8-sig") as f:
-                writer = csv.writer(f, delimiter=";", quoting=csv.QUOTE_MINIMAL)
-                
-                # Dynamic Header based on User Request
-                # marca, motor, preco, massa[g], link, diametro, passo, pa, Throttle100Pot[W], Throttle100tracao0[g], T100tracao9...
-                
-                header = [
-                    "marca", "motor", "preco", "massa[g]", "link", 
-                    "diametro", "passo", "pa", 
-                    "Throttle100Pot[W]", "Throttle100tracao0[g]"
-                ]
-                
-                # Dynamic Speed Columns (T100tracao{v}) - skipping 0 as it is already above
-                speeds = list(range(9, 136, 9)) 
-                for v in speeds:
-                    header.append(f"T100tracao{v}")
-                    
-                header.append("Throttle100Ef[%]")
-                
-                # Approx Power Columns
-                p_label = f"Pot≈{analyzed_power}"
-                header.extend([
-                    f"{p_label}Throttle[%]",
-                    f"{p_label}Pot[W]",
-                    f"{p_label}Ef[%]",
-                    f"{p_label}Tracao[g]"
-                ])
-                    
-                writer.writerow(header)
-                
-                # Rows
-                for res in final_results:
-                    # Use Drive Weight for "massa[g]" as requested
-                    weight_val = res.get("drive_weight", "N/A")
-                    if weight_val == "N/A":
-                         weight_val = res.get("motor_weight", "N/A")
-
-                    row = [
-                        res.get("manufacturer", ""),
-                        res.get("motor", "Unknown"),
-                        "", # preco
-                        weight_val, # massa[g]
-                        "", # link
-                        str(res.get("prop_diam", "?")),
-                        str(res.get("prop_pitch", "?")),
-                        str(res.get("prop_blades", "2")), # pa
-                        res.get("power", "N/A"), # Throttle100Pot[W]
-                        res.get("traction_0", "N/A"), # Throttle100tracao0[g]
-                    ]
-                    
-                    # Speed columns
-                    for v in speeds:
-                        row.append(res.get(f"traction_{v}", "N/A"))
-                        
-                    row.append(res.get("eff_max_throttle", "N/A")) # Throttle100Ef[%]
-                    
-                    # Analyzed Power columns
-                    row.append(res.get("thr_at_power", "N/A"))
-                    row.append(res.get("power_at_eff", "N/A"))
-                    row.append(res.get("eff_at_power", "N/A"))
-                    row.append(res.get("thrust_at_power", "N/A"))
-                    
-                    writer.writerow(row)
-                    
-            console.print(f"\n[bold green]Results saved to spreadsheet:[/bold green] {filename}")
-            
-        except Exception as ex:
-             console.print(f"[red]Failed to save spreadsheet: {ex}[/red]")
-        
-    except Exception as e:
-        console.print(f"[bold red]An error occurred:[/bold red] {e}")
-    finally:
-        if 'close_browser' in locals() and close_browser == 'n':
-            console.print("\n[bold yellow]Browser is open. Press Enter to close and exit...[/bold yellow]")
-            input()
-        
-        console.print("\n[dim]Closing browser...[/dim]")
-        auto.stop()
-
-if __name__ == "__main__":
-    main()
+import sys
+import time
+import json
+import csv
+import os
+import argparse
+from rich.console import Console
+from rich.prompt import Prompt, IntPrompt, FloatPrompt
+from rich.table import Table
+from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.panel import Panel
+from rich import print as rprint
+
+from automation import ECalAutomator, DEFAULT_BASE_URL
+from parallel import ParallelPropCalc
+from cache import PropCalcCache, SetupFinderCache
+from session import SessionManager
+import tracing
+from batch import load_matrix, airframe_key, propcalc_key, varied_keys, spreadsheet_name
+import rpm_table
+from spreadsheets import read_spreadsheet
+from journal import RunJournal, journal_path, is_complete
+from results_store import ResultStore, SORTABLE, export_rows
+
+console = Console()
+
+def get_resource_base():
+    if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
+        return sys._MEIPASS
+    return os.path.dirname(os.path.abspath(__file__))
+
+def get_output_dir():
+    path = os.path.dirname(os.path.abspath(__file__))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def load_credentials():
+    email = os.getenv("ECALC_EMAIL")
+    password = os.getenv("ECALC_PASSWORD")
+    if email and password:
+        return {"email": email, "password": password}
+    candidates = [
+        os.path.join(get_output_dir(), "credentials.json"),
+        os.path.join(get_resource_base(), "credentials.json"),
+    ]
+    for path in candidates:
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            continue
+    console.print(f"[red]credentials.json not found in {candidates}![/red]")
+    sys.exit(1)
+
+def save_run_data(configuration, setups):
+    run_data = {
+        "configuration": configuration,
+        "setups_to_analyze": setups
+    }
+    try:
+        output_dir = get_output_dir()
+        with open(os.path.join(output_dir, "last_run_data.json"), "w", encoding="utf-8") as f:
+            json.dump(run_data, f, indent=4, ensure_ascii=False)
+    except Exception as e:
+        console.print(f"[red]Failed to save run data: {e}[/red]")
+
+def main():
+    os.system('cls')
+    console.clear()
+    
+    # Parse Arguments
+    parser = argparse.ArgumentParser(description="eCalc Automation Tool")
+    parser.add_argument("-A", "--auto", action="store_true", help="Run automatically with default/last settings")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the PropCalc/Setup Finder caches and recalculate everything")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of browser pages running PropCalc in parallel")
+    parser.add_argument("--record-har", metavar="FILE", help="Record the whole browser session to a HAR archive")
+    parser.add_argument("--replay-har", metavar="FILE", help="Serve the session from a recorded HAR archive (no network)")
+    parser.add_argument("--trace", metavar="FILE", help="Write a Chrome trace (chrome://tracing, Perfetto) of every phase")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Run every configuration of a JSON/YAML/CSV matrix (e.g. analyzed_power x esc_model) in one session")
+    parser.add_argument("--powers", metavar="W[,W...]",
+                        help="Also write spreadsheets for these analyzed powers (e.g. 400,600,800) from the same calculations")
+    parser.add_argument("--from-run", metavar="FILE",
+                        help="Skip the Setup Finder and analyze the setups stored in a run data file (e.g. last_run_data.json)")
+    parser.add_argument("--esc", help="With --from-run: ESC model instead of the stored one")
+    parser.add_argument("--battery", help="With --from-run: battery model instead of the stored one")
+    parser.add_argument("--power", type=int, help="With --from-run: analyzed power (W) instead of the stored one")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from its journal (Planilhas/<name>.journal.jsonl) and only analyze the remaining setups")
+    parser.add_argument("--otlp", metavar="URL", help="Export trace spans to an OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces")
+    commands = parser.add_subparsers(dest="command")
+    query = commands.add_parser("query", help="Search the results of every past run (Planilhas/*.csv)")
+    query.add_argument("--manufacturer", help="Exact manufacturer, e.g. T-Motor")
+    query.add_argument("--motor", help="Part of the motor name, e.g. MN505")
+    query.add_argument("--diam", type=float, help="Prop diameter (inches)")
+    query.add_argument("--pitch", type=float, help="Prop pitch (inches)")
+    query.add_argument("--blades", type=int, help="Prop blades")
+    query.add_argument("--power", type=float, help="Analyzed power (W) of the run")
+    query.add_argument("--config", metavar="HASH", help="Configuration hash (prefix) of the run")
+    query.add_argument("--min-eff", type=float, help="Minimum efficiency at the analyzed power (%%)")
+    query.add_argument("--sort", default="eff_at_power", choices=SORTABLE, help="Column to rank by (default: eff_at_power)")
+    query.add_argument("--asc", action="store_true", help="Lowest first instead of highest")
+    query.add_argument("--distinct", action="store_true", help="Only the best row per motor + prop across runs")
+    query.add_argument("--top", type=int, default=20, help="Number of rows (0 = all)")
+    query.add_argument("--export", metavar="FILE", help="Also write the rows to FILE (.csv or .json)")
+    query.add_argument("--reimport", action="store_true", help="Re-read every spreadsheet, not just new/changed ones")
+    args = parser.parse_args()
+
+    if args.command == "query":
+        run_query(args)
+        return
+    
+    # Header
+    console.print(Panel.fit(
+        "[bold cyan]eCalc Automation Tool[/bold cyan]\n"
+        "[dim]Automated Setup Finder & PropCalc Extraction[/dim]",
+        border_style="cyan"
+    ))
+    
+    # Load Default Settings
+    base_dir = get_resource_base()
+    defaults = {}
+    try:
+        path = os.path.join(base_dir, "default_settings.json")
+        with open(path, "r", encoding="utf-8") as f:
+            defaults = json.load(f)
+    except FileNotFoundError:
+        # Fallback defaults if file missing
+        defaults = {
+            "weight": 18000, "wingspan": 3900, "wing_area": 190.3, "speed": 1, "thrust": 5000,
+            "battery_cells": 6, "limit": 1, "esc_model": "max 90A", 
+            "battery_model": "LiPo 3300mAh - 45/60C", "flight_plan": "3D - heavy",
+            "flight_time": 3, "elevation": 650, "max_prop_diameter": 20,
+            "prop_blades": 2, "max_motor_weight_pct": 6, "close_browser": "y",
+            "analyzed_power": 600, "battery_charge_state": "cheia", "prop_type": "APC Electric E"
+        }
+
+    if args.batch:
+        run_batch(args, defaults)
+        return
+    if args.from_run:
+        run_from_file(args, defaults)
+        return
+
+    # Helper function to get input or default
+    def get_input(prompt_cls, msg, key, default_val=None, **kwargs):
+        val = defaults.get(key, default_val)
+        if args.auto:
+            return val
+        return prompt_cls.ask(msg, default=val, **kwargs)
+
+    # Inputs
+    rprint("[bold yellow]\nSTEP 1: Flight Configuration[/bold yellow]")
+    if args.auto:
+        rprint("[cyan]Running in AUTOMATIC mode (-A). Using default values...[/cyan]")
+    
+    weight = get_input(IntPrompt, "   [green]Total Weight (g)[/green]", "weight", 18000)
+    wingspan = get_input(IntPrompt, "   [green]Wingspan (mm)[/green]", "wingspan", 3900)
+    wing_area = get_input(FloatPrompt, "   [green]Wing Area (dm²)[/green]", "wing_area", 190.3)
+    
+    flight_plan = get_input(Prompt, "   [green]Flight Plan[/green]", "flight_plan", "3D - heavy")
+    flight_time = get_input(IntPrompt, "   [green]Flight Time (min)[/green]", "flight_time", 3)
+    elevation = get_input(IntPrompt, "   [green]Elevation (m)[/green]", "elevation", 650)
+    
+    speed = get_input(IntPrompt, "   [green]Desired Speed (km/h)[/green]", "speed", 1)
+    thrust = get_input(IntPrompt, "   [green]Desired Thrust (g)[/green]", "thrust", 5000)
+
+    max_motor_weight_pct = get_input(IntPrompt, "   [green]Max Motor Weight (%)[/green]", "max_motor_weight_pct", 6)
+    analyzed_power = get_input(IntPrompt, "   [green]Analyzed Power (W)[/green]", "analyzed_power", 600)
+    battery_cells = get_input(IntPrompt, "   [green]Battery Cells (S)[/green]", "battery_cells", 6)
+    
+    battery_charge_state = get_input(Prompt, "   [green]Battery Charge State[/green]", "battery_charge_state", "cheia", choices=["cheia", "normal", "baixa"])
+    
+    max_prop_diameter = get_input(IntPrompt, "   [green]Max Prop Diameter (inch)[/green]", "max_prop_diameter", 20)
+    prop_blades = get_input(IntPrompt, "   [green]Prop Blades[/green]", "prop_blades", 2)
+    prop_type = get_input(Prompt, "   [green]Prop Type[/green]", "prop_type", "APC Electric E")
+    
+    limit = get_input(IntPrompt, "   [green]Max Setups to Analyze[/green]", "limit", 1)
+    esc_model = get_input(Prompt, "   [green]ESC Model[/green]", "esc_model", "max 90A")
+    battery_model = get_input(Prompt, "   [green]Battery Model[/green]", "battery_model", "LiPo 3300mAh - 45/60C")
+    close_browser = get_input(Prompt, "   [green]Close Browser after finish?[/green]", "close_browser", "y", choices=["y", "n"])
+
+    # Manufacturer Filter
+    default_manuf = ", ".join(defaults.get("manufacturers_filter", ["T-Motor", "SunnySky", "Scorpion"]))
+    if args.auto:
+        manuf_filter_str = default_manuf
+    else:
+        manuf_filter_str = Prompt.ask("   [green]Manufacturer Filter (comma sep, or 'all')[/green]", default=default_manuf)
+    
+    # Prop Diameter Filter (Exact Match)
+    target_diam_filter = None
+    if not args.auto:
+        diam_input = Prompt.ask("   [green]Target Prop Diameter Filter (e.g. 18, or 'all')[/green]", default="all")
+        if diam_input.lower() != "all":
+            try:
+                target_diam_filter = float(diam_input)
+            except ValueError:
+                rprint("[red]Invalid diameter. Ignoring filter.[/red]")
+
+    # Confirmation
+    rprint("\n[bold]Configuration Summary:[/bold]")
+    if args.auto:
+        confirm = "y"
+    
+    rprint(f" • Weight: {weight}g")
+    rprint(f" • Wingspan: {wingspan}mm")
+    rprint(f" • Area: {wing_area}dm²")
+    rprint(f" • Flight Plan: {flight_plan}")
+    rprint(f" • Flight Time: {flight_time}min")
+    rprint(f" • Elevation: {elevation}m")
+    rprint(f" • Speed: {speed}km/h")
+    rprint(f" • Thrust: {thrust}g")
+    rprint(f" • Max Motor Weight: {max_motor_weight_pct}%")
+    rprint(f" • Analyzed Power: {analyzed_power}W")
+    rprint(f" • Battery: {battery_cells}S")
+    rprint(f" • Charge State: {battery_charge_state}")
+    rprint(f" • Max Prop: {max_prop_diameter}\"")
+    rprint(f" • Blades: {prop_blades}")
+    rprint(f" • Prop Type: {prop_type}")
+    rprint(f" • Limit: {limit} motors")
+    rprint(f" • ESC: {esc_model}")
+    rprint(f" • Battery Model: {battery_model}")
+    rprint(f" • Close Browser: {'Yes' if close_browser == 'y' else 'No'}")
+    rprint(f" • Manufacturers Info: {manuf_filter_str}")
+    rprint(f" • Diam Filter: {target_diam_filter if target_diam_filter else 'ALL'}")
+    
+    if not args.auto:
+        if not Prompt.ask("\n[bold]Ready to calculate?[/bold]", choices=["y", "n"], default="y") == "y":
+            console.print("[red]Aborted.[/red]")
+            sys.exit(0)
+
+    # Initialize Automation
+    os.system('cls')
+    console.clear()
+    console.print("\n[bold yellow]STEP 2: Automation[/bold yellow]")
+    
+    cfg = {
+        "weight": weight,
+        "wingspan": wingspan,
+        "wing_area": wing_area,
+        "speed": speed,
+        "thrust": thrust,
+        "max_motor_weight_pct": max_motor_weight_pct,
+        "analyzed_power": analyzed_power,
+        "battery_cells": battery_cells,
+        "battery_charge_state": battery_charge_state,
+        "esc_model": esc_model,
+        "battery_model": battery_model,
+        "flight_plan": flight_plan,
+        "flight_time": flight_time,
+        "elevation": elevation,
+        "max_prop_diameter": max_prop_diameter,
+        "prop_blades": prop_blades,
+        "prop_type": prop_type,
+        "limit": limit,
+        "manufacturers_filter": manuf_filter_str,
+        "target_diam_filter": target_diam_filter,
+    }
+    tracer, session, auto = create_automator(args)
+    
+    try:
+        with Progress(
+            SpinnerColumn("dots", style="bold cyan"),
+            TextColumn("[progress.description]{task.description}"),
+            console=console
+        ) as progress:
+            
+            task = progress.add_task("Initializing Browser...", total=None)
+            start_and_login(session, auto, progress, task)
+            
+            name = f"P{analyzed_power} - N{limit}.csv"
+            journal = resume_journal(cfg, name) if args.resume else None
+            if journal is not None:
+                top_setups = journal.setups
+            else:
+                progress.update(task, description="Running Setup Finder (this takes ~10s)...")
+                top_setups = find_setups(auto, cfg)
+                journal = new_journal(cfg, name, top_setups)
+            save_run_data(run_configuration_data(cfg), top_setups)
+            final_results = analyze_setups(auto, cfg, top_setups, args.workers, progress, task,
+                                           journal=journal, on_checkpoint=checkpoint_writer(cfg, name, tracer))
+            
+            progress.console.print(f"[dim]Analyzed {len(final_results)} setups matching the filters.[/dim]")
+            console.print(f"[dim]Saved run data to '{get_output_dir()}\\last_run_data.json'[/dim]")
+            print_run_stats(auto, progress.console)
+
+        # Display Results
+        console.print("\n[bold yellow]STEP 3: Results[/bold yellow]")
+        print_results_table(final_results)
+        
+        # Save to CSV (Planilhas); other analyzed powers are interpolated from the captured #rpmTable
+        powers = [analyzed_power] + [p for p in parse_powers(args.powers) if p != analyzed_power]
+        for power in powers:
+            try:
+                results_at_power = [rpm_table.apply_target_power(r, power) for r in final_results]
+                filename = write_spreadsheet(results_at_power, power, f"P{power} - N{limit}.csv", tracer)
+                console.print(f"\n[bold green]Results saved to spreadsheet:[/bold green] {filename}")
+            except Exception as ex:
+                 console.print(f"[red]Failed to save spreadsheet: {ex}[/red]")
+        
+    except KeyboardInterrupt:
+        report_interrupted(locals().get("journal"))
+    except Exception as e:
+        console.print(f"[bold red]An error occurred:[/bold red] {e}")
+    finally:
+        if locals().get("journal") is not None:
+            journal.close()
+        if 'close_browser' in locals() and close_browser == 'n':
+            console.print("\n[bold yellow]Browser is open. Press Enter to close and exit...[/bold yellow]")
+            input()
+        
+        shutdown(tracer, session, auto)
+
+def run_batch(args, defaults):
+    """
+    --batch: every configuration of the matrix file in one browser session. Configurations with the
+    same airframe (see batch.AIRFRAME_KEYS) share one Setup Finder run; each gets its own spreadsheet.
+    """
+    try:
+        configs = load_matrix(args.batch, defaults)
+    except Exception as e:
+        console.print(f"[red]Could not read batch file {args.batch}: {e}[/red]")
+        sys.exit(1)
+    varied = varied_keys(configs)
+    airframes = len({airframe_key(c) for c in configs})
+    console.print(f"[cyan]Batch: {len(configs)} configurations, {airframes} distinct airframe(s) "
+                  f"(varying: {', '.join(varied) or 'nothing'}).[/cyan]")
+
+    tracer, session, auto = create_automator(args)
+    summary = []
+    try:
+        with Progress(
+            SpinnerColumn("dots", style="bold cyan"),
+            TextColumn("[progress.description]{task.description}"),
+            console=console
+        ) as progress:
+            task = progress.add_task("Initializing Browser...", total=None)
+            start_and_login(session, auto, progress, task)
+
+            setups_by_airframe = {}
+            results_by_propcalc = {}
+            for n, cfg in enumerate(configs, 1):
+                name = spreadsheet_name(cfg, varied)
+                started = time.time()
+                try:
+                    key = airframe_key(cfg)
+                    pc_key = propcalc_key(cfg)
+                    journal = None
+                    if args.resume and pc_key not in results_by_propcalc:
+                        journal = resume_journal(cfg, name)
+                    if journal is not None:
+                        # The journal holds this airframe's Setup Finder list; no need to search again
+                        setups_by_airframe.setdefault(key, journal.setups)
+                    elif key not in setups_by_airframe:
+                        progress.update(task, description=f"[{n}/{len(configs)}] Running Setup Finder for {name}...")
+                        setups_by_airframe[key] = find_setups(auto, cfg)
+                    else:
+                        progress.console.print(f"[dim][{n}/{len(configs)}] Reusing Setup Finder results for {name}.[/dim]")
+                    top_setups = journal.setups if journal is not None else setups_by_airframe[key]
+                    save_run_data(run_configuration_data(cfg), top_setups)
+                    if pc_key in results_by_propcalc:
+                        # Same calculations, another analyzed power: interpolated from the stored #rpmTable
+                        progress.console.print(f"[dim][{n}/{len(configs)}] Deriving {name} from earlier PropCalc results.[/dim]")
+                        final_results = [rpm_table.apply_target_power(r, cfg["analyzed_power"])
+                                         for r in results_by_propcalc[pc_key]]
+                    else:
+                        if journal is None:
+                            journal = new_journal(cfg, name, top_setups)
+                        try:
+                            final_results = analyze_setups(auto, cfg, journal.setups, args.workers, progress, task,
+                                                           label=f"[{n}/{len(configs)}] ", journal=journal,
+                                                           on_checkpoint=checkpoint_writer(cfg, name, tracer))
+                        finally:
+                            journal.close()
+                        results_by_propcalc[pc_key] = final_results
+                    filename = write_spreadsheet(final_results, cfg["analyzed_power"], name, tracer)
+                    progress.console.print(f"[green][{n}/{len(configs)}] {len(final_results)} setups -> {filename}[/green]")
+                    summary.append((name, len(final_results), time.time() - started, "ok"))
+                except Exception as e:
+                    # One broken configuration must not cost the rest of the batch
+                    progress.console.print(f"[red][{n}/{len(configs)}] {name} failed: {e}[/red]")
+                    summary.append((name, 0, time.time() - started, f"failed: {e}"))
+
+            print_run_stats(auto, progress.console)
+
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("Spreadsheet")
+        table.add_column("Setups", justify="right")
+        table.add_column("Time (s)", justify="right")
+        table.add_column("Status")
+        for name, count, elapsed, status in summary:
+            table.add_row(name, str(count), f"{elapsed:.0f}", status)
+        console.print(table)
+    except KeyboardInterrupt:
+        report_interrupted(locals().get("journal"))
+    finally:
+        shutdown(tracer, session, auto)
+
+def parse_powers(text):
+    """"400,600,800" -> [400, 600, 800]"""
+    powers = []
+    for part in (text or "").replace(";", ",").split(","):
+        part = part.strip()
+        if part:
+            try:
+                powers.append(int(float(part)))
+            except ValueError:
+                console.print(f"[red]Ignoring invalid power '{part}'.[/red]")
+    return powers
+
+def run_from_file(args, defaults):
+    """
+    --from-run: PropCalc for the setups of an earlier run (last_run_data.json), without the Setup Finder.
+    --esc/--battery/--power override the stored configuration; --resume continues from the run's journal,
+    or keeps the setups that already have a complete row in the target spreadsheet when there is none.
+    """
+    try:
+        with open(args.from_run, "r", encoding="utf-8") as f:
+            run_data = json.load(f)
+        top_setups = run_data["setups_to_analyze"]
+    except Exception as e:
+        console.print(f"[red]Could not read run data from {args.from_run}: {e}[/red]")
+        sys.exit(1)
+
+    cfg = {**defaults, **run_data.get("configuration", {})}
+    if args.esc:
+        cfg["esc_model"] = args.esc
+    if args.battery:
+        cfg["battery_model"] = args.battery
+    if args.power:
+        cfg["analyzed_power"] = args.power
+    # Older run files do not record the limit; the stored list is what the Setup Finder returned for it
+    cfg["limit"] = run_data.get("configuration", {}).get("limit", len(top_setups))
+    name = f"P{cfg['analyzed_power']} - N{cfg['limit']}.csv"
+
+    journal = resume_journal(cfg, name) if args.resume else None
+    if journal is None:
+        journal = new_journal(cfg, name, top_setups)
+        if args.resume:
+            # No journal yet (older run): complete rows of the spreadsheet count as done
+            done = {result_key(r): r for r in read_spreadsheet(os.path.join(get_output_dir(), "Planilhas", name))
+                    if is_complete(r)}
+            for i, setup in enumerate(top_setups):
+                if setup_key(setup) in done:
+                    journal.append(i, done[setup_key(setup)])
+    pending = journal.pending()
+    console.print(f"[cyan]Re-analyzing {len(journal.setups)} setups from {args.from_run} "
+                  f"(ESC {cfg['esc_model']}, battery {cfg['battery_model']}, {cfg['analyzed_power']} W); "
+                  f"{len(journal.setups) - len(pending)} already done.[/cyan]")
+
+    tracer, session, auto = create_automator(args)
+    try:
+        final_results = journal.ordered_results()
+        if pending:
+            with Progress(
+                SpinnerColumn("dots", style="bold cyan"),
+                TextColumn("[progress.description]{task.description}"),
+                console=console
+            ) as progress:
+                task = progress.add_task("Initializing Browser...", total=None)
+                start_and_login(session, auto, progress, task)
+                save_run_data(run_configuration_data(cfg), journal.setups)
+                final_results = analyze_setups(auto, cfg, journal.setups, args.workers, progress, task,
+                                               journal=journal, on_checkpoint=checkpoint_writer(cfg, name, tracer))
+                print_run_stats(auto, progress.console)
+
+        console.print("\n[bold yellow]STEP 3: Results[/bold yellow]")
+        print_results_table(final_results)
+        power = cfg["analyzed_power"]
+        for p in [power] + [p for p in parse_powers(args.powers) if p != power]:
+            try:
+                results_at_power = [rpm_table.apply_target_power(r, p) for r in final_results]
+                filename = write_spreadsheet(results_at_power, p, f"P{p} - N{cfg['limit']}.csv", tracer)
+                console.print(f"\n[bold green]Results saved to spreadsheet:[/bold green] {filename}")
+            except Exception as ex:
+                console.print(f"[red]Failed to save spreadsheet: {ex}[/red]")
+    except KeyboardInterrupt:
+        report_interrupted(journal)
+    except Exception as e:
+        console.print(f"[bold red]An error occurred:[/bold red] {e}")
+    finally:
+        journal.close()
+        shutdown(tracer, session, auto)
+
+def run_query(args):
+    """query: imports new/changed spreadsheets into Planilhas/results.sqlite, then filters and ranks them."""
+    plan_dir = os.path.join(get_output_dir(), "Planilhas")
+    store = ResultStore(os.path.join(plan_dir, "results.sqlite"))
+    try:
+        started = time.perf_counter()
+        imported = store.import_dir(plan_dir, force=args.reimport)
+        if imported["imported"]:
+            console.print(f"[dim]Imported {imported['rows']} rows from {imported['imported']} spreadsheet(s) "
+                          f"in {time.perf_counter() - started:.2f}s.[/dim]")
+        started = time.perf_counter()
+        rows = store.query(manufacturer=args.manufacturer, motor=args.motor, diam=args.diam, pitch=args.pitch,
+                           blades=args.blades, power=args.power, config=args.config, min_eff=args.min_eff,
+                           sort=args.sort, ascending=args.asc, distinct=args.distinct, limit=args.top)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = store.stats()
+    finally:
+        store.close()
+
+    table = Table(show_header=True, header_style="bold magenta")
+    columns = ["manufacturer", "motor", "prop_diam", "prop_pitch", "analyzed_power", "eff_at_power",
+               "thrust_at_power", "eff_max_throttle", "traction_0"]
+    if args.sort not in columns:
+        columns.append(args.sort)
+    for col in columns:
+        table.add_column(col, style="bold yellow" if col == args.sort else None)
+    table.add_column("run")
+    for row in rows:
+        table.add_row(*[("-" if row[c] is None else str(row[c])) for c in columns],
+                      os.path.splitext(os.path.basename(row["source"]))[0])
+    console.print(table)
+    console.print(f"[dim]{len(rows)} rows of {stats['rows']} ({stats['runs']} runs) in {elapsed_ms:.1f} ms.[/dim]")
+    if args.export:
+        export_rows(rows, args.export)
+        console.print(f"[bold green]Exported to[/bold green] {args.export}")
+
+def new_journal(cfg, name, setups):
+    """Fresh journal for the run that writes Planilhas/<name>."""
+    path = journal_path(os.path.join(get_output_dir(), "Planilhas", name))
+    return RunJournal.create(path, propcalc_key(cfg), run_configuration_data(cfg), setups)
+
+def resume_journal(cfg, name):
+    """The journal of an earlier run of the same configuration, opened for appending (None if there is none)."""
+    path = journal_path(os.path.join(get_output_dir(), "Planilhas", name))
+    journal = RunJournal.resume(path, propcalc_key(cfg))
+    if journal is not None:
+        console.print(f"[cyan]Resuming {name}: {len(journal.setups) - len(journal.pending())} of "
+                      f"{len(journal.setups)} setups already in {path}.[/cyan]")
+    return journal
+
+def checkpoint_writer(cfg, name, tracer):
+    """on_checkpoint for analyze_setups: rewrites the spreadsheet from the journal after every setup."""
+    def write(journal):
+        try:
+            results = [rpm_table.apply_target_power(r, cfg["analyzed_power"]) for r in journal.ordered_results()]
+            write_spreadsheet(results, cfg["analyzed_power"], name, tracer)
+        except Exception as e:
+            # e.g. the spreadsheet is open in Excel; the journal still has everything
+            console.print(f"[dim]Checkpoint spreadsheet not written: {e}[/dim]")
+    return write
+
+def report_interrupted(journal):
+    if journal is None:
+        console.print("\n[yellow]Interrupted.[/yellow]")
+        return
+    console.print(f"\n[yellow]Interrupted. {len(journal.setups) - len(journal.pending())} of {len(journal.setups)} "
+                  f"setups are saved in {journal.path}; run again with --resume to continue.[/yellow]")
+
+def _key_number(value):
+    try:
+        return repr(float(str(value).replace(",", ".")))
+    except ValueError:
+        return str(value).strip().lower()
+
+def setup_key(setup):
+    """Identifies a setup across runs: motor plus prop (what a spreadsheet row holds)."""
+    return (str(setup.get("motor_name", "")).strip().lower(),
+            _key_number(setup.get("prop_diam", "")), _key_number(setup.get("prop_pitch", "")))
+
+def result_key(res):
+    return (str(res.get("motor", "")).strip().lower(),
+            _key_number(res.get("prop_diam", "")), _key_number(res.get("prop_pitch", "")))
+
+def create_automator(args):
+    # One login shared through a saved storage_state; every page/worker gets a cheap context from it
+    tracer = tracing.configure(args.trace or os.getenv("ECALC_TRACE"), args.otlp or os.getenv("ECALC_OTLP_ENDPOINT"))
+    session = SessionManager(headless=False)
+    auto = ECalAutomator(headless=False, session=session, record_har=args.record_har, replay_har=args.replay_har)
+    # Recording/replaying must exercise the browser for real, not answer from the caches; and only the
+    # real eCalc may fill them (ECALC_BASE_URL pointing at fake_ecalc.py or a mirror would poison them)
+    if not args.no_cache and not (args.record_har or args.replay_har) and auto.base_url == DEFAULT_BASE_URL:
+        cache_path = os.path.join(get_output_dir(), "ecalc_cache.sqlite")
+        auto.result_cache = PropCalcCache(cache_path)
+        auto.setup_cache = SetupFinderCache(cache_path)
+    elif auto.base_url != DEFAULT_BASE_URL:
+        console.print(f"[dim]Running against {auto.base_url}: PropCalc/Setup Finder caches disabled.[/dim]")
+    return tracer, session, auto
+
+def start_and_login(session, auto, progress, task):
+    session.start()
+    auto.start()
+    
+    creds = load_credentials()
+    progress.update(task, description=f"Logging in as {creds['email']}...")
+    auto.login(creds['email'], creds['password'])
+
+def shutdown(tracer, session, auto):
+    console.print("\n[dim]Closing browser...[/dim]")
+    auto.stop()
+    session.stop()
+    if tracer.enabled:
+        tracer.flush()
+        if tracer.chrome_path:
+            console.print(f"[dim]Trace written to {tracer.chrome_path}[/dim]")
+
+def setup_finder_inputs(cfg):
+    return {
+        "weight": str(cfg["weight"]),
+        "wingspan": str(cfg["wingspan"]),
+        "wing_area": str(cfg["wing_area"]),
+        "speed": str(cfg["speed"]),
+        "thrust": str(cfg["thrust"]),
+        "max_weight": str(cfg["max_motor_weight_pct"]),
+        "battery_cells": str(cfg["battery_cells"]),
+        "wing_type": "Monoplano",
+        "flight_plan": cfg["flight_plan"],
+        "flight_time": str(cfg["flight_time"]),
+        "elevation": str(cfg["elevation"]),
+        "max_prop_diameter": str(cfg["max_prop_diameter"]),
+        "prop_blades": str(cfg["prop_blades"])
+    }
+
+def run_configuration_data(cfg):
+    # Run Data (Inputs + Setups), saved to last_run_data.json
+    keys = ["weight", "wingspan", "wing_area", "speed", "thrust", "max_motor_weight_pct", "analyzed_power",
+            "battery_cells", "battery_charge_state", "esc_model", "battery_model", "flight_plan", "flight_time",
+            "elevation", "max_prop_diameter", "prop_blades", "prop_type", "limit",
+            # Normalized as in cfg, so --from-run rebuilds the same configuration (and journal) key
+            "manufacturers_filter", "target_diam_filter"]
+    return {k: cfg[k] for k in keys if k in cfg}
+
+def find_setups(auto, cfg):
+    """
+    Setup Finder yields setups already filtered by manufacturer/diameter and stops as soon as
+    `limit` matching setups were found. The (fast) list is collected before PropCalc starts: the journal
+    records it up front and run_prop_calc_batch groups it by manufacturer/motor.
+    """
+    setup_filter = auto.make_setup_filter(cfg["manufacturers_filter"], cfg["target_diam_filter"])
+    setup_stream = auto.iter_setup_finder(setup_finder_inputs(cfg), limit=cfg["limit"], setup_filter=setup_filter)
+    return [dict(setup) for setup in setup_stream]
+
+def prepare_setup(setup, cfg):
+    setup["esc"] = cfg["esc_model"]
+    setup["battery_model"] = cfg["battery_model"]
+    setup["weight"] = cfg["weight"]
+    setup["analyzed_power"] = cfg["analyzed_power"]
+    setup["battery_cells"] = cfg["battery_cells"]
+    setup["battery_charge_state"] = cfg["battery_charge_state"]
+    setup["prop_type"] = cfg["prop_type"]
+    setup["elevation"] = cfg["elevation"]
+    return setup
+
+def combine_result(setup, pc_res):
+    # Merge ALL results from PropCalc into a single dictionary
+    return {
+        "motor": setup.get("motor_name", "Unknown"),
+        "kv": setup.get("motor_kv", "?"),
+        "manufacturer": setup.get("manufacturer", ""),
+        "prop": f"{setup.get('prop_diam', '?')}x{setup.get('prop_pitch', '?')}",
+        **pc_res # Spread all keys from pc_res (power, traction_v, effs, motor_weight etc)
+    }
+
+def analyze_setups(auto, cfg, top_setups, workers, progress, task, label="", journal=None, on_checkpoint=None):
+    """
+    PropCalc for every setup (grouped by manufacturer/motor so consecutive runs change few form fields).
+    With a journal, setups already in it are skipped and every new result is appended as it finishes,
+    followed by on_checkpoint(journal).
+    """
+    prepared = [prepare_setup(dict(s), cfg) for s in top_setups]
+    finished = journal.results() if journal is not None else {}
+    pending = [i for i in range(len(prepared)) if i not in finished]
+    def on_result(n, setup, pc_res):
+        index = pending[n]
+        finished[index] = combine_result(setup, pc_res)
+        progress.update(task, description=f"{label}Analyzed {len(finished)}/{len(prepared)}: [cyan]{setup.get('motor_name', 'Unknown')}[/cyan]")
+        if journal is None:
+            return
+        try:
+            journal.append(index, finished[index])
+        except Exception as e:
+            progress.console.print(f"[red]Could not write to journal {journal.path}: {e}[/red]")
+            return
+        if on_checkpoint:
+            on_checkpoint(journal)
+    
+    todo = [prepared[i] for i in pending]
+    if todo and workers > 1:
+        progress.update(task, description=f"{label}Found {len(todo)} setups. Processing in PropCalc on {workers} pages...")
+        executor = ParallelPropCalc(auto, concurrency=workers, headless=True)
+        pc_results = executor.run(todo, on_result=on_result)
+    elif todo:
+        progress.update(task, description=f"{label}Found {len(todo)} setups. Processing in PropCalc...")
+        pc_results = auto.run_prop_calc_batch(todo, on_result=on_result)
+    else:
+        pc_results = []
+    for n, r in enumerate(pc_results):
+        if pending[n] not in finished:
+            finished[pending[n]] = combine_result(todo[n], r)
+    # Output keeps the Setup Finder ranking
+    return [finished[i] for i in range(len(prepared))]
+
+def print_run_stats(auto, out):
+    if auto.resource_router is not None:
+        net_stats = auto.resource_router.stats()
+        out.print(f"[dim]Network: {net_stats['blocked']} of {net_stats['requests']} requests blocked, "
+                  f"{net_stats['cache_hits'] + net_stats['revalidated']} static files from cache "
+                  f"({net_stats['bytes_from_cache'] // 1024} KB).[/dim]")
+    if auto.result_cache is not None:
+        cache_stats = auto.result_cache.stats()
+        out.print(f"[dim]PropCalc cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses.[/dim]")
+
+def print_results_table(final_results):
+    from rich import box
+    table = Table(show_header=True, header_style="bold magenta", box=box.SIMPLE_HEAD)
+    table.add_column("Marca", no_wrap=True)
+    table.add_column("Motor", no_wrap=True)
+    table.add_column("Helice", no_wrap=True)
+    table.add_column("Passo", no_wrap=True)
+    table.add_column("Massa (g)")
+    table.add_column("Pwr (W)", style="bold cyan")
+    table.add_column("Eff Max(%)", style="bold yellow")
+    table.add_column("Eff Pwr(%)", style="bold yellow")
+    table.add_column("Thrst @Pwr(g)", style="dim")
+    table.add_column("Trac(0kmh)", style="bold green")
+    
+    console.print(f"[dim]Debug: Preparing table for {len(final_results)} motors...[/dim]")
+    for res in final_results:
+        # Debug log to verify data presence
+        # console.print(f"[dim]Data for {res.get('motor')}: Power={res.get('power')}, Weight={res.get('motor_weight')}[/dim]")
+        
+        row = [
+            res.get("manufacturer", ""),
+            res.get("motor", "Unknown"),
+            str(res.get("prop_diam", "?")),
+            str(res.get("prop_pitch", "?")),
+            res.get("drive_weight", res.get("motor_weight", "N/A")),
+            res.get("power", "N/A"),
+            res.get("eff_max_throttle", "N/A"),
+            res.get("eff_at_power", "N/A"),
+            res.get("thrust_at_power", "N/A"),
+            res.get("traction_0", "N/A")
+        ]
+        table.add_row(*row)
+        
+    console.print(table)
+    console.print("[dim]Note: Full speed sweep results (0-135km/h) are available in the CSV/Planilha.[/dim]")
+
+def write_spreadsheet(final_results, analyzed_power, name, tracer):
+    """Writes Planilhas/<name> and returns its path."""
+    output_dir = get_output_dir()
+    plan_dir = os.path.join(output_dir, "Planilhas")
+    if not os.path.exists(plan_dir):
+        os.makedirs(plan_dir)
+        
+    filename = os.path.join(plan_dir, name)
+    # Written next to the target and swapped in, so a crash mid-write never leaves half a spreadsheet
+    tmp_filename = filename + ".tmp"
+    
+    with open(tmp_filename, "w", newline="", encoding="utf-8-sig") as f, tracer.span("cli.write_csv", rows=len(final_results)):
+        writer = csv.writer(f, delimiter=";", quoting=csv.QUOTE_MINIMAL)
+        
+        # Dynamic Header based on User Request
+        # marca, motor, preco, massa[g], link, diametro, passo, pa, Throttle100Pot[W], Throttle100tracao0[g], T100tracao9...
+        
+        header = [
+            "marca", "motor", "preco", "massa[g]", "link", 
+            "diametro", "passo", "pa", 
+            "Throttle100Pot[W]", "Throttle100tracao0[g]"
+        ]
+        
+        # Dynamic Speed Columns (T100tracao{v}) - skipping 0 as it is already above
+        speeds = list(range(9, 136, 9)) 
+        for v in speeds:
+            header.append(f"T100tracao{v}")
+            
+        header.append("Throttle100Ef[%]")
+        
+        # Approx Power Columns
+        p_label = f"Pot≈{analyzed_power}"
+        header.extend([
+            f"{p_label}Throttle[%]",
+            f"{p_label}Pot[W]",
+            f"{p_label}Ef[%]",
+            f"{p_label}Tracao[g]"
+        ])
+            
+        writer.writerow(header)
+        
+        # Rows
+        for res in final_results:
+            # Use Drive Weight for "massa[g]" as requested
+            weight_val = res.get("drive_weight", "N/A")
+            if weight_val == "N/A":
+                 weight_val = res.get("motor_weight", "N/A")
+
+            row = [
+                res.get("manufacturer", ""),
+                res.get("motor", "Unknown"),
+                "", # preco
+                weight_val, # massa[g]
+                "", # link
+                str(res.get("prop_diam", "?")),
+                str(res.get("prop_pitch", "?")),
+                str(res.get("prop_blades", "2")), # pa
+                res.get("power", "N/A"), # Throttle100Pot[W]
+                res.get("traction_0", "N/A"), # Throttle100tracao0[g]
+            ]
+            
+            # Speed columns
+            for v in speeds:
+                row.append(res.get(f"traction_{v}", "N/A"))
+                
+            row.append(res.get("eff_max_throttle", "N/A")) # Throttle100Ef[%]
+            
+            # Analyzed Power columns
+            row.append(res.get("thr_at_power", "N/A"))
+            row.append(res.get("power_at_eff", "N/A"))
+            row.append(res.get("eff_at_power", "N/A"))
+            row.append(res.get("thrust_at_power", "N/A"))
+            
+            writer.writerow(row)
+    os.replace(tmp_filename, filename)
+    return filename
+
+if __name__ == "__main__":
+    main()
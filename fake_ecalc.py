@@ -0,0 +1,488 @@
+"""
+Local stand-in for the parts of eCalc the automator touches (login, Setup Finder, PropCalc),
+for load and throughput tests without the real site:
+
+    python fake_ecalc.py --port 8765 --latency 0.2 --rows 2000
+    set ECALC_BASE_URL=http://127.0.0.1:8765 && python cli.py -A
+
+The pages only imitate the structure the automation relies on (element ids, the w2ui grid model,
+the col 12 title metadata, #rpmTable, a synchronous calculate()); the numbers are synthetic.
+"""
+import argparse
+import hashlib
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+MANUFACTURERS = [
+    (1, "T-Motor"), (2, "SunnySky"), (3, "Scorpion"),
+    (4, "MAD Components"), (5, "Leopard"), (6, "Dualsky"),
+]
+
+FLIGHT_PLANS = ["Trainer", "Sport", "3D - light", "3D - heavy", "Glider", "Scale"]
+
+PROP_TYPES = ["personalizar", "Generic - thin", "Generic - normal", "APC SlowFly SF", "APC Electric E", "APC Speed E",
+              "Xoar PJN", "Falcon Carbon"]
+ESC_TYPES = ["personalizar", "max 20A", "max 40A", "max 60A", "max 80A", "max 100A", "max 120A", "max 160A"]
+BATTERIES = ["personalizar", "LiPo 2200mAh - 25/35C", "LiPo 3300mAh - 45/60C", "LiPo 5000mAh - 35/50C",
+             "LiPo 6000mAh - 65/130C", "LiIon 5000mAh - 10/20C"]
+CHARGE_STATES = ["cheia", "normal", "baixa"]
+
+COOKIE_NAME = "ecalc_fake_session"
+
+PAGE_HEAD = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>__TITLE__</title>
+<style>body{font-family:sans-serif} .w2ui-grid-records{height:300px;overflow:auto}</style></head><body>
+<div id="navbar">__NAV__</div>
+<div id="cookieinfo"><span class="cookieinfo-close" onclick="this.parentNode.style.display='none'">OK</span></div>
+"""
+
+LOGIN_BODY = """<form id="loginForm" method="post" action="/calcmember/login.php?__TARGET__">
+<input type="text" name="username"><input type="password" name="password">
+<label><input type="checkbox" name="remember" value="1"> remember</label>
+<button type="submit">Login</button></form></body></html>"""
+
+SETUPFINDER_BODY = r"""<form id="theForm" name="theForm" onsubmit="return false">
+<select id="inPerfMission">__FLIGHT_PLANS__</select>
+<select id="inAcWingTyp"><option value="0">Monoplano</option><option value="1">Biplano</option>
+<option value="2">Flying wing</option><option value="3">Delta</option></select>
+__INPUTS__
+<span class="button" id="BtnSearch" onclick="calculate()">Search</span>
+</form>
+<div id="grid"></div>
+<script>
+var w2ui = {};
+var PAGE_SIZE = __PAGE_SIZE__;
+var COLUMNS = ['motor', 'kv', 'prop', 'blades', 'cells', 'current', 'power', 'eff', 'thrust', 'weight',
+               'throttle', 'driveWeight', 'info', 'version'].map(function (f) { return {field: f, caption: f}; });
+function formQuery() {
+    var q = [];
+    document.querySelectorAll('#theForm input, #theForm select').forEach(function (el) {
+        q.push(encodeURIComponent(el.id) + '=' + encodeURIComponent(el.value));
+    });
+    return q.join('&');
+}
+function renderRows(grid, from) {
+    var body = document.getElementById('grid_' + grid.name + '_body');
+    for (var i = from; i < grid.records.length; i++) {
+        var r = grid.records[i];
+        var tr = document.createElement('tr');
+        tr.setAttribute('recid', r.recid);
+        for (var c = 0; c < grid.columns.length; c++) {
+            var td = document.createElement('td');
+            td.setAttribute('col', String(c));
+            var div = document.createElement('div');
+            if (c === 12) { div.setAttribute('title', r.info); div.textContent = 'i'; }
+            else { div.textContent = r[grid.columns[c].field]; }
+            td.appendChild(div);
+            tr.appendChild(td);
+        }
+        body.appendChild(tr);
+    }
+}
+function loadMore(grid) {
+    if (grid.loading || grid.records.length >= grid.total) return;
+    grid.loading = true;
+    fetch('/api/setupfinder?offset=' + grid.records.length + '&limit=' + PAGE_SIZE + '&' + grid.query)
+        .then(function (r) { return r.json(); })
+        .then(function (d) {
+            var from = grid.records.length;
+            grid.records = grid.records.concat(d.records);
+            grid.total = d.total;
+            grid.loading = false;
+            renderRows(grid, from);
+        });
+}
+function calculate() {
+    var query = formQuery();
+    fetch('/api/setupfinder?offset=0&limit=' + PAGE_SIZE + '&' + query)
+        .then(function (r) { return r.json(); })
+        .then(function (d) {
+            var grid = {
+                name: 'setupGrid', columns: COLUMNS, records: d.records, total: d.total, query: query, loading: false,
+                getCellValue: function (i, col) { return this.records[i][this.columns[col].field]; },
+                scroll: function () { loadMore(this); }
+            };
+            w2ui[grid.name] = grid;
+            document.getElementById('grid').innerHTML =
+                '<div class="w2ui-grid-records" id="grid_setupGrid_records"><table><tbody id="grid_setupGrid_body"></tbody></table></div>';
+            var box = document.getElementById('grid_setupGrid_records');
+            box.addEventListener('scroll', function () {
+                if (box.scrollTop + box.clientHeight >= box.scrollHeight - 20) loadMore(grid);
+            });
+            renderRows(grid, 0);
+        });
+}
+</script></body></html>"""
+
+MOTORCALC_BODY = r"""<form id="theForm" name="theForm" onsubmit="return false">
+<select id="inMManufacturer" onchange="loadMotorTyps(document.theForm)"><option value="">--</option>__MANUFACTURERS__</select>
+<select id="inMType" onchange="configMotor()"><option value="">personalizar</option></select>
+<input id="inMWeight" value="">
+<select id="inPType">__PROP_TYPES__</select>
+<input id="inPDiameter" value="10"><input id="inPPitch" value="6"><input id="inPBlades" value="2">
+<select id="inEType">__ESC_TYPES__</select>
+<select id="inBCell" onchange="configBattery()">__BATTERIES__</select>
+<select id="inBChargeState">__CHARGE_STATES__</select>
+<input id="inBS" value="3"><input id="inBCellCap" value="3300" disabled><input id="inBCcont" value="45" disabled>
+<input id="inGWeight" value="2000"><input id="inGElevation" value="500">
+<input id="inPSpeed" value="0"><input id="inPSpeedMph" value="0">
+<span class="button" onclick="calculate()">calculate</span>
+</form>
+<span id="outMaxWin">-</span><span id="outOptWin">-</span><span id="outTotPout">-</span>
+<span id="outTotDriveWeight">-</span><span id="outPFlightThrust">-</span>
+<table id="rpmTable"><tbody>
+<tr><td><span id="lblTabRpm">rpm</span></td><td colspan="2"><span id="lblTabPSpeed">Pitch Speed</span></td>
+<td><span id="lblTabThr">Throttle</span></td><td><span id="lblTabI">Current</span></td><td><span id="lblTabU">Voltage</span></td>
+<td><span id="lblTabW">el. Power</span></td><td><span id="lblTabEff">Efficiency</span></td>
+<td colspan="2"><span id="lblTabThrust">Thrust</span></td><td colspan="2"><span id="lblTabSThrust">Spec. Thrust</span></td>
+<td><span id="lblTabFT">Flight time</span></td></tr>
+<tr><td><span id="uTabRpm">rpm</span></td><td><span id="uTabPSpeed">km/h</span></td><td><span id="uTabPSpeedImp">mph</span></td>
+<td><span id="uTabThr">%</span></td><td><span id="uTabI">A</span></td><td><span id="uTabU">V</span></td>
+<td><span id="uTabW">W</span></td><td><span id="uTabEff">%</span></td><td><span id="uTabThrust">g</span></td>
+<td><span id="uTabThrustImp">oz</span></td><td><span id="uTabSThrust">g/W</span></td><td><span id="uTabSThrustImp">oz/W</span></td>
+<td><span id="uTabFT">min</span></td></tr>
+</tbody></table>
+<script>
+var CALC_BUSY_MS = __CALC_BUSY_MS__;
+var motorCache = {};
+function num(id) { return parseFloat(String(document.getElementById(id).value).replace(',', '.')) || 0; }
+function kmh2mph(v, el) { el.value = String(Math.round(v * 0.621371 * 10) / 10); }
+function loadMotorTyps(form) {
+    var id = document.getElementById('inMManufacturer').value;
+    fetch('/api/motors?manufacturer=' + encodeURIComponent(id))
+        .then(function (r) { return r.json(); })
+        .then(function (motors) {
+            var sel = document.getElementById('inMType');
+            sel.innerHTML = '<option value="">personalizar</option>';
+            motors.forEach(function (m) {
+                motorCache[m.id] = m;
+                var o = document.createElement('option');
+                o.value = m.id;
+                o.text = m.id + ' (' + m.kv + ')';
+                o.disabled = !!m.member_only;
+                sel.appendChild(o);
+            });
+        });
+}
+function configMotor() {
+    var m = motorCache[document.getElementById('inMType').value];
+    document.getElementById('inMWeight').value = m ? String(m.weight) : '';
+}
+function configBattery() {
+    var custom = document.getElementById('inBCell').selectedIndex === 0;
+    document.getElementById('inBCellCap').disabled = !custom;
+    document.getElementById('inBCcont').disabled = !custom;
+}
+function calculate() {
+    // eCalc's calculate() is synchronous; CALC_BUSY_MS imitates its cost
+    var until = Date.now() + CALC_BUSY_MS;
+    while (Date.now() < until) {}
+    var m = motorCache[document.getElementById('inMType').value];
+    if (!m) { document.getElementById('outTotPout').innerText = '-'; return; }
+    var D = num('inPDiameter'), P = num('inPPitch'), cells = num('inBS') || 3;
+    var charge = [1.0, 0.97, 0.93][document.getElementById('inBChargeState').selectedIndex] || 1.0;
+    var volts = cells * 3.7 * charge;
+    var rpmMax = m.kv * volts * 0.85;
+    var shaft = function (rpm) { return 9e-15 * Math.pow(D, 4) * P * Math.pow(rpm, 3); };
+    var thrust0 = function (rpm) { return 2.5e-9 * Math.pow(D, 4) * rpm * rpm; };
+    var pitchSpeed = function (rpm) { return rpm * P * 0.0254 * 60 / 1000; };
+    var eff = function (t) { return 86 - 40 * Math.pow(t - 0.65, 2); };
+    var speed = num('inPSpeed');
+    var maxIn = shaft(rpmMax) / (eff(1) / 100);
+    document.getElementById('outMaxWin').innerText = maxIn.toFixed(1);
+    document.getElementById('outOptWin').innerText = (maxIn * 0.6).toFixed(1);
+    document.getElementById('outTotPout').innerText = shaft(rpmMax).toFixed(1);
+    document.getElementById('outTotDriveWeight').innerText = String(Math.round(m.weight + D * 12 + cells * 95));
+    var ft = thrust0(rpmMax) * Math.max(0, 1 - speed / pitchSpeed(rpmMax));
+    document.getElementById('outPFlightThrust').innerText = String(Math.round(ft));
+    var table = document.getElementById('rpmTable').tBodies[0];
+    while (table.rows.length > 2) table.deleteRow(2);
+    for (var thr = 30; thr <= 100; thr += 5) {
+        var t = thr / 100, rpm = rpmMax * t, e = eff(t), w = shaft(rpm) / (e / 100), th = thrust0(rpm);
+        var cells_ = [Math.round(rpm), pitchSpeed(rpm).toFixed(0), (pitchSpeed(rpm) * 0.621).toFixed(0), thr,
+                      (w / volts).toFixed(1), volts.toFixed(1), w.toFixed(0), e.toFixed(1), Math.round(th),
+                      (th / 28.35).toFixed(1), (th / w).toFixed(2), (th / w / 28.35).toFixed(3), (60 / thr).toFixed(1)];
+        var tr = table.insertRow(-1);
+        cells_.forEach(function (v) { tr.insertCell(-1).innerText = String(v); });
+    }
+}
+</script></body></html>"""
+
+LANDING_BODY = """<a href="/motorcalc.php">PropCalc</a> <a href="/setupfinder.php">Setup Finder</a></body></html>"""
+
+SETUP_FINDER_INPUTS = ["inAcAuw", "inAcSpan", "inGWingArea", "inPerfSpeed", "inPerfThrust", "inPerfTime", "inBS",
+                       "inBCellV", "inGMotors", "inMWeightMax", "inPDiameter", "inPBlades", "inGElevation", "inGTemp"]
+
+
+def _options(labels, values=None) -> str:
+    values = values or labels
+    return "".join(f'<option value="{html.escape(str(v))}">{html.escape(str(t))}</option>' for v, t in zip(values, labels))
+
+
+class FakeECalcServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server imitating eCalc. Knobs:
+      latency_s        delay added to every response
+      calc_busy_ms     cost of each synchronous calculate() call in the PropCalc page
+      rows             Setup Finder result rows per search (page_size rows per grid fetch)
+      logout_after     drop a session after this many authenticated requests (0 = never)
+      failure_rate     fraction of page loads answered with HTTP 500
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, latency_s: float = 0.0, calc_busy_ms: int = 5,
+                 rows: int = 500, page_size: int = 100, motors_per_manufacturer: int = 40, logout_after: int = 0,
+                 failure_rate: float = 0.0, seed: int = 1):
+        super().__init__((host, port), FakeECalcHandler)
+        self.latency_s = latency_s
+        self.calc_busy_ms = calc_busy_ms
+        self.rows = rows
+        self.page_size = page_size
+        self.logout_after = logout_after
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.sessions: Dict[str, int] = {}
+        self.counters = {"requests": 0, "logins": 0, "searches": 0, "forced_logouts": 0, "failures": 0}
+        self.motors = self._make_motors(motors_per_manufacturer)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeECalcServer":
+        """Serves in a background thread (for use from tests and benchmarks)."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def count(self, key: str):
+        with self._lock:
+            self.counters[key] += 1
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            return self.failure_rate > 0 and self._rng.random() < self.failure_rate
+
+    def new_session(self) -> str:
+        token = secrets.token_hex(16)
+        with self._lock:
+            self.sessions[token] = 0
+        self.count("logins")
+        return token
+
+    def touch_session(self, token: Optional[str]) -> bool:
+        """True if the session is logged in; counts the request and applies logout_after."""
+        with self._lock:
+            if not token or token not in self.sessions:
+                return False
+            self.sessions[token] += 1
+            if self.logout_after and self.sessions[token] > self.logout_after:
+                del self.sessions[token]
+                self.counters["forced_logouts"] += 1
+                return False
+            return True
+
+    def _make_motors(self, per_manufacturer: int) -> Dict[str, List[Dict[str, Any]]]:
+        rng = random.Random(self.seed)
+        motors = {}
+        for manuf_id, name in MANUFACTURERS:
+            prefix = "".join(c for c in name.upper() if c.isalpha())[:2]
+            lst = []
+            for i in range(per_manufacturer):
+                size = rng.choice([28, 35, 41, 50, 60])
+                kv = rng.choice([190, 230, 280, 340, 400, 480, 580, 700, 900])
+                lst.append({
+                    "id": f"{prefix}{size}{10 + i:02d}",
+                    "kv": kv,
+                    "weight": size * 4 + rng.randint(0, 60),
+                    # A few motors are only selectable for paying members on the real site
+                    "member_only": i % 17 == 16,
+                })
+            motors[str(manuf_id)] = lst
+        return motors
+
+    def setup_rows(self, query: str) -> List[Dict[str, Any]]:
+        """The full (deterministic) result list of one Setup Finder search."""
+        rng = random.Random(int(hashlib.sha256(f"{self.seed}:{query}".encode()).hexdigest()[:12], 16))
+        rows = []
+        for recid in range(self.rows):
+            manuf_id, manuf_name = rng.choice(MANUFACTURERS)
+            motor = rng.choice(self.motors[str(manuf_id)])
+            diam, pitch = rng.randint(10, 22), rng.randint(5, 14)
+            power, thrust = rng.randint(200, 1500), rng.randint(1500, 9000)
+            drive_weight = motor["weight"] + rng.randint(300, 1500)
+            info = ",".join(str(v) for v in [
+                diam, pitch, manuf_id, motor["id"], motor["kv"], 2, rng.randint(3, 12), rng.randint(10, 90),
+                power, rng.randint(70, 90), thrust, drive_weight, manuf_name, 1,
+            ])
+            rows.append({
+                "recid": recid + 1, "motor": f"{manuf_name} {motor['id']}", "kv": motor["kv"],
+                "prop": f"{diam}x{pitch}", "blades": 2, "cells": 6, "current": 40, "power": power, "eff": 80,
+                "thrust": thrust, "weight": motor["weight"], "throttle": 75, "driveWeight": drive_weight,
+                "info": info, "version": 1,
+            })
+        return rows
+
+
+class FakeECalcHandler(BaseHTTPRequestHandler):
+    server: FakeECalcServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _session_token(self) -> Optional[str]:
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == COOKIE_NAME:
+                return value
+        return None
+
+    def _send(self, status: int, body: str = "", content_type: str = "text/html; charset=utf-8",
+              headers: Optional[Dict[str, str]] = None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, headers: Optional[Dict[str, str]] = None):
+        self._send(302, "", headers=dict(headers or {}, Location=location))
+
+    def _page(self, title: str, body: str, logged_in: bool = True):
+        nav = '<a href="/calcmember/logout.php">Logout</a>' if logged_in else '<a href="/calcmember/login.php">Login</a>'
+        self._send(200, PAGE_HEAD.replace("__TITLE__", title).replace("__NAV__", nav) + body)
+
+    def _require_login(self, url: str) -> bool:
+        if self.server.touch_session(self._session_token()):
+            return True
+        self._redirect(f"/calcmember/login.php?{self.server.url}{url}")
+        return False
+
+    def do_GET(self):
+        self.server.count("requests")
+        if self.server.latency_s:
+            time.sleep(self.server.latency_s)
+        parsed = urlparse(self.path)
+        path = parsed.path
+
+        if path in ("/motorcalc.php", "/setupfinder.php") and self.server.should_fail():
+            self.server.count("failures")
+            self._send(500, "<html><body>Internal Server Error</body></html>")
+            return
+
+        if path == "/calcmember/login.php":
+            if self.server.touch_session(self._session_token()):
+                self._redirect("/calcmember/index.php")
+                return
+            self._page("Login", LOGIN_BODY.replace("__TARGET__", html.escape(parsed.query)), logged_in=False)
+        elif path == "/calcmember/logout.php":
+            with self.server._lock:
+                self.server.sessions.pop(self._session_token(), None)
+            self._redirect("/calcmember/login.php?loggedout")
+        elif path == "/calcmember/index.php":
+            if self._require_login(self.path):
+                self._page("Members", LANDING_BODY)
+        elif path == "/setupfinder.php":
+            if self._require_login(self.path):
+                inputs = "".join(f'<input id="{i}" value="">' for i in SETUP_FINDER_INPUTS)
+                body = (SETUPFINDER_BODY.replace("__FLIGHT_PLANS__", _options(FLIGHT_PLANS))
+                        .replace("__INPUTS__", inputs)
+                        .replace("__PAGE_SIZE__", str(self.server.page_size)))
+                self._page("Setup Finder", body)
+        elif path == "/motorcalc.php":
+            if self._require_login(self.path):
+                body = (MOTORCALC_BODY
+                        .replace("__MANUFACTURERS__", _options([n for _, n in MANUFACTURERS], [i for i, _ in MANUFACTURERS]))
+                        .replace("__PROP_TYPES__", _options(PROP_TYPES))
+                        .replace("__ESC_TYPES__", _options(ESC_TYPES))
+                        .replace("__BATTERIES__", _options(BATTERIES))
+                        .replace("__CHARGE_STATES__", _options(CHARGE_STATES))
+                        .replace("__CALC_BUSY_MS__", str(int(self.server.calc_busy_ms))))
+                self._page("PropCalc", body)
+        elif path == "/api/motors":
+            if not self.server.touch_session(self._session_token()):
+                self._send(403, "[]", "application/json")
+                return
+            manuf = parse_qs(parsed.query).get("manufacturer", [""])[0]
+            self._send(200, json.dumps(self.server.motors.get(manuf, [])), "application/json")
+        elif path == "/api/setupfinder":
+            if not self.server.touch_session(self._session_token()):
+                self._send(403, json.dumps({"records": [], "total": 0}), "application/json")
+                return
+            params = parse_qs(parsed.query)
+            offset = int(params.pop("offset", ["0"])[0])
+            limit = int(params.pop("limit", [str(self.server.page_size)])[0])
+            if offset == 0:
+                self.server.count("searches")
+            query = "&".join(f"{k}={v[0]}" for k, v in sorted(params.items()))
+            rows = self.server.setup_rows(query)
+            self._send(200, json.dumps({"records": rows[offset:offset + limit], "total": len(rows)}), "application/json")
+        elif path == "/":
+            self._redirect("/calcmember/index.php")
+        else:
+            self._send(404, "<html><body>Not found</body></html>")
+
+    def do_POST(self):
+        self.server.count("requests")
+        if self.server.latency_s:
+            time.sleep(self.server.latency_s)
+        parsed = urlparse(self.path)
+        if parsed.path != "/calcmember/login.php":
+            self._send(404, "<html><body>Not found</body></html>")
+            return
+        length = int(self.headers.get("Content-Length", "0") or 0)
+        form = parse_qs(self.rfile.read(length).decode("utf-8"))
+        if not form.get("username", [""])[0] or not form.get("password", [""])[0]:
+            self._page("Login", LOGIN_BODY.replace("__TARGET__", html.escape(parsed.query)), logged_in=False)
+            return
+        token = self.server.new_session()
+        # login.php?<target url> sends the user back where the redirect came from
+        target = parsed.query if parsed.query.startswith("http") else "/calcmember/index.php"
+        self._redirect(target, headers={"Set-Cookie": f"{COOKIE_NAME}={quote(token)}; Path=/; HttpOnly"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local eCalc stand-in server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--calc-ms", type=int, default=5, help="Cost of each calculate() call in the PropCalc page")
+    parser.add_argument("--rows", type=int, default=500, help="Setup Finder rows per search")
+    parser.add_argument("--page-size", type=int, default=100, help="Rows per Setup Finder grid fetch")
+    parser.add_argument("--logout-after", type=int, default=0, help="Log a session out after N requests (0 = never)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of page loads answered with HTTP 500")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    server = FakeECalcServer(args.host, args.port, latency_s=args.latency, calc_busy_ms=args.calc_ms, rows=args.rows,
+                             page_size=args.page_size, logout_after=args.logout_after,
+                             failure_rate=args.failure_rate, seed=args.seed)
+    print(f"Fake eCalc serving on {server.url} (set ECALC_BASE_URL to use it). Ctrl-C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Counters: {server.counters}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
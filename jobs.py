@@ -0,0 +1,317 @@
+import asyncio
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import metrics
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised by JobManager.submit when max_queued jobs are already waiting."""
+
+
+class Job:
+    """
+    One Setup Finder + PropCalc request running in the background.
+    The runner thread reports through set_stage/set_total/add_result; API handlers read the status
+    and subscribe() to an asyncio.Queue of events (each result as it finishes, then "end").
+    Identical submissions (same key) share one Job; `attached` counts them.
+    """
+    def __init__(self, inputs: Dict[str, Any], limit: int, loop: asyncio.AbstractEventLoop,
+                 key: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.inputs = inputs
+        self.limit = limit
+        self.key = key
+        self.attached = 1
+        # True when the results were served from the result cache without running anything
+        self.cached = False
+        # The runner clears this for results not worth serving again (e.g. incomplete calculations)
+        self.cacheable = True
+        self.status = QUEUED
+        self.stage = "queued"
+        self.total = 0
+        self.results: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.exception: Optional[Exception] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._loop = loop
+        self._subscribers: List[asyncio.Queue] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def cancel(self):
+        self._cancel.set()
+        with self._lock:
+            queued = self.status == QUEUED
+        if queued:
+            # Never reached a runner; the runner skips it when it comes up
+            self._finish(CANCELLED)
+
+    def detach(self) -> int:
+        """Drops one interested client and returns how many are left."""
+        with self._lock:
+            self.attached = max(0, self.attached - 1)
+            return self.attached
+
+    def abandon(self) -> bool:
+        """
+        One client gives up on the job: detaches it, and cancels the job only if no other client
+        is still attached. Returns True if the job was cancelled.
+        """
+        if self.finished or self.detach() > 0:
+            return False
+        self.cancel()
+        return True
+
+    def set_stage(self, stage: str):
+        self.stage = stage
+        self._publish({"event": "progress", **self.progress()})
+
+    def set_total(self, total: int):
+        self.total = total
+        self._publish({"event": "progress", **self.progress()})
+
+    def add_result(self, index: int, result: Dict[str, Any]):
+        event = {"event": "result", "index": index, "result": result}
+        with self._lock:
+            # Under the same lock as subscribe(), which replays self.results: a client subscribing
+            # now gets the event either from the replay or from the queue, never both
+            self.results.append(event)
+            self._publish_locked(event)
+
+    def ordered_results(self) -> List[Dict[str, Any]]:
+        """Results finished so far, in Setup Finder ranking order."""
+        with self._lock:
+            return [e["result"] for e in sorted(self.results, key=lambda e: e["index"])]
+
+    def _start(self) -> bool:
+        with self._lock:
+            if self.status != QUEUED:
+                return False
+            self.status = RUNNING
+            self.started_at = time.time()
+        return True
+
+    def _finish(self, status: str, error: Optional[Exception] = None):
+        with self._lock:
+            if self.finished:
+                return
+            self.status = status
+            self.exception = error
+            self.error = str(error) if error is not None else None
+            self.stage = status
+            self.finished_at = time.time()
+            self._publish_locked({"event": "end", **self._progress()})
+
+    def _publish(self, event: Dict[str, Any]):
+        with self._lock:
+            self._publish_locked(event)
+
+    def _publish_locked(self, event: Dict[str, Any]):
+        # call_soon_threadsafe only schedules the put, so this is safe to run under _lock
+        for q in self._subscribers:
+            try:
+                self._loop.call_soon_threadsafe(q.put_nowait, event)
+            except RuntimeError:
+                # Event loop already closed (server shutting down)
+                pass
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving every event so far (results, then "end" if finished) and all later ones."""
+        q: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            for event in self.results:
+                q.put_nowait(event)
+            if self.finished:
+                q.put_nowait({"event": "end", **self._progress()})
+            else:
+                self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue):
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+    def _progress(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "done": len(self.results),
+            "total": self.total,
+            "limit": self.limit,
+            "error": self.error,
+            "cached": self.cached,
+            "attached": self.attached,
+        }
+
+    def progress(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._progress()
+
+    def describe(self) -> Dict[str, Any]:
+        info = self.progress()
+        info.update({
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_s": round((self.finished_at or time.time()) - (self.started_at or time.time()), 2),
+        })
+        return info
+
+
+class JobManager:
+    """
+    Bounded job queue in front of the automator pool.
+    `runners` threads (at most one per pool worker) take jobs in submission order and call runner(job),
+    so no more than `runners` browser jobs ever run at once. Beyond that at most max_queued jobs may
+    wait (0 = reject instead of queueing); further submissions raise QueueFullError.
+    Submissions with a key are deduplicated: a result_cache (cache.ResultLRU) hit yields an already
+    finished job, and a key already in flight attaches to that job instead of starting another.
+    Finished jobs are kept retention_s seconds for status/result requests.
+    """
+    def __init__(self, runner: Callable[[Job], None], runners: int = 2, max_queued: int = 20,
+                 retention_s: float = 3600.0, result_cache=None):
+        self.runner = runner
+        self.runners = max(1, int(runners))
+        self.max_queued = max_queued
+        self.retention_s = retention_s
+        self.result_cache = result_cache
+        self.coalesced = 0
+        self._jobs: Dict[str, Job] = {}
+        self._inflight: Dict[str, Job] = {}
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        for i in range(self.runners):
+            t = threading.Thread(target=self._run, name=f"ecalc-job{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel()
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=30)
+        self._threads = []
+
+    def queued(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j.status == QUEUED)
+
+    def running(self) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j.status == RUNNING)
+
+    def stats(self) -> Dict[str, Any]:
+        info = {
+            "queued": self.queued(),
+            "running": self.running(),
+            "max_running": self.runners,
+            "max_queued": self.max_queued,
+            "coalesced": self.coalesced,
+        }
+        if self.result_cache is not None:
+            info["result_cache"] = self.result_cache.stats()
+        return info
+
+    def submit(self, inputs: Dict[str, Any], limit: int, loop: asyncio.AbstractEventLoop,
+               key: Optional[str] = None) -> Job:
+        self._prune()
+        if key is not None and self.result_cache is not None:
+            entry = self.result_cache.get(key)
+            if entry is not None:
+                job = Job(inputs, limit, loop, key=key)
+                job.cached = True
+                job.total = len(entry["value"])
+                for i, result in enumerate(entry["value"]):
+                    job.add_result(i, result)
+                job._start()
+                job._finish(DONE)
+                with self._lock:
+                    self._jobs[job.id] = job
+                metrics.JOBS.inc(status="cached")
+                return job
+
+        with self._lock:
+            if key is not None:
+                job = self._inflight.get(key)
+                if job is not None and not job.finished and not job.cancelled:
+                    job.attached += 1
+                    self.coalesced += 1
+                    metrics.JOBS.inc(status="coalesced")
+                    return job
+            active = sum(1 for j in self._jobs.values() if j.status in (QUEUED, RUNNING))
+            if active >= self.runners + self.max_queued:
+                metrics.JOBS.inc(status="rejected")
+                raise QueueFullError(f"{active} jobs running or waiting (max {self.runners} running + {self.max_queued} queued)")
+            job = Job(inputs, limit, loop, key=key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._inflight[key] = job
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_s
+        with self._lock:
+            for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+                del self._jobs[job_id]
+            for key in [k for k, j in self._inflight.items() if j.finished]:
+                del self._inflight[key]
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if not job._start():
+                # Cancelled while waiting
+                metrics.JOBS.inc(status=job.status)
+                continue
+            try:
+                self.runner(job)
+                if job.cacheable and not job.cancelled and job.key is not None and self.result_cache is not None:
+                    # Stored before the job reports "end" so a client reacting to it already hits the cache
+                    self.result_cache.put(job.key, job.ordered_results())
+                job._finish(CANCELLED if job.cancelled else DONE)
+            except Exception as e:
+                print(f"[Jobs] Job {job.id} failed: {e}")
+                job._finish(FAILED, e)
+            finally:
+                with self._lock:
+                    if job.key is not None and self._inflight.get(job.key) is job:
+                        del self._inflight[job.key]
+                metrics.JOBS.inc(status=job.status)
+                metrics.JOB_DURATION.observe(job.finished_at - job.started_at, status=job.status)
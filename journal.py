@@ -0,0 +1,148 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+JOURNAL_VERSION = 1
+
+
+def journal_path(spreadsheet_path: str) -> str:
+    """Planilhas/P600 - N300.csv -> Planilhas/P600 - N300.journal.jsonl"""
+    base, _ = os.path.splitext(spreadsheet_path)
+    return base + ".journal.jsonl"
+
+
+def is_complete(result: Dict[str, Any]) -> bool:
+    """A result worth keeping: PropCalc produced a power (failed runs, logouts and timeouts leave "N/A")."""
+    return str(result.get("power", "N/A")).strip() not in ("N/A", "", "-")
+
+
+def _read_lines(path: str) -> List[Dict[str, Any]]:
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # Last line cut short by a crash; everything before it is intact
+                print(f"[Journal] Ignoring unreadable line in {path}")
+    return entries
+
+
+class RunJournal:
+    """
+    Append-only JSONL record of one PropCalc run, written as each setup finishes.
+    The first line holds the configuration key and the setup list (Setup Finder ranking), every
+    further line one finished setup: {"event": "result", "index": i, "result": {...}}. Runs that produced
+    no power are logged as {"event": "failed", ...} and stay pending, so a resume retries them.
+    Each line is flushed and fsynced, so a crash, a logout loop or Ctrl-C loses at most the setup
+    in progress; resume() reopens the file and the run continues with the setups not in it yet.
+    """
+    def __init__(self, path: str, config_key: str, configuration: Dict[str, Any],
+                 setups: List[Dict[str, Any]], results: Optional[Dict[int, Dict[str, Any]]] = None):
+        self.path = path
+        self.config_key = config_key
+        self.configuration = configuration
+        self.setups = setups
+        self._results: Dict[int, Dict[str, Any]] = dict(results or {})
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def create(cls, path: str, config_key: str, configuration: Dict[str, Any],
+               setups: List[Dict[str, Any]]) -> "RunJournal":
+        """
+        Starts a new journal at path. An existing one is only replaced when it is a finished run of the
+        same configuration; otherwise (another configuration, or setups still pending) it is moved aside
+        to <name>.<timestamp>.jsonl so its results are never lost.
+        """
+        journal = cls(path, config_key, configuration, setups)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        existing = cls.load(path) if os.path.exists(path) else None
+        if os.path.exists(path) and (existing is None or existing.config_key != config_key or existing.pending()):
+            base, ext = os.path.splitext(path)
+            stamp = time.strftime('%Y%m%d-%H%M%S')
+            kept = f"{base}.{stamp}{ext}"
+            n = 1
+            # Two runs within the same second must not overwrite the journal kept a moment ago
+            while os.path.exists(kept):
+                n += 1
+                kept = f"{base}.{stamp}-{n}{ext}"
+            os.rename(path, kept)
+            print(f"[Journal] Kept the earlier journal as {kept}")
+        journal._file = open(path, "w", encoding="utf-8")
+        journal._write({
+            "event": "start",
+            "version": JOURNAL_VERSION,
+            "config_key": config_key,
+            "configuration": configuration,
+            "setups": setups,
+            "started_at": time.time(),
+        })
+        return journal
+
+    @classmethod
+    def load(cls, path: str) -> Optional["RunJournal"]:
+        """Read-only view of an existing journal (None if missing or without a start line)."""
+        if not os.path.exists(path):
+            return None
+        entries = _read_lines(path)
+        if not entries or entries[0].get("event") != "start":
+            return None
+        head = entries[0]
+        results = {e["index"]: e["result"] for e in entries[1:]
+                   if e.get("event") == "result" and isinstance(e.get("index"), int) and is_complete(e["result"])}
+        return cls(path, head.get("config_key", ""), head.get("configuration", {}), head.get("setups", []), results)
+
+    @classmethod
+    def resume(cls, path: str, config_key: str) -> Optional["RunJournal"]:
+        """The journal at path opened for appending if it belongs to the same configuration, else None."""
+        journal = cls.load(path)
+        if journal is None:
+            return None
+        if journal.config_key != config_key:
+            print(f"[Journal] {path} was written for another configuration; not resuming from it")
+            return None
+        # Drop a line cut short by the crash, or the next entry would be glued onto it
+        with open(path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+        journal._file = open(path, "a", encoding="utf-8")
+        return journal
+
+    def _write(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def append(self, index: int, result: Dict[str, Any]):
+        complete = is_complete(result)
+        with self._lock:
+            self._write({"event": "result" if complete else "failed", "index": index, "result": result,
+                         "at": time.time()})
+            if complete:
+                self._results[index] = result
+
+    def results(self) -> Dict[int, Dict[str, Any]]:
+        with self._lock:
+            return dict(self._results)
+
+    def ordered_results(self) -> List[Dict[str, Any]]:
+        """Finished setups in Setup Finder ranking order."""
+        with self._lock:
+            return [self._results[i] for i in sorted(self._results)]
+
+    def pending(self) -> List[int]:
+        with self._lock:
+            return [i for i in range(len(self.setups)) if i not in self._results]
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
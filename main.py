@@ -1,109 +1,290 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from automation import ECalAutomator
-import time
-import os
-import json
-
-app = FastAPI(title="eCalc Automation API")
-
-def load_credentials():
-    email = os.getenv("ECALC_EMAIL")
-    password = os.getenv("ECALC_PASSWORD")
-    if email and password:
-        return {"email": email, "password": password}
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    path = os.path.join(base_dir, "credentials.json")
-    if os.path.exists(path):
-        with open(path, "r") as f:
-            return json.load(f)
-    raise HTTPException(status_code=500, detail="Credentials not found")
-
-class SetupFinderInput(BaseModel):
-    weight: str
-    wingspan: str
-    wing_area: str
-    speed: str
-    thrust: str
-    battery_cells: str
-    # Optional fields or default to common values if not provided
-    wing_type: Optional[str] = "Monoplano"
-    
-class MotorResult(BaseModel):
-    motor_name: str
-    prop_diam: str
-    prop_pitch: str
-    power: str
-    traction: str
-    motor_weight: Optional[str] = "N/A"
-    drive_weight: Optional[str] = "N/A"
-    manufacturer: Optional[str] = ""
-
-@app.get("/")
-def read_root():
-    return {"status": "eCalc Automation API is running"}
-
-@app.post("/api/calculate", response_model=List[MotorResult])
-def run_calculation(input_data: SetupFinderInput):
-    print(f"Received request: {input_data}")
-    # Initialize Automator
-    # Note: In production, we might want a persistent browser or session
-    # For now, we launch a new instance per request or use a singleton pattern carefully.
-    # Spawning a browser for each request is slow but safe for state isolation.
-    
-    auto = ECalAutomator(headless=False) # Keep visible for demo/debug
-    results = []
-    
-    try:
-        auto.start()
-        
-        creds = load_credentials()
-        auto.login(creds["email"], creds["password"])
-        
-        # Prepare inputs
-        inputs = {
-            "weight": input_data.weight,
-            "wingspan": input_data.wingspan,
-            "wing_area": input_data.wing_area,
-            "speed": input_data.speed,
-            "thrust": input_data.thrust,
-            "battery_cells": input_data.battery_cells,
-            "wing_type": input_data.wing_type
-        }
-        
-        # 1. Setup Finder
-        setup_results = auto.run_setup_finder(inputs)
-        
-        # Limit to top 10
-        top_setups = setup_results[:10]
-        
-        # 2. Prop Calc Loop
-        final_results = []
-        for setup in top_setups:
-            pc_res = auto.run_prop_calc(setup)
-            
-            # Combine data
-            combined = {
-                "motor_name": setup.get("motor_name", "Unknown"),
-                "prop_diam": setup.get("prop_diam", "?"),
-                "prop_pitch": setup.get("prop_pitch", "?"),
-                "manufacturer": setup.get("manufacturer", ""),
-                "power": pc_res.get("power", "N/A"),
-                "traction": pc_res.get("traction", "N/A"),
-                "motor_weight": pc_res.get("motor_weight", "N/A"),
-                "drive_weight": pc_res.get("drive_weight", "N/A")
-            }
-            final_results.append(combined)
-            
-        return final_results
-        
-    except Exception as e:
-        print(f"Error processing request: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        auto.stop()
-
-if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional, Dict, Any
+from contextlib import asynccontextmanager
+from automation import ECalAutomator
+from pool import AutomatorPool
+from jobs import Job, JobManager, QueueFullError, DONE, FAILED, CANCELLED
+from cache import ResultLRU, canonical_key
+import metrics
+import tracing
+import asyncio
+import time
+import os
+import json
+
+# Upper bound for SetupFinderInput.limit (each setup costs one PropCalc run)
+MAX_LIMIT = int(os.getenv("ECALC_MAX_LIMIT", "100"))
+
+# Everything that makes two API requests identical
+REQUEST_KEY_FIELDS = ["weight", "wingspan", "wing_area", "speed", "thrust", "battery_cells", "wing_type", "limit"]
+
+def load_credentials():
+    email = os.getenv("ECALC_EMAIL")
+    password = os.getenv("ECALC_PASSWORD")
+    if email and password:
+        return {"email": email, "password": password}
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.join(base_dir, "credentials.json")
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            return json.load(f)
+    raise HTTPException(status_code=500, detail="Credentials not found")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm, logged-in browsers are kept for the lifetime of the server
+    # (size/recycling configured via ECALC_POOL_* environment variables)
+    # Tracing is off unless ECALC_TRACE / ECALC_OTLP_ENDPOINT is set; must precede the automators
+    tracer = tracing.configure_from_env()
+    pool = AutomatorPool.from_env(load_credentials)
+    await asyncio.to_thread(pool.start)
+    app.state.pool = pool
+    # Admission control: at most ECALC_MAX_CONCURRENT_JOBS browser jobs at once (never more than the
+    # pool has workers) and ECALC_JOB_QUEUE waiting ones; anything beyond that is rejected with 429.
+    # Identical requests share one job, and finished results are kept ECALC_RESULT_CACHE_TTL seconds.
+    cache_ttl = float(os.getenv("ECALC_RESULT_CACHE_TTL", "900"))
+    result_cache = ResultLRU(max_entries=int(os.getenv("ECALC_RESULT_CACHE_SIZE", "128")),
+                             ttl_s=cache_ttl) if cache_ttl > 0 else None
+    jobs = JobManager(_run_job,
+                      runners=min(pool.size, int(os.getenv("ECALC_MAX_CONCURRENT_JOBS", str(pool.size)))),
+                      max_queued=int(os.getenv("ECALC_JOB_QUEUE", "20")),
+                      retention_s=float(os.getenv("ECALC_JOB_RETENTION", "3600")),
+                      result_cache=result_cache)
+    jobs.start()
+    app.state.jobs = jobs
+    metrics.REGISTRY.add_collector(_collect_service_metrics)
+    try:
+        yield
+    finally:
+        metrics.REGISTRY.remove_collector(_collect_service_metrics)
+        await asyncio.to_thread(jobs.stop)
+        await asyncio.to_thread(pool.stop)
+        tracer.flush()
+
+app = FastAPI(title="eCalc Automation API", lifespan=lifespan)
+
+class SetupFinderInput(BaseModel):
+    weight: str
+    wingspan: str
+    wing_area: str
+    speed: str
+    thrust: str
+    battery_cells: str
+    # Optional fields or default to common values if not provided
+    wing_type: Optional[str] = "Monoplano"
+    # Number of Setup Finder results analyzed in PropCalc
+    limit: int = Field(10, ge=1, le=MAX_LIMIT)
+    
+class MotorResult(BaseModel):
+    motor_name: str
+    prop_diam: str
+    prop_pitch: str
+    power: str
+    traction: str
+    motor_weight: Optional[str] = "N/A"
+    drive_weight: Optional[str] = "N/A"
+    manufacturer: Optional[str] = ""
+
+@app.get("/")
+def read_root():
+    return {
+        "status": "eCalc Automation API is running",
+        "pool": app.state.pool.stats(),
+        "jobs": app.state.jobs.stats(),
+    }
+
+def _collect_service_metrics():
+    """Scrape-time view of the pool, the job queue and the result cache for /metrics."""
+    pool = app.state.pool.stats()
+    jobs = app.state.jobs.stats()
+    families = [
+        ("ecalc_pool_workers", "gauge", "Automators in the pool", [({}, pool["size"])]),
+        ("ecalc_pool_in_use", "gauge", "Automators currently checked out", [({}, pool["in_use"])]),
+        ("ecalc_pool_utilization", "gauge", "Fraction of the pool checked out",
+         [({}, pool["in_use"] / pool["size"] if pool["size"] else 0.0)]),
+        ("ecalc_pool_recycled_total", "counter", "Automators restarted after failing, expiring or crashing",
+         [({}, pool["recycled"])]),
+        ("ecalc_jobs_queued", "gauge", "Jobs waiting for an automator", [({}, jobs["queued"])]),
+        ("ecalc_jobs_running", "gauge", "Jobs currently running", [({}, jobs["running"])]),
+        ("ecalc_jobs_queue_capacity", "gauge", "Maximum number of waiting jobs", [({}, jobs["max_queued"])]),
+    ]
+    if "result_cache" in jobs:
+        rc = jobs["result_cache"]
+        families.append(("ecalc_result_cache_entries", "gauge", "Entries in the API result cache", [({}, rc["entries"])]))
+        families.append(("ecalc_result_cache_lookups_total", "counter", "API result cache lookups by result",
+                         [({"result": "hit"}, rc["hits"]), ({"result": "miss"}, rc["misses"])]))
+    return families
+
+def _setup_inputs(input_data: SetupFinderInput) -> Dict[str, str]:
+    return {
+        "weight": input_data.weight,
+        "wingspan": input_data.wingspan,
+        "wing_area": input_data.wing_area,
+        "speed": input_data.speed,
+        "thrust": input_data.thrust,
+        "battery_cells": input_data.battery_cells,
+        "wing_type": input_data.wing_type
+    }
+
+def _request_key(inputs: Dict[str, str], limit: int) -> str:
+    return canonical_key({**inputs, "limit": limit}, REQUEST_KEY_FIELDS)
+
+def _motor_result(setup: Dict[str, Any], pc_res: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "motor_name": setup.get("motor_name", "Unknown"),
+        "prop_diam": setup.get("prop_diam", "?"),
+        "prop_pitch": setup.get("prop_pitch", "?"),
+        "manufacturer": setup.get("manufacturer", ""),
+        "power": pc_res.get("power", "N/A"),
+        "traction": pc_res.get("traction", "N/A"),
+        "motor_weight": pc_res.get("motor_weight", "N/A"),
+        "drive_weight": pc_res.get("drive_weight", "N/A")
+    }
+
+def _calculate(auto: ECalAutomator, job: Job):
+    # 1. Setup Finder (stops at the job's limit)
+    job.set_stage("setup_finder")
+    top_setups = []
+    for setup in auto.iter_setup_finder(job.inputs, limit=job.limit):
+        top_setups.append(setup)
+        if job.cancelled:
+            return
+    job.set_total(len(top_setups))
+
+    # 2. Prop Calc (grouped by manufacturer/motor); each result is published as soon as it is ready
+    job.set_stage("propcalc")
+    pc_results = auto.run_prop_calc_batch(top_setups,
+                                          on_result=lambda i, setup, pc_res: job.add_result(i, _motor_result(setup, pc_res)),
+                                          should_stop=lambda: job.cancelled)
+    # Like the PropCalc cache: incomplete calculations are not served to later identical requests,
+    # and neither is an empty Setup Finder run (missing search button, dropped session...)
+    job.cacheable = bool(pc_results) and all(r is not None and r.get("power", "N/A") != "N/A" for r in pc_results)
+
+def _run_job(job: Job):
+    # Runs on a job runner thread; the automator itself is driven on the worker's own thread
+    print(f"Running job {job.id}: {job.inputs} (limit {job.limit})")
+    with app.state.pool.checkout() as worker:
+        worker.call(_calculate, job)
+
+def _submit(input_data: SetupFinderInput) -> Job:
+    inputs = _setup_inputs(input_data)
+    try:
+        return app.state.jobs.submit(inputs, input_data.limit, asyncio.get_running_loop(),
+                                     key=_request_key(inputs, input_data.limit))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+
+def _not_modified(request: Request, etag: str) -> bool:
+    return etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+
+def _get_job(job_id: str) -> Job:
+    job = app.state.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+@app.get("/metrics")
+def read_metrics():
+    """Prometheus text exposition of the service and automation metrics."""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.post("/api/jobs", status_code=202)
+async def submit_job(input_data: SetupFinderInput):
+    job = _submit(input_data)
+    return {
+        **job.progress(),
+        "status_url": f"/api/jobs/{job.id}",
+        "results_url": f"/api/jobs/{job.id}/results",
+    }
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str, request: Request, response: Response):
+    job = _get_job(job_id)
+    info = job.describe()
+    # Results finished so far, in Setup Finder ranking order
+    info["results"] = job.ordered_results()
+    if job.status == DONE:
+        # A finished job never changes again
+        etag = ResultLRU.etag_for(info["results"])
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+    return info
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    # Identical submissions share the job: it is only cancelled once the last of them lets go
+    job = _get_job(job_id)
+    job.abandon()
+    return job.progress()
+
+@app.get("/api/jobs/{job_id}/results")
+async def stream_job(job_id: str, request: Request, format: Optional[str] = None):
+    """
+    Streams each MotorResult as soon as PropCalc finishes it (in completion order, with its ranking
+    index), then an "end" record. NDJSON by default; Server-Sent Events with format=sse or
+    Accept: text/event-stream.
+    """
+    job = _get_job(job_id)
+    sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+
+    async def events():
+        q = job.subscribe()
+        try:
+            while True:
+                event = await q.get()
+                if event["event"] == "progress":
+                    # Status changes are for SSE dashboards; NDJSON consumers only want results
+                    if not sse:
+                        continue
+                if sse:
+                    yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                else:
+                    yield json.dumps(event) + "\n"
+                if event["event"] == "end":
+                    return
+        finally:
+            job.unsubscribe(q)
+
+    media_type = "text/event-stream" if sse else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@app.post("/api/calculate", response_model=List[MotorResult])
+async def run_calculation(input_data: SetupFinderInput, request: Request, response: Response):
+    """
+    Blocking variant of POST /api/jobs: waits for the job and returns all results at once.
+    Identical concurrent requests wait for the same job; recent results come from the result cache.
+    """
+    print(f"Received request: {input_data}")
+    job = _submit(input_data)
+    q = job.subscribe()
+    try:
+        while (await q.get())["event"] != "end":
+            pass
+    except asyncio.CancelledError:
+        # Client went away: no point finishing the job if nobody else is waiting for it
+        job.abandon()
+        raise
+    finally:
+        job.unsubscribe(q)
+
+    if job.status == FAILED:
+        if isinstance(job.exception, TimeoutError):
+            raise HTTPException(status_code=503, detail=job.error)
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status == CANCELLED:
+        # Partial results: neither a valid answer nor something a client may cache by ETag
+        raise HTTPException(status_code=409, detail=f"Job {job.id} was cancelled")
+    results = job.ordered_results()
+    etag = ResultLRU.etag_for(results)
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["X-Cache"] = "HIT" if job.cached else "MISS"
+    return results
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
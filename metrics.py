@@ -0,0 +1,213 @@
+import bisect
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Seconds; spans a quick form fill up to a whole Setup Finder + PropCalc job
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0, 120.0, 300.0, 600.0)
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            return [(self.name, self._labels(k), v) for k, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            return [(self.name, self._labels(k), v) for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts..., +Inf count], sum
+        self._counts: Dict[Tuple[str, ...], List[int]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+                self._sums[key] = 0.0
+            counts[i] += 1
+            self._sums[key] += value
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        out = []
+        with self._lock:
+            for key, counts in sorted(self._counts.items()):
+                labels = self._labels(key)
+                cumulative = 0
+                for le, n in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += n
+                    out.append((self.name + "_bucket", {**labels, "le": _format_value(le)}, cumulative))
+                out.append((self.name + "_sum", labels, self._sums[key]))
+                out.append((self.name + "_count", labels, cumulative))
+        return out
+
+
+class Registry:
+    """
+    Process-wide set of metrics rendered in the Prometheus text exposition format.
+    Besides the metrics updated as things happen, collectors registered with add_collector() are
+    called on every scrape for values that are cheaper to read than to track (pool, queue, caches).
+    A collector returns [(name, type, help, [(labels, value), ...]), ...].
+    """
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, str, str, List[Sample]]]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], List[Tuple[str, str, str, List[Sample]]]]):
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"[Metrics] Collector failed: {e}")
+                continue
+            for name, mtype, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {mtype}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Content type of Registry.render() for the HTTP response
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+JOB_DURATION = REGISTRY.histogram(
+    "ecalc_job_duration_seconds", "Wall time of API jobs from start to end", ["status"])
+JOBS = REGISTRY.counter(
+    "ecalc_jobs_total", "API jobs by how they ended (done, failed, cancelled) or were admitted (coalesced, cached, rejected)",
+    ["status"])
+SETUP_FINDER_ROWS = REGISTRY.counter(
+    "ecalc_setup_finder_rows_total", "Setup Finder rows extracted from the result grid", ["source"])
+SETUP_FINDER_RUNS = REGISTRY.counter(
+    "ecalc_setup_finder_runs_total", "Setup Finder searches", ["source"])
+PROPCALC_CALLS = REGISTRY.counter(
+    "ecalc_propcalc_calls_total", "run_prop_calc calls by outcome (ok, na, err, cache_hit)", ["outcome"])
+PROPCALC_DURATION = REGISTRY.histogram(
+    "ecalc_propcalc_duration_seconds", "Duration of uncached PropCalc runs")
+PROPCALC_RETRIES = REGISTRY.counter(
+    "ecalc_propcalc_retries_total", "PropCalc attempts beyond the first for the same setup")
+RELOGINS = REGISTRY.counter(
+    "ecalc_relogins_total", "Re-logins triggered by the session check")
+SESSION_PROBES = REGISTRY.counter(
+    "ecalc_session_probes_total", "HTTP session probes by result (active, expired, unknown)", ["result"])
+CACHE_LOOKUPS = REGISTRY.counter(
+    "ecalc_cache_lookups_total", "Cache lookups by cache and result (hit, miss)", ["cache", "result"])
+PHASE_DURATION = REGISTRY.histogram(
+    "ecalc_phase_duration_seconds", "Duration of automation phases (see ECalAutomator.phase)", ["phase"])
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+# Nothing the automation reads is an image, font or video (gauges, graphs, banners...)
+DEFAULT_BLOCK_TYPES = ["image", "media", "font"]
+
+# Ads, analytics and social widgets embedded in the eCalc pages
+DEFAULT_BLOCK_DOMAINS = [
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "googleadservices.com",
+    "doubleclick.net", "adservice.google.com", "facebook.net", "facebook.com", "twitter.com",
+    "addthis.com", "sharethis.com", "hotjar.com", "paypal.com", "paypalobjects.com",
+]
+
+# Static assets of these hosts are kept in the local cache
+DEFAULT_CACHE_HOSTS = ["ecalc.ch"]
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class ResourceRouter:
+    """
+    Playwright route handler installed on every eCalc browser context.
+    Aborts configured resource types/domains and serves eCalc's static JS/CSS from a local
+    content-hashed cache; entries older than max_age_s are revalidated with ETag/Last-Modified.
+    Counters tell how many requests and bytes were saved.
+    """
+    def __init__(self, block_types: Optional[Iterable[str]] = None, block_domains: Optional[Iterable[str]] = None,
+                 cache_dir: Optional[str] = None, cache_hosts: Optional[Iterable[str]] = None,
+                 max_age_s: float = 3600.0):
+        self.block_types = set(DEFAULT_BLOCK_TYPES if block_types is None else block_types)
+        self.block_domains = list(DEFAULT_BLOCK_DOMAINS if block_domains is None else block_domains)
+        self.cache_hosts = list(DEFAULT_CACHE_HOSTS if cache_hosts is None else cache_hosts)
+        # None disables the static cache (blocking still applies)
+        self.cache_dir = cache_dir
+        self.max_age_s = max_age_s
+        self.counters = {
+            "requests": 0,
+            "blocked": 0,
+            "cache_hits": 0,
+            "revalidated": 0,
+            "cache_stores": 0,
+            "bytes_from_cache": 0,
+        }
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._index = self._load_index()
+
+    def install(self, context):
+        context.route("**/*", self.handle)
+
+    def handle(self, route):
+        request = route.request
+        self._count("requests")
+        try:
+            host = (urlparse(request.url).hostname or "").lower()
+            if request.resource_type in self.block_types or _host_matches(host, self.block_domains):
+                self._count("blocked")
+                route.abort("blockedbyclient")
+                return
+            if self._cacheable(request, host):
+                self._serve_cached(route)
+                return
+        except Exception as e:
+            print(f"[Network] Routing error for {request.url}: {e}")
+        try:
+            # Lets other handlers (e.g. HAR replay) see the request before it goes to the network
+            route.fallback()
+        except: pass
+
+    def _cacheable(self, request, host: str) -> bool:
+        return (self.cache_dir is not None and request.method == "GET"
+                and request.resource_type in ("script", "stylesheet")
+                and _host_matches(host, self.cache_hosts))
+
+    def _serve_cached(self, route):
+        url = route.request.url
+        with self._lock:
+            entry = self._index.get(url)
+        body = self._read_body(entry) if entry else None
+
+        if entry and body is not None and time.time() - entry["fetched_at"] < self.max_age_s:
+            self._count("cache_hits")
+            self._count("bytes_from_cache", len(body))
+            route.fulfill(status=200, headers=entry["headers"], body=body)
+            return
+
+        headers = dict(route.request.headers)
+        if entry and body is not None:
+            if entry["headers"].get("etag"):
+                headers["if-none-match"] = entry["headers"]["etag"]
+            if entry["headers"].get("last-modified"):
+                headers["if-modified-since"] = entry["headers"]["last-modified"]
+        response = route.fetch(headers=headers)
+
+        if response.status == 304 and body is not None:
+            self._count("revalidated")
+            self._count("bytes_from_cache", len(body))
+            with self._lock:
+                entry["fetched_at"] = time.time()
+                self._save_index()
+            route.fulfill(status=200, headers=entry["headers"], body=body)
+            return
+
+        if response.status == 200:
+            self._store(url, response.headers, response.body())
+        route.fulfill(response=response)
+
+    def _store(self, url: str, headers: Dict[str, str], body: bytes):
+        digest = hashlib.sha256(body).hexdigest()
+        keep = {k: v for k, v in headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+        path = os.path.join(self.cache_dir, digest)
+        try:
+            if not os.path.exists(path):
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(body)
+                os.replace(tmp_path, path)
+            with self._lock:
+                self._index[url] = {"sha256": digest, "headers": keep, "fetched_at": time.time()}
+                self._save_index()
+            self._count("cache_stores")
+        except Exception as e:
+            print(f"[Network] Could not cache {url}: {e}")
+
+    def _read_body(self, entry: Dict[str, Any]) -> Optional[bytes]:
+        try:
+            with open(os.path.join(self.cache_dir, entry["sha256"]), "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        # Content-addressed: a damaged file simply does not count as cached
+        return body if hashlib.sha256(body).hexdigest() == entry["sha256"] else None
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.cache_dir, "index.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except:
+            return {}
+
+    def _save_index(self):
+        # Caller holds self._lock
+        path = os.path.join(self.cache_dir, "index.json")
+        tmp_path = path + f".{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, path)
+
+    def _count(self, key: str, n: int = 1):
+        with self._lock:
+            self.counters[key] += n
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.counters)
@@ -0,0 +1,108 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from automation import ECalAutomator
+from pool import AutomatorWorker
+
+
+class ParallelPropCalc:
+    """
+    Spreads independent PropCalc runs over `concurrency` pages.
+    Every page lives in its own thread-bound worker (Playwright sync objects cannot cross threads),
+    seeded with the logged-in session of the main automator, so each page keeps its own form state.
+    A failing setup or crashing page only affects that setup; results come back in input order.
+    """
+    def __init__(self, auto: ECalAutomator, concurrency: int = 3, headless: bool = True,
+                 max_restarts: int = 2):
+        self.auto = auto
+        self.concurrency = max(1, int(concurrency))
+        self.headless = headless
+        self.max_restarts = max_restarts
+
+    def run(self, setups: List[Dict[str, Any]],
+            on_result: Optional[Callable[[int, Dict[str, Any], Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        if not setups:
+            return []
+
+        # Snapshot of the main session, taken on the main automator's own thread
+        storage_state = self.auto.export_storage_state()
+        email = getattr(self.auto, "email", None)
+        password = getattr(self.auto, "password", None)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(setups)
+        todo: "queue.Queue[int]" = queue.Queue()
+        # Grouped by manufacturer/motor, so a worker's consecutive setups tend to share form fields
+        for i in self.auto.prop_calc_order(setups):
+            todo.put(i)
+        lock = threading.Lock()
+
+        def _finish(index: int, res: Dict[str, Any]):
+            with lock:
+                results[index] = res
+                if on_result:
+                    try:
+                        on_result(index, setups[index], res)
+                    except Exception as e:
+                        print(f"[Parallel] on_result callback failed: {e}")
+
+        def _run_worker(n: int):
+            worker = AutomatorWorker(f"propcalc{n}", headless=self.headless, storage_state=storage_state,
+                                     session=self.auto.session, replay_har=self.auto.replay_har,
+                                     base_url=self.auto.base_url)
+            restarts = 0
+            try:
+                worker.start(email, password)
+                worker.automator.result_cache = self.auto.result_cache
+            except Exception as e:
+                print(f"[Parallel] {worker.name} failed to start: {e}")
+                return
+            try:
+                while True:
+                    try:
+                        index = todo.get_nowait()
+                    except queue.Empty:
+                        return
+                    setup = setups[index]
+                    started = time.time()
+                    try:
+                        res = worker.call(lambda auto, s: auto.run_prop_calc(s), setup)
+                        print(f"[Parallel] {worker.name}: {setup.get('motor_name', 'Unknown')} done in {time.time() - started:.1f}s")
+                        _finish(index, res)
+                    except Exception as e:
+                        print(f"[Parallel] {worker.name} failed on {setup.get('motor_name', 'Unknown')}: {e}")
+                        _finish(index, self.auto.empty_prop_calc_result(setup))
+                        # The page may be gone; give the worker a fresh browser before the next setup
+                        if restarts >= self.max_restarts:
+                            print(f"[Parallel] {worker.name} exceeded {self.max_restarts} restarts. Retiring it.")
+                            return
+                        restarts += 1
+                        try:
+                            worker.stop()
+                            worker.start(email, password)
+                            worker.automator.result_cache = self.auto.result_cache
+                        except Exception as e2:
+                            print(f"[Parallel] {worker.name} could not restart: {e2}")
+                            return
+            finally:
+                worker.shutdown()
+
+        n_workers = min(self.concurrency, len(setups))
+        print(f"[Parallel] Running {len(setups)} PropCalc setups on {n_workers} pages...")
+        threads = [threading.Thread(target=_run_worker, args=(n,), daemon=True) for n in range(n_workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Setups left over because every worker was retired are run serially on the main page
+        for i, res in enumerate(results):
+            if res is None:
+                print(f"[Parallel] Running leftover setup {setups[i].get('motor_name', 'Unknown')} on the main page...")
+                try:
+                    _finish(i, self.auto.run_prop_calc(setups[i]))
+                except Exception as e:
+                    print(f"[Parallel] Leftover setup failed: {e}")
+                    _finish(i, self.auto.empty_prop_calc_result(setups[i]))
+        return results
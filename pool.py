@@ -0,0 +1,207 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from automation import ECalAutomator
+from session import SessionManager
+
+
+class AutomatorWorker:
+    """
+    One ECalAutomator pinned to its own thread.
+    Playwright's sync objects may only be used from the thread that created them,
+    so every call on the automator is funnelled through a single-thread executor.
+    """
+    def __init__(self, name: str, headless: bool = True, profile_dir: Optional[str] = None,
+                 storage_state: Optional[Dict[str, Any]] = None, session: Optional[SessionManager] = None,
+                 replay_har: Optional[str] = None, base_url: Optional[str] = None):
+        self.name = name
+        self.headless = headless
+        self.profile_dir = profile_dir
+        # When given, the worker reuses this logged-in session instead of logging in itself
+        self.storage_state = storage_state
+        # Source of the saved login when no storage_state is given; updated when the worker re-logs in
+        self.session = session
+        self.replay_har = replay_har
+        self.base_url = base_url
+        self.automator: Optional[ECalAutomator] = None
+        self.uses = 0
+        self.started_at = 0.0
+        self.broken = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ecalc-{name}")
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs fn(automator, *args, **kwargs) on the worker thread and returns its result."""
+        return self._executor.submit(fn, self.automator, *args, **kwargs).result()
+
+    def start(self, email: str, password: str, verify_login: bool = False) -> bool:
+        def _start(_):
+            auto = ECalAutomator(headless=self.headless, profile_dir=self.profile_dir,
+                                 storage_state=self.storage_state, session=self.session,
+                                 replay_har=self.replay_har, base_url=self.base_url)
+            auto.start()
+            self.automator = auto
+            if auto.storage_state is not None and not verify_login:
+                # Credentials are still needed if _ensure_session_valid has to re-login
+                auto.email = email
+                auto.password = password
+                return True
+            return auto.login(email, password)
+
+        self.uses = 0
+        self.broken = False
+        self.started_at = time.time()
+        logged_in = self._executor.submit(_start, None).result()
+        if not logged_in:
+            print(f"[Pool] WARNING: {self.name} started but login could not be confirmed.")
+        return logged_in
+
+    def stop(self):
+        if self.automator:
+            try:
+                self.call(lambda auto: auto.stop())
+            except Exception as e:
+                print(f"[Pool] Error stopping {self.name}: {e}")
+        self.automator = None
+
+    def shutdown(self):
+        self.stop()
+        self._executor.shutdown(wait=False)
+
+    def is_healthy(self) -> bool:
+        if self.broken or not self.automator:
+            return False
+        try:
+            return self.call(lambda auto: auto.is_alive())
+        except:
+            return False
+
+    def reset(self):
+        self.call(lambda auto: auto.reset_page())
+
+
+class AutomatorPool:
+    """
+    Keeps `size` warm, headless, logged-in automators for the API.
+    Requests check a worker out, get a freshly reset page and hand it back;
+    workers that fail a health check, raise, or exceed max_uses/max_age_s are recycled.
+    Only the first worker logs in; the others (and recycled ones) start from the saved session state.
+    """
+    def __init__(self, credentials_loader: Callable[[], Dict[str, str]], size: int = 2, headless: bool = True,
+                 max_uses: int = 50, max_age_s: float = 3600.0, checkout_timeout_s: float = 300.0,
+                 state_path: Optional[str] = None):
+        self.credentials_loader = credentials_loader
+        self.size = max(1, int(size))
+        self.headless = headless
+        self.max_uses = max_uses
+        self.max_age_s = max_age_s
+        self.checkout_timeout_s = checkout_timeout_s
+        self.session = SessionManager(state_path, headless=headless)
+        self._workers = []
+        self._idle: "queue.Queue[AutomatorWorker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.recycled = 0
+
+    @classmethod
+    def from_env(cls, credentials_loader: Callable[[], Dict[str, str]]) -> "AutomatorPool":
+        return cls(
+            credentials_loader,
+            size=int(os.getenv("ECALC_POOL_SIZE", "2")),
+            headless=os.getenv("ECALC_HEADLESS", "1") != "0",
+            max_uses=int(os.getenv("ECALC_POOL_MAX_USES", "50")),
+            max_age_s=float(os.getenv("ECALC_POOL_MAX_AGE", "3600")),
+            checkout_timeout_s=float(os.getenv("ECALC_POOL_CHECKOUT_TIMEOUT", "300")),
+            state_path=os.getenv("ECALC_SESSION_STATE") or None,
+        )
+
+    def start(self):
+        creds = self.credentials_loader()
+        for i in range(self.size):
+            worker = AutomatorWorker(f"worker{i}", headless=self.headless, session=self.session)
+            print(f"[Pool] Starting {worker.name}...")
+            try:
+                # The first worker confirms (or creates) the saved login, the others just reuse it
+                worker.start(creds["email"], creds["password"], verify_login=(i == 0))
+            except Exception as e:
+                # Keep the slot; it will be recycled on first checkout
+                print(f"[Pool] Failed to start {worker.name}: {e}")
+                worker.broken = True
+            self._workers.append(worker)
+            self._idle.put(worker)
+        print(f"[Pool] Ready with {self.size} automator(s).")
+
+    def stop(self):
+        for worker in self._workers:
+            worker.shutdown()
+        self._workers = []
+
+    def _expired(self, worker: AutomatorWorker) -> bool:
+        if self.max_uses and worker.uses >= self.max_uses:
+            return True
+        if self.max_age_s and time.time() - worker.started_at > self.max_age_s:
+            return True
+        return False
+
+    def _recycle(self, worker: AutomatorWorker):
+        print(f"[Pool] Recycling {worker.name} (uses={worker.uses}, broken={worker.broken})...")
+        worker.stop()
+        creds = self.credentials_loader()
+        worker.start(creds["email"], creds["password"])
+        with self._lock:
+            self.recycled += 1
+
+    def _recycle_and_release(self, worker: AutomatorWorker):
+        try:
+            self._recycle(worker)
+        except Exception as e:
+            print(f"[Pool] Recycle of {worker.name} failed: {e}")
+            worker.broken = True
+        self._idle.put(worker)
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None):
+        try:
+            worker = self._idle.get(timeout=timeout if timeout is not None else self.checkout_timeout_s)
+        except queue.Empty:
+            raise TimeoutError("No eCalc automator became available in time")
+
+        with self._lock:
+            self.in_use += 1
+        try:
+            if not worker.is_healthy() or self._expired(worker):
+                self._recycle(worker)
+            worker.reset()
+        except Exception:
+            with self._lock:
+                self.in_use -= 1
+            worker.broken = True
+            self._idle.put(worker)
+            raise
+
+        try:
+            yield worker
+        except Exception:
+            worker.broken = True
+            raise
+        finally:
+            worker.uses += 1
+            with self._lock:
+                self.in_use -= 1
+            if worker.broken or self._expired(worker):
+                # Restart in the background so the response is not held up by a Chromium launch
+                threading.Thread(target=self._recycle_and_release, args=(worker,), daemon=True).start()
+            else:
+                self._idle.put(worker)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "in_use": self.in_use,
+            "recycled": self.recycled,
+        }
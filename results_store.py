@@ -0,0 +1,218 @@
+import csv
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from journal import RunJournal, journal_path
+from spreadsheets import read_spreadsheet
+
+SPEEDS = list(range(0, 136, 9))
+
+# Numeric result columns, in spreadsheet order; these are also what query() can sort by
+NUMERIC_COLUMNS = [
+    "drive_weight", "power", "eff_max_throttle", "thr_at_power", "power_at_eff", "eff_at_power", "thrust_at_power",
+] + [f"traction_{v}" for v in SPEEDS]
+
+RESULT_COLUMNS = [
+    "run_id", "rank", "config_hash", "analyzed_power",
+    "manufacturer", "motor", "prop_diam", "prop_pitch", "prop_blades",
+] + NUMERIC_COLUMNS
+
+SORTABLE = ["prop_diam", "prop_pitch", "prop_blades", "analyzed_power"] + NUMERIC_COLUMNS
+
+
+def _number(value: Any) -> Optional[float]:
+    """"85.9" -> 85.9; "N/A", "Err", "-" and the like -> None"""
+    try:
+        return float(str(value).strip().replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _file_numbers(path: str) -> Tuple[Optional[float], Optional[int]]:
+    """Analyzed power and limit from a spreadsheet name such as "P600 - N300.csv"."""
+    name = os.path.basename(path)
+    power = re.search(r"\bP(\d+(?:\.\d+)?)", name)
+    limit = re.search(r"\bN(\d+)", name)
+    return (float(power.group(1)) if power else None), (int(limit.group(1)) if limit else None)
+
+
+class ResultStore:
+    """
+    Every spreadsheet in Planilhas/ (either header layout) normalized into one SQLite table with
+    numeric columns, indexed on manufacturer, motor, prop diameter/pitch and configuration hash.
+    import_dir() only re-reads spreadsheets whose size or mtime changed, so it is cheap to call
+    before every query. The configuration hash is the run journal's PropCalc key when the
+    spreadsheet has one (see journal.py); older spreadsheets have none.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        numeric = ",\n".join(f"                {c} REAL" for c in NUMERIC_COLUMNS)
+        with self._lock:
+            self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                source TEXT UNIQUE NOT NULL,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                analyzed_power REAL,
+                run_limit INTEGER,
+                config_hash TEXT,
+                configuration TEXT,
+                row_count INTEGER NOT NULL,
+                imported_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                rank INTEGER NOT NULL,
+                config_hash TEXT,
+                analyzed_power REAL,
+                manufacturer TEXT COLLATE NOCASE,
+                motor TEXT COLLATE NOCASE,
+                prop_diam REAL,
+                prop_pitch REAL,
+                prop_blades INTEGER,
+{numeric}
+            );
+            CREATE INDEX IF NOT EXISTS results_manufacturer ON results (manufacturer);
+            CREATE INDEX IF NOT EXISTS results_motor ON results (motor);
+            CREATE INDEX IF NOT EXISTS results_prop ON results (prop_diam, prop_pitch);
+            CREATE INDEX IF NOT EXISTS results_config ON results (config_hash);
+            CREATE INDEX IF NOT EXISTS results_power ON results (analyzed_power);
+            CREATE INDEX IF NOT EXISTS results_run ON results (run_id);
+            """)
+            self._conn.commit()
+
+    def import_dir(self, plan_dir: str, force: bool = False) -> Dict[str, int]:
+        """Imports new or changed Planilhas/*.csv; spreadsheets that disappeared keep their rows."""
+        counts = {"imported": 0, "unchanged": 0, "rows": 0}
+        for path in sorted(glob.glob(os.path.join(plan_dir, "*.csv"))):
+            rows = self.import_spreadsheet(path, force=force)
+            if rows is None:
+                counts["unchanged"] += 1
+            else:
+                counts["imported"] += 1
+                counts["rows"] += rows
+        return counts
+
+    def import_spreadsheet(self, path: str, force: bool = False) -> Optional[int]:
+        """Replaces the rows of one spreadsheet; returns how many, or None if it did not change."""
+        source = os.path.abspath(path)
+        st = os.stat(source)
+        with self._lock:
+            known = self._conn.execute("SELECT mtime, size FROM runs WHERE source = ?", (source,)).fetchone()
+        if known is not None and not force and known["mtime"] == st.st_mtime and known["size"] == st.st_size:
+            return None
+
+        results = read_spreadsheet(source)
+        power, limit = _file_numbers(source)
+        if results and _number(results[0].get("analyzed_power")) is not None:
+            power = _number(results[0]["analyzed_power"])
+        journal = RunJournal.load(journal_path(source))
+        config_hash = journal.config_key if journal is not None else None
+        configuration = json.dumps(journal.configuration, ensure_ascii=False) if journal is not None else None
+
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM results WHERE run_id IN (SELECT id FROM runs WHERE source = ?)", (source,))
+                self._conn.execute("DELETE FROM runs WHERE source = ?", (source,))
+                run_id = self._conn.execute(
+                    "INSERT INTO runs (source, mtime, size, analyzed_power, run_limit, config_hash, configuration,"
+                    " row_count, imported_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (source, st.st_mtime, st.st_size, power, limit, config_hash, configuration,
+                     len(results), time.time())).lastrowid
+                rows = []
+                for rank, res in enumerate(results, 1):
+                    blades = _number(res.get("prop_blades"))
+                    rows.append([
+                        run_id, rank, config_hash, power,
+                        str(res.get("manufacturer", "")).strip(), str(res.get("motor", "")).strip(),
+                        _number(res.get("prop_diam")), _number(res.get("prop_pitch")),
+                        int(blades) if blades is not None else None,
+                    ] + [_number(res.get(c)) for c in NUMERIC_COLUMNS])
+                self._conn.executemany(
+                    f"INSERT INTO results ({', '.join(RESULT_COLUMNS)}) VALUES ({', '.join('?' * len(RESULT_COLUMNS))})",
+                    rows)
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return len(results)
+
+    def query(self, manufacturer: Optional[str] = None, motor: Optional[str] = None,
+              diam: Optional[float] = None, pitch: Optional[float] = None, blades: Optional[int] = None,
+              power: Optional[float] = None, config: Optional[str] = None, min_eff: Optional[float] = None,
+              sort: str = "eff_at_power", ascending: bool = False, distinct: bool = False,
+              limit: Optional[int] = 20) -> List[Dict[str, Any]]:
+        """
+        Results matching every given filter, best first by `sort` (rows without a value last).
+        manufacturer matches exactly, motor as a substring (both case-insensitive), config as a
+        hash prefix. distinct keeps only the best row per motor + prop across runs.
+        """
+        if sort not in SORTABLE:
+            raise ValueError(f"Cannot sort by {sort!r}; use one of {', '.join(SORTABLE)}")
+        where, params = [], []
+        if manufacturer:
+            where.append("r.manufacturer = ?")
+            params.append(manufacturer)
+        if motor:
+            where.append("r.motor LIKE ?")
+            params.append(f"%{motor}%")
+        for column, value in (("prop_diam", diam), ("prop_pitch", pitch), ("prop_blades", blades),
+                              ("analyzed_power", power)):
+            if value is not None:
+                where.append(f"r.{column} = ?")
+                params.append(value)
+        if config:
+            where.append("r.config_hash LIKE ?")
+            params.append(f"{config}%")
+        if min_eff is not None:
+            where.append("r.eff_at_power >= ?")
+            params.append(min_eff)
+
+        direction = "ASC" if ascending else "DESC"
+        order = f"r.{sort} IS NULL, r.{sort} {direction}"
+        sql = "SELECT r.*, u.source FROM results r JOIN runs u ON u.id = r.run_id"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if distinct:
+            sql = (f"SELECT * FROM (SELECT x.*, ROW_NUMBER() OVER (PARTITION BY x.motor, x.prop_diam, x.prop_pitch "
+                   f"ORDER BY x.{sort} IS NULL, x.{sort} {direction}) AS best FROM ({sql}) x) r WHERE r.best = 1")
+        sql += f" ORDER BY {order}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{k: row[k] for k in row.keys() if k != "best"} for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            runs, rows = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(row_count), 0) FROM runs").fetchone()
+        return {"runs": runs, "rows": rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def export_rows(rows: List[Dict[str, Any]], path: str):
+    """Writes query results as .json, or as a ;-separated CSV like the Planilhas (anything else)."""
+    if path.lower().endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+        return
+    columns = list(rows[0].keys()) if rows else RESULT_COLUMNS
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, delimiter=";")
+        writer.writeheader()
+        writer.writerows(rows)
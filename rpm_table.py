@@ -0,0 +1,132 @@
+# The PropCalc "partial load" table (#rpmTable) as numeric columns, and the values derived from it.
+# run_prop_calc stores the whole table with each result (result["rpm_table"]), so efficiency, throttle
+# and thrust at any analyzed power come from interpolation instead of another browser run.
+import copy
+from typing import Any, Dict, Iterable, List, Optional
+
+COLUMNS = ["throttle", "power", "eff", "thrust"]
+
+
+def _fmt(value: Optional[float], digits: int = 1) -> str:
+    if value is None:
+        return "N/A"
+    value = round(value, digits)
+    return str(int(value)) if value == int(value) else str(value)
+
+
+def _lerp(a: Optional[float], b: Optional[float], t: float) -> Optional[float]:
+    # Efficiency cells can be empty ("-") while the rest of the row is valid
+    if a is None or b is None:
+        return None
+    return a + (b - a) * t
+
+
+def _rows(table: Dict[str, List[float]]) -> List[Dict[str, float]]:
+    n = min(len(table.get(c) or []) for c in COLUMNS)
+    return [{c: table[c][i] for c in COLUMNS} for i in range(n)]
+
+
+def _eff_at(rows: List[Dict[str, float]], target: float) -> Optional[float]:
+    """
+    Efficiency at target from the rows (sorted by power) that have one: interpolated between the nearest
+    such rows around target, else the closest one's. An empty cell ("-") next to target does not blank it.
+    """
+    rows = [r for r in rows if r["eff"] is not None]
+    for a, b in zip(rows, rows[1:]):
+        if a["power"] <= target <= b["power"]:
+            span = b["power"] - a["power"]
+            return _lerp(a["eff"], b["eff"], (target - a["power"]) / span if span else 0.0)
+    if not rows:
+        return None
+    return min(rows, key=lambda r: abs(r["power"] - target))["eff"]
+
+
+def max_throttle_row(table: Dict[str, List[float]]) -> Optional[Dict[str, float]]:
+    rows = _rows(table)
+    if not rows:
+        return None
+    best = rows[0]
+    for r in rows[1:]:
+        if r["throttle"] >= best["throttle"]:
+            best = r
+    return best
+
+
+def at_power(table: Dict[str, List[float]], target_power: float) -> Dict[str, Any]:
+    """
+    Throttle, efficiency and thrust at target_power (W, electric input).
+    Inside the measured power range the neighbouring rows are interpolated linearly ("interpolated").
+    Outside it the nearest row is used if it lies within max(50 W, 15 %) of the target ("closest");
+    further away there is no answer ("error").
+    """
+    rows = sorted(_rows(table), key=lambda r: r["power"])
+    if not rows:
+        return {"mode": "error", "error": "No data rows"}
+    target = float(target_power)
+    lo, hi = rows[0], rows[-1]
+
+    if lo["power"] <= target <= hi["power"]:
+        for a, b in zip(rows, rows[1:]):
+            if a["power"] <= target <= b["power"]:
+                span = b["power"] - a["power"]
+                t = (target - a["power"]) / span if span else 0.0
+                out = {c: _lerp(a[c], b[c], t) for c in COLUMNS}
+                out["power"] = target
+                out["eff"] = _eff_at(rows, target)
+                out.update({"mode": "interpolated", "closest_power_diff": 0.0})
+                return out
+
+    nearest = lo if abs(lo["power"] - target) <= abs(hi["power"] - target) else hi
+    diff = abs(nearest["power"] - target)
+    if diff > max(50.0, target * 0.15):
+        return {"mode": "error", "error": "Target power too far", "closest_power_diff": diff,
+                "power_min": lo["power"], "power_max": hi["power"]}
+    return {**nearest, "eff": _eff_at(rows, target), "mode": "closest", "closest_power_diff": diff}
+
+
+def summarize(table: Dict[str, List[float]], target_power: float) -> Dict[str, str]:
+    """The result fields run_prop_calc fills from the table (strings, like the rest of the result)."""
+    out = {"eff_row_count": str(len(_rows(table)))}
+    top = max_throttle_row(table)
+    out["eff_max_throttle"] = _fmt(top["eff"]) if top and top["eff"] is not None else "Err"
+    out.update(fields_at_power(table, target_power))
+    return out
+
+
+def fields_at_power(table: Dict[str, List[float]], target_power: float) -> Dict[str, str]:
+    point = at_power(table, target_power)
+    if point["mode"] == "error":
+        return {
+            "eff_at_power": "Err",
+            "power_at_eff": "N/A",
+            "thr_at_power": "Err",
+            "thrust_at_power": "Err",
+            "eff_closest_power_diff": _fmt(point.get("closest_power_diff")),
+            "eff_at_power_mode": "error",
+        }
+    return {
+        "eff_at_power": _fmt(point["eff"]),
+        "power_at_eff": _fmt(point["power"], 0),
+        "thr_at_power": _fmt(point["throttle"]),
+        "thrust_at_power": _fmt(point["thrust"], 0),
+        "eff_closest_power_diff": _fmt(point["closest_power_diff"]),
+        "eff_at_power_mode": point["mode"],
+    }
+
+
+def apply_target_power(result: Dict[str, Any], target_power: float) -> Dict[str, Any]:
+    """
+    Copy of a PropCalc result with the at-power fields recomputed for target_power.
+    Results without a captured table (older caches, failed extraction) are returned unchanged.
+    """
+    table = result.get("rpm_table")
+    if not table:
+        return result
+    out = copy.deepcopy(result)
+    out.update(fields_at_power(table, target_power))
+    return out
+
+
+def series(result: Dict[str, Any], powers: Iterable[float]) -> Dict[float, Dict[str, Any]]:
+    """apply_target_power for several powers at once, e.g. a P400/P600/P800 spreadsheet series."""
+    return {p: apply_target_power(result, p) for p in powers}
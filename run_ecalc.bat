@@ -1,5 +1,5 @@
-@echo off
-cd /d "%~dp0"
-echo Starting eCalc Automation Tool...
-python cli.py
-pause
+@echo off
+cd /d "%~dp0"
+echo Starting eCalc Automation Tool...
+python cli.py
+pause
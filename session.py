@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from playwright.sync_api import sync_playwright
+
+
+class SessionManager:
+    """
+    Logs in to eCalc once and shares that session as a Playwright storage_state file.
+    Automators started with session=<manager> get a lightweight browser.new_context(storage_state=...)
+    in the manager's single browser instead of launching a persistent profile each, and write the
+    state back whenever they (re-)log in, so the next context starts logged in.
+    Playwright's sync objects are bound to their thread: only automators started on the manager's
+    thread share its browser; on other threads they launch their own browser with the saved state.
+    """
+    def __init__(self, state_path: Optional[str] = None, headless: bool = False):
+        self.state_path = state_path or os.path.join(os.getcwd(), "ecalc_session", "storage_state.json")
+        self.headless = headless
+        self.playwright = None
+        self.browser = None
+        self.refreshes = 0
+        self._state: Optional[Dict[str, Any]] = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Launches the shared browser (call on the thread that will create the automators)."""
+        self.playwright = sync_playwright().start()
+        self.browser = self.playwright.chromium.launch(headless=self.headless)
+        self._thread = threading.get_ident()
+
+    def stop(self):
+        if self.browser:
+            self.browser.close()
+            self.browser = None
+        if self.playwright:
+            self.playwright.stop()
+            self.playwright = None
+
+    def can_share_browser(self) -> bool:
+        return self.browser is not None and threading.get_ident() == self._thread
+
+    @property
+    def state(self) -> Optional[Dict[str, Any]]:
+        """Last saved storage_state, or None if nobody has logged in yet."""
+        with self._lock:
+            if self._state is None and os.path.exists(self.state_path):
+                try:
+                    with open(self.state_path, "r", encoding="utf-8") as f:
+                        self._state = json.load(f)
+                except Exception as e:
+                    print(f"[Session] Could not read {self.state_path}: {e}")
+            return self._state
+
+    def save_state(self, state: Dict[str, Any]):
+        with self._lock:
+            self._state = state
+            self.refreshes += 1
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+                # Written to a temp file first so a crash never leaves half a session behind
+                tmp_path = self.state_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, self.state_path)
+            except Exception as e:
+                print(f"[Session] Could not save {self.state_path}: {e}")
+
+    def invalidate(self):
+        """Forgets the saved session (e.g. after the site rejected it)."""
+        with self._lock:
+            self._state = None
+            try:
+                if os.path.exists(self.state_path):
+                    os.remove(self.state_path)
+            except: pass
+
+    def new_context(self, **options):
+        """A fresh context in the shared browser, seeded with the saved session."""
+        return self.browser.new_context(storage_state=self.state, **options)
+
+
+class SessionState:
+    """
+    Remembers when the login was last confirmed (successful login, probe or calculation) so the
+    session is not re-checked more than once per ttl_s. Also counts probes and re-logins.
+    """
+    def __init__(self, ttl_s: float = 300.0):
+        self.ttl_s = ttl_s
+        self.confirmed_at = 0.0
+        self.probes = 0
+        self.relogins = 0
+
+    def is_fresh(self) -> bool:
+        return bool(self.ttl_s) and time.time() - self.confirmed_at < self.ttl_s
+
+    def confirm(self):
+        self.confirmed_at = time.time()
+
+    def invalidate(self):
+        self.confirmed_at = 0.0
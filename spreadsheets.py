@@ -0,0 +1,65 @@
+import csv
+import os
+from typing import Any, Dict, List
+
+# Current layout (cli.write_spreadsheet): Portuguese headers, one "T100tracao{v}" column per speed and
+# the analyzed-power block as "Pot≈{P}Throttle[%]", "Pot≈{P}Pot[W]"...
+NEW_COLUMNS = {
+    "marca": "manufacturer", "motor": "motor", "massa[g]": "drive_weight",
+    "diametro": "prop_diam", "passo": "prop_pitch", "pa": "prop_blades",
+    "Throttle100Pot[W]": "power", "Throttle100tracao0[g]": "traction_0", "Throttle100Ef[%]": "eff_max_throttle",
+}
+NEW_POWER_SUFFIXES = {
+    "Throttle[%]": "thr_at_power", "Pot[W]": "power_at_eff", "Ef[%]": "eff_at_power", "Tracao[g]": "thrust_at_power",
+}
+
+# Older spreadsheets: English headers and "Traction_{v}kmh"; Motor holds the name without the manufacturer
+OLD_COLUMNS = {
+    "Manufacturer": "manufacturer", "Motor": "motor", "Weight": "drive_weight",
+    "Prop Diam": "prop_diam", "Prop Pitch": "prop_pitch", "Blades": "prop_blades",
+    "Power(W)": "power", "Eff Max(%)": "eff_max_throttle", "Thr Pwr(%)": "thr_at_power",
+    "Real Pwr(W)": "power_at_eff", "Eff Pwr(%)": "eff_at_power", "Thrst Pwr(g)": "thrust_at_power",
+}
+
+
+def _map_row(row: Dict[str, str]) -> Dict[str, Any]:
+    res = {}
+    for col, val in row.items():
+        if not col:
+            continue
+        col = col.strip()
+        if col in NEW_COLUMNS:
+            res[NEW_COLUMNS[col]] = val
+        elif col in OLD_COLUMNS:
+            res[OLD_COLUMNS[col]] = val
+        elif col.startswith("T100tracao"):
+            res[f"traction_{col[len('T100tracao'):]}"] = val
+        elif col.startswith("Traction_") and col.endswith("kmh"):
+            res[f"traction_{col[len('Traction_'):-len('kmh')]}"] = val
+        elif col.startswith("Pot≈"):
+            for suffix, key in NEW_POWER_SUFFIXES.items():
+                if col.endswith(suffix):
+                    res[key] = val
+                    if key == "thr_at_power":
+                        res["analyzed_power"] = col[len("Pot≈"):-len(suffix)]
+    return res
+
+
+def read_spreadsheet(filename: str) -> List[Dict[str, Any]]:
+    """
+    Rows of a Planilhas/*.csv spreadsheet (either layout) as result dicts keyed like combine_result()
+    output, so both read back the same way. [] if the file does not exist.
+    """
+    if not os.path.exists(filename):
+        return []
+    results = []
+    with open(filename, "r", newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f, delimiter=";"):
+            res = _map_row(row)
+            # Old layout: "V505-260" -> "T-Motor V505-260", the motor_name the Setup Finder reports
+            manufacturer = str(res.get("manufacturer", "")).strip()
+            motor = str(res.get("motor", "")).strip()
+            if "Motor" in row and manufacturer and not motor.lower().startswith(manufacturer.lower()):
+                res["motor"] = f"{manufacturer} {motor}"
+            results.append(res)
+    return results
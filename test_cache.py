@@ -0,0 +1,78 @@
+import pytest
+
+import cache
+from cache import PropCalcCache, ResultLRU, SetupFinderCache, canonical_key, PROPCALC_KEY_FIELDS
+
+SETUP = {"motor_name": "T-Motor MN505-S KV320", "prop_diam": "18", "prop_pitch": "10", "battery_cells": "12"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """cache.py's time.time(), advanced by hand."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_canonical_key_normalizes_values():
+    fields = ["prop_diam", "motor_name", "esc"]
+    base = canonical_key({"prop_diam": "20", "motor_name": "T-Motor MN505-S"}, fields)
+    assert canonical_key({"prop_diam": "20.0", "motor_name": "t-motor  MN505-S "}, fields) == base
+    assert canonical_key({"prop_diam": 20, "motor_name": "T-Motor MN505-S", "esc": ""}, fields) == base
+    assert canonical_key({"prop_diam": "20,0", "motor_name": "T-Motor MN505-S", "other": "x"}, fields) == base
+    assert canonical_key({"prop_diam": "20.5", "motor_name": "T-Motor MN505-S"}, fields) != base
+
+
+def test_propcalc_cache_ignores_fields_outside_the_key(tmp_path):
+    store = PropCalcCache(str(tmp_path / "c.sqlite"))
+    store.put(SETUP, {"power": "612"})
+    assert "analyzed_power" not in PROPCALC_KEY_FIELDS
+    assert store.get({**SETUP, "prop_diam": "18.0", "analyzed_power": "800"}) == {"power": "612"}
+    assert store.get({**SETUP, "prop_pitch": "11"}) is None
+    assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
+    store.close()
+
+
+def test_propcalc_cache_expiry_and_version(tmp_path, clock):
+    path = str(tmp_path / "c.sqlite")
+    store = PropCalcCache(path, ttl_s=60)
+    store.put(SETUP, {"power": "612"})
+    clock[0] += 61
+    assert store.get(SETUP) is None
+    assert store.purge_expired() == 1
+    store.put(SETUP, {"power": "612"})
+    store.close()
+
+    newer = PropCalcCache(path, ttl_s=60, version=cache.PROPCALC_CACHE_VERSION + 1)
+    assert newer.get(SETUP) is None
+    newer.close()
+
+
+def test_setup_finder_cache_evicts_least_recently_used(tmp_path, clock):
+    store = SetupFinderCache(str(tmp_path / "c.sqlite"), max_entries=2)
+    for n in (1, 2):
+        clock[0] += 1
+        store.put({"weight": n}, [{"motor_name": f"M{n}"}], complete=True)
+    clock[0] += 1
+    assert store.get({"weight": "1.0"})["rows"] == [{"motor_name": "M1"}]
+    clock[0] += 1
+    store.put({"weight": 3}, [], complete=False)
+
+    assert store.get({"weight": 2}) is None
+    assert store.get({"weight": 1}) is not None
+    assert store.get({"weight": 3}) == {"rows": [], "complete": False}
+    store.close()
+
+
+def test_result_lru_evicts_and_expires(clock):
+    lru = ResultLRU(max_entries=2, ttl_s=60)
+    etag = lru.put("a", [1])
+    lru.put("b", [2])
+    assert lru.get("a")["etag"] == etag == ResultLRU.etag_for([1])
+    lru.put("c", [3])
+    assert lru.get("b") is None
+    assert lru.get("a")["value"] == [1]
+
+    clock[0] += 61
+    assert lru.get("c") is None
+    assert lru.stats()["entries"] == 1
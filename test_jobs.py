@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+from cache import ResultLRU
+from jobs import JobManager, CANCELLED, DONE
+
+INPUTS = {"weight": "2500", "battery_cells": "6"}
+
+
+class Runner:
+    """Job runner that holds each job until release() (or its cancellation)."""
+    def __init__(self):
+        self.started = threading.Event()
+        self.go = threading.Event()
+
+    def __call__(self, job):
+        self.started.set()
+        while not self.go.wait(0.01):
+            if job.cancelled:
+                return
+        job.set_total(1)
+        job.add_result(0, {"motor": "T-Motor M0", "power": "612"})
+
+    def release(self):
+        self.go.set()
+
+
+def _manager(runner, **kwargs):
+    jobs = JobManager(runner, runners=1, result_cache=ResultLRU(max_entries=8, ttl_s=60), **kwargs)
+    jobs.start()
+    return jobs
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while not job.finished:
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.01)
+
+
+def test_identical_submits_share_one_job():
+    loop = asyncio.new_event_loop()
+    runner = Runner()
+    jobs = _manager(runner)
+    first = jobs.submit(INPUTS, 10, loop, key="k")
+    second = jobs.submit(INPUTS, 10, loop, key="k")
+    other = jobs.submit(INPUTS, 10, loop, key="other")
+    assert second is first and other is not first
+    assert first.attached == 2
+    assert jobs.stats()["coalesced"] == 1
+
+    runner.release()
+    _wait(first)
+    _wait(other)
+    assert first.status == DONE
+    # Finished: the next identical submit is served from the result cache
+    cached = jobs.submit(INPUTS, 10, loop, key="k")
+    assert cached is not first and cached.cached and cached.status == DONE
+    assert cached.ordered_results() == first.ordered_results()
+    jobs.stop()
+    loop.close()
+
+
+def test_abandon_cancels_only_when_the_last_client_leaves():
+    loop = asyncio.new_event_loop()
+    runner = Runner()
+    jobs = _manager(runner)
+    job = jobs.submit(INPUTS, 10, loop, key="k")
+    jobs.submit(INPUTS, 10, loop, key="k")
+    assert runner.started.wait(5)
+
+    assert job.abandon() is False
+    assert not job.cancelled and job.attached == 1
+    assert job.abandon() is True
+    assert job.cancelled
+    _wait(job)
+    assert job.status == CANCELLED
+    # A finished job is left alone
+    assert job.abandon() is False
+    jobs.stop()
+    loop.close()
+
+
+def test_cancelled_job_is_never_cached():
+    loop = asyncio.new_event_loop()
+    runner = Runner()
+    jobs = _manager(runner)
+    job = jobs.submit(INPUTS, 10, loop, key="k")
+    assert runner.started.wait(5)
+    job.abandon()
+    _wait(job)
+    assert job.status == CANCELLED
+    assert jobs.result_cache.get("k") is None
+
+    # The next identical submit runs again instead of getting the partial results
+    again = jobs.submit(INPUTS, 10, loop, key="k")
+    assert again is not job and not again.cached
+    runner.release()
+    _wait(again)
+    assert again.status == DONE and jobs.result_cache.get("k") is not None
+    jobs.stop()
+    loop.close()
+
+
+def test_cancel_while_queued():
+    loop = asyncio.new_event_loop()
+    runner = Runner()
+    jobs = _manager(runner)
+    running = jobs.submit(INPUTS, 10, loop, key="a")
+    queued = jobs.submit(INPUTS, 10, loop, key="b")
+    assert runner.started.wait(5)
+    assert queued.abandon() is True
+    assert queued.status == CANCELLED
+    runner.release()
+    _wait(running)
+    assert running.status == DONE
+    jobs.stop()
+    loop.close()
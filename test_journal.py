@@ -0,0 +1,79 @@
+import os
+
+from journal import RunJournal, journal_path
+
+SETUPS = [{"motor_name": f"T-Motor M{i}", "prop_diam": "18", "prop_pitch": "10"} for i in range(3)]
+
+
+def test_journal_path():
+    assert journal_path(os.path.join("Planilhas", "P600 - N300.csv")) == os.path.join("Planilhas", "P600 - N300.journal.jsonl")
+
+
+def test_resume_continues_with_pending(tmp_path):
+    path = str(tmp_path / "run.journal.jsonl")
+    journal = RunJournal.create(path, "key", {"analyzed_power": 600}, SETUPS)
+    journal.append(1, {"motor": "T-Motor M1", "power": "612"})
+    journal.close()
+
+    resumed = RunJournal.resume(path, "key")
+    assert resumed.setups == SETUPS
+    assert resumed.pending() == [0, 2]
+    resumed.append(0, {"motor": "T-Motor M0", "power": "598"})
+    resumed.close()
+    assert [r["motor"] for r in RunJournal.load(path).ordered_results()] == ["T-Motor M0", "T-Motor M1"]
+
+
+def test_failed_results_stay_pending(tmp_path):
+    path = str(tmp_path / "run.journal.jsonl")
+    journal = RunJournal.create(path, "key", {}, SETUPS)
+    journal.append(0, {"motor": "T-Motor M0", "power": "N/A"})
+    journal.append(1, {"motor": "T-Motor M1", "power": "612"})
+    assert journal.pending() == [0, 2]
+    journal.close()
+    assert RunJournal.load(path).pending() == [0, 2]
+
+
+def test_resume_drops_a_torn_last_line(tmp_path):
+    path = str(tmp_path / "run.journal.jsonl")
+    journal = RunJournal.create(path, "key", {}, SETUPS)
+    journal.append(0, {"power": "600"})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"event": "result", "index": 1, "res')
+
+    resumed = RunJournal.resume(path, "key")
+    resumed.append(1, {"power": "610"})
+    resumed.close()
+    assert RunJournal.load(path).pending() == [2]
+
+
+def test_resume_refuses_another_configuration(tmp_path):
+    path = str(tmp_path / "run.journal.jsonl")
+    RunJournal.create(path, "key", {}, SETUPS).close()
+    assert RunJournal.resume(path, "other") is None
+    assert RunJournal.resume(str(tmp_path / "missing.journal.jsonl"), "key") is None
+
+
+def test_create_keeps_unfinished_journals(tmp_path):
+    path = str(tmp_path / "run.journal.jsonl")
+    journal = RunJournal.create(path, "key", {}, SETUPS)
+    journal.append(0, {"power": "600"})
+    journal.close()
+
+    RunJournal.create(path, "other", {}, SETUPS).close()
+    kept = [name for name in os.listdir(tmp_path) if name != "run.journal.jsonl"]
+    assert len(kept) == 1
+    assert RunJournal.load(str(tmp_path / kept[0])).results() == {0: {"power": "600"}}
+    assert RunJournal.load(path).results() == {}
+
+
+def test_create_twice_in_a_row_keeps_both(tmp_path):
+    path = str(tmp_path / "run.journal.jsonl")
+    for power in ("600", "610", "620"):
+        journal = RunJournal.create(path, "key", {}, SETUPS)
+        journal.append(0, {"power": power})
+        journal.close()
+    kept = sorted(name for name in os.listdir(tmp_path) if name != "run.journal.jsonl")
+    assert len(kept) == 2
+    powers = {RunJournal.load(str(tmp_path / name)).results()[0]["power"] for name in kept}
+    assert powers == {"600", "610"}
@@ -0,0 +1,89 @@
+import os
+import shutil
+
+from results_store import ResultStore, export_rows
+from spreadsheets import read_spreadsheet
+
+PLANILHAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Planilhas")
+OLD_LAYOUT = "P600 - N60.csv"   # Manufacturer;Motor;...;Traction_0kmh
+NEW_LAYOUT = "P600 - N1.csv"    # marca;motor;...;T100tracao9
+
+
+def _store(tmp_path, *names):
+    plan_dir = tmp_path / "Planilhas"
+    plan_dir.mkdir()
+    for name in names:
+        shutil.copy(os.path.join(PLANILHAS, name), plan_dir / name)
+    return ResultStore(str(plan_dir / "results.sqlite")), str(plan_dir)
+
+
+def test_both_layouts_read_the_same_way():
+    old = read_spreadsheet(os.path.join(PLANILHAS, OLD_LAYOUT))[0]
+    new = read_spreadsheet(os.path.join(PLANILHAS, NEW_LAYOUT))[0]
+    for key in ("manufacturer", "motor", "prop_diam", "prop_pitch", "power", "eff_at_power", "traction_0", "traction_108"):
+        assert old[key] == new[key], key
+    assert new["motor"] == "T-Motor V505-260"
+
+
+def test_old_layout_motor_gets_its_manufacturer():
+    rows = read_spreadsheet(os.path.join(PLANILHAS, "P600 - N300.csv"))
+    assert len(rows) == 32
+    assert rows[0]["motor"] == "T-Motor V505-260"
+
+
+def test_import_normalizes_numbers(tmp_path):
+    store, plan_dir = _store(tmp_path, OLD_LAYOUT, NEW_LAYOUT)
+    assert store.import_dir(plan_dir) == {"imported": 2, "unchanged": 0, "rows": 7}
+    rows = store.query(motor="V505-260", limit=None)
+    assert len(rows) == 2
+    for row in rows:
+        assert row["analyzed_power"] == 600
+        assert row["power"] == 1084.5
+        assert row["traction_0"] == 5811
+        # "-" cells become NULL
+        assert row["traction_117"] is None
+    store.close()
+
+
+def test_reimport_only_changed_files(tmp_path):
+    store, plan_dir = _store(tmp_path, OLD_LAYOUT, NEW_LAYOUT)
+    store.import_dir(plan_dir)
+    assert store.import_dir(plan_dir)["imported"] == 0
+
+    changed = os.path.join(plan_dir, NEW_LAYOUT)
+    os.utime(changed, (os.path.getatime(changed), os.path.getmtime(changed) + 10))
+    assert store.import_dir(plan_dir) == {"imported": 1, "unchanged": 1, "rows": 1}
+    assert store.stats() == {"runs": 2, "rows": 7}
+    store.close()
+
+
+def test_query_filters_and_ranks(tmp_path):
+    store, plan_dir = _store(tmp_path, "P600 - N50.csv", "P600 - N98.csv")
+    store.import_dir(plan_dir)
+
+    rows = store.query(manufacturer="t-motor", diam=18, power=600, limit=None)
+    assert rows
+    assert all(r["manufacturer"] == "T-Motor" and r["prop_diam"] == 18 for r in rows)
+    effs = [r["eff_at_power"] for r in rows if r["eff_at_power"] is not None]
+    assert effs == sorted(effs, reverse=True)
+
+    best = store.query(manufacturer="T-Motor", distinct=True, limit=None)
+    keys = [(r["motor"], r["prop_diam"], r["prop_pitch"]) for r in best]
+    assert len(keys) == len(set(keys))
+    assert len(best) < len(store.query(manufacturer="T-Motor", limit=None))
+
+    lightest = store.query(sort="drive_weight", ascending=True, limit=3)
+    assert [r["drive_weight"] for r in lightest] == sorted(r["drive_weight"] for r in lightest)
+    store.close()
+
+
+def test_export(tmp_path):
+    store, plan_dir = _store(tmp_path, NEW_LAYOUT)
+    store.import_dir(plan_dir)
+    rows = store.query()
+    csv_path = str(tmp_path / "out.csv")
+    export_rows(rows, csv_path)
+    with open(csv_path, "r", encoding="utf-8-sig") as f:
+        header = f.readline().strip().split(";")
+    assert "eff_at_power" in header and "source" in header
+    store.close()
@@ -0,0 +1,81 @@
+import rpm_table
+
+TABLE = {
+    "throttle": [40, 60, 80, 100],
+    "power": [200, 400, 600, 800],
+    "eff": [78, 82, 85, 84],
+    "thrust": [900, 1500, 2000, 2400],
+}
+
+
+def test_interpolates_between_rows():
+    point = rpm_table.at_power(TABLE, 500)
+    assert point["mode"] == "interpolated"
+    assert point["power"] == 500
+    assert point["throttle"] == 70
+    assert point["eff"] == 83.5
+    assert point["thrust"] == 1750
+
+
+def test_exact_row():
+    point = rpm_table.at_power(TABLE, 600)
+    assert point["mode"] == "interpolated"
+    assert (point["throttle"], point["eff"], point["thrust"]) == (80, 85, 2000)
+
+
+def test_closest_within_tolerance():
+    # 50 W above the last row: max(50 W, 15 %) allows it
+    point = rpm_table.at_power(TABLE, 850)
+    assert point["mode"] == "closest"
+    assert point["power"] == 800
+    assert point["closest_power_diff"] == 50
+
+
+def test_error_beyond_tolerance():
+    point = rpm_table.at_power(TABLE, 1000)
+    assert point["mode"] == "error"
+    assert point["power_max"] == 800
+    assert rpm_table.fields_at_power(TABLE, 1000)["eff_at_power"] == "Err"
+
+
+def test_empty_efficiency_cell_uses_rows_that_have_one():
+    table = {"throttle": [50, 70, 90], "power": [400, 580, 800], "eff": [80, None, 86], "thrust": [1000, 1400, 1800]}
+    assert rpm_table.fields_at_power(table, 600)["eff_at_power"] == "83"
+    # Outside the range: the closest row with an efficiency
+    table["eff"] = [80, 84, None]
+    assert rpm_table.at_power(table, 820)["eff"] == 84
+
+
+def test_no_rows():
+    assert rpm_table.at_power({c: [] for c in rpm_table.COLUMNS}, 600)["mode"] == "error"
+
+
+def test_summarize():
+    fields = rpm_table.summarize(TABLE, 500)
+    assert fields["eff_row_count"] == "4"
+    assert fields["eff_max_throttle"] == "84"
+    assert fields["eff_at_power"] == "83.5"
+    assert fields["thr_at_power"] == "70"
+    assert fields["power_at_eff"] == "500"
+    assert fields["thrust_at_power"] == "1750"
+    assert fields["eff_at_power_mode"] == "interpolated"
+
+
+def test_apply_target_power_copies():
+    result = {"motor": "T-Motor MN505-S KV320", "rpm_table": TABLE, **rpm_table.summarize(TABLE, 600)}
+    at_400 = rpm_table.apply_target_power(result, 400)
+    assert at_400["eff_at_power"] == "82"
+    assert result["eff_at_power"] == "85"
+    assert at_400["rpm_table"] is not result["rpm_table"]
+
+
+def test_apply_target_power_without_table():
+    result = {"motor": "x", "eff_at_power": "85"}
+    assert rpm_table.apply_target_power(result, 400) is result
+
+
+def test_series():
+    result = {"rpm_table": TABLE}
+    out = rpm_table.series(result, [200, 800])
+    assert out[200]["thr_at_power"] == "40"
+    assert out[800]["thr_at_power"] == "100"
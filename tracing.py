@@ -0,0 +1,171 @@
+import atexit
+import json
+import os
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+class Tracer:
+    """
+    Minimal span tracer for the automation phases.
+    Finished spans go to a Chrome trace file (chrome://tracing / Perfetto) and/or are POSTed as
+    OTLP/HTTP JSON to a collector (e.g. http://localhost:4318/v1/traces). Nesting follows the
+    per-thread stack of open spans. When neither output is configured span() is a bare yield.
+    """
+    def __init__(self, chrome_path: Optional[str] = None, otlp_endpoint: Optional[str] = None,
+                 service_name: str = "ecalc-automation", otlp_batch: int = 512):
+        self.chrome_path = chrome_path
+        self.otlp_endpoint = otlp_endpoint
+        self.service_name = service_name
+        self.otlp_batch = otlp_batch
+        self.enabled = bool(chrome_path or otlp_endpoint)
+        self._events: List[Dict[str, Any]] = []
+        self._otlp_pending: List[Dict[str, Any]] = []
+        self._otlp_failed = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # perf_counter() is what the phases measure with; this maps it onto wall-clock time
+        self._wall0 = time.time()
+        self._perf0 = time.perf_counter()
+
+    def _stack(self) -> List[Dict[str, Any]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        if not self.enabled:
+            yield None
+            return
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span = {
+            "name": name,
+            "trace_id": parent["trace_id"] if parent else secrets.token_hex(16),
+            "span_id": secrets.token_hex(8),
+            "parent_id": parent["span_id"] if parent else None,
+            "start": time.perf_counter(),
+            "attrs": attrs,
+            "tid": threading.get_ident(),
+        }
+        stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span["attrs"]["error"] = str(e)
+            raise
+        finally:
+            stack.pop()
+            span["end"] = time.perf_counter()
+            self._finish(span)
+
+    def record(self, name: str, started: float, duration: float, **attrs):
+        """Adds an already finished span (started = perf_counter() value) under the current open span."""
+        if not self.enabled:
+            return
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        self._finish({
+            "name": name,
+            "trace_id": parent["trace_id"] if parent else secrets.token_hex(16),
+            "span_id": secrets.token_hex(8),
+            "parent_id": parent["span_id"] if parent else None,
+            "start": started,
+            "end": started + duration,
+            "attrs": attrs,
+            "tid": threading.get_ident(),
+        })
+
+    def _wall_ns(self, perf: float) -> int:
+        return int((self._wall0 + (perf - self._perf0)) * 1e9)
+
+    def _finish(self, span: Dict[str, Any]):
+        flush_otlp = False
+        with self._lock:
+            if self.chrome_path:
+                self._events.append({
+                    "name": span["name"],
+                    "cat": span["name"].split(".")[0],
+                    "ph": "X",
+                    "ts": round((span["start"] - self._perf0) * 1e6, 1),
+                    "dur": round((span["end"] - span["start"]) * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": span["tid"],
+                    "args": {k: str(v) for k, v in span["attrs"].items()},
+                })
+            if self.otlp_endpoint:
+                self._otlp_pending.append(span)
+                flush_otlp = len(self._otlp_pending) >= self.otlp_batch
+        if flush_otlp:
+            self._flush_otlp()
+
+    def flush(self):
+        if self.chrome_path:
+            with self._lock:
+                events = list(self._events)
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.chrome_path)), exist_ok=True)
+                with open(self.chrome_path, "w", encoding="utf-8") as f:
+                    json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+            except Exception as e:
+                print(f"[Trace] Could not write {self.chrome_path}: {e}")
+        if self.otlp_endpoint:
+            self._flush_otlp()
+
+    def _flush_otlp(self):
+        with self._lock:
+            spans, self._otlp_pending = self._otlp_pending, []
+        if not spans:
+            return
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "ecalc.tracing"},
+                "spans": [{
+                    "traceId": s["trace_id"],
+                    "spanId": s["span_id"],
+                    **({"parentSpanId": s["parent_id"]} if s["parent_id"] else {}),
+                    "name": s["name"],
+                    "kind": 1,
+                    "startTimeUnixNano": str(self._wall_ns(s["start"])),
+                    "endTimeUnixNano": str(self._wall_ns(s["end"])),
+                    "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in s["attrs"].items()],
+                } for s in spans],
+            }],
+        }]}
+        try:
+            req = urllib.request.Request(self.otlp_endpoint, data=json.dumps(payload).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"}, method="POST")
+            urllib.request.urlopen(req, timeout=5).close()
+        except Exception as e:
+            # A missing collector must never slow the automation down; say it once
+            if not self._otlp_failed:
+                print(f"[Trace] OTLP export to {self.otlp_endpoint} failed: {e}")
+                self._otlp_failed = True
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def configure(chrome_path: Optional[str] = None, otlp_endpoint: Optional[str] = None) -> Tracer:
+    """Replaces the process-wide tracer; output is flushed at exit (or by calling flush())."""
+    global _tracer
+    _tracer = Tracer(chrome_path=chrome_path, otlp_endpoint=otlp_endpoint)
+    if _tracer.enabled:
+        atexit.register(_tracer.flush)
+    return _tracer
+
+
+def configure_from_env() -> Tracer:
+    """ECALC_TRACE=<file.json> writes a Chrome trace, ECALC_OTLP_ENDPOINT=<url> exports to a collector."""
+    return configure(os.getenv("ECALC_TRACE") or None, os.getenv("ECALC_OTLP_ENDPOINT") or None)